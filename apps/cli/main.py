@@ -1,4 +1,5 @@
 """CLI main entry point."""
+import argparse
 import asyncio
 import os
 import sys
@@ -28,10 +29,12 @@ from core.orchestrator.planner import Planner
 from core.orchestrator.approval_gate import ApprovalGate
 from core.orchestrator.executor import Executor
 from core.orchestrator.qa_handler import handle_qa
-from core.context_engine.build_context import build_context, search_openmemory
+from core.orchestrator.speculation import StageTimer, SkillPrefetch
+from core.context_engine.build_context import build_context, load_identity_pack, search_openmemory
 from core.router.route import route_task, route_llm_first
 from core.llm.factory import build_llm_client
 from core.platform.audit import AuditLogger
+from core.platform.artifact_store import default_artifact_store
 from core.platform.config import Config
 from core.capabilities.index_builder import build_capability_index
 from tools.registry import ToolRegistry
@@ -41,6 +44,8 @@ from tools.local.file_tool import FileTool
 from tools.python_run import PythonRunTool
 from pathlib import Path
 from skills.registry import SkillsRegistry
+from skills.manifest import DEFAULT_MANIFEST_PATH as SKILLS_MANIFEST_PATH
+from skills.watcher import SkillsWatcher
 from skills.runtime.to_plan import skill_to_plan
 from core.session.history import SessionHistoryBuffer
 
@@ -82,10 +87,50 @@ async def process_single_task(
     })
     print(f"[2/8] 任务已创建: {task.task_id}")
     
+    available_tools = tool_registry.list_all()
+    available_skills = skills_registry.list_all()
+
     # 3. Context Engine 构建上下文
+    # 记忆检索、LLM 路由与候选技能预取并行进行：路由只依赖上下文摘要，
+    # 规则路由的首选技能可提前加载 SKILL.md，最终路由不一致时丢弃。
+    # 规则路由只读任务描述与可用技能/工具，不依赖上下文，提前计算的结果在
+    # 后面需要规则路由时直接复用（见 _route_by_rule）。
     print("[3/8] 构建上下文...")
-    openmemory_results = await search_openmemory(description, top_k=3)
-    context = build_context(task, openmemory_results=openmemory_results)
+    timer = StageTimer()
+    rule_description = task.description
+    rule_route = route_task(task, available_tools, available_skills)
+    rule_candidate = rule_route[0]
+    prefetch = None
+    if rule_candidate:
+        prefetch = SkillPrefetch(skills_registry, rule_candidate.skill_id, timer=timer)
+
+    memory_job = asyncio.create_task(
+        timer.run("memory_search", search_openmemory(description, top_k=3))
+    )
+    identity_pack = timer.call("identity_pack", load_identity_pack)
+
+    route_job = None
+    if llm_router_enabled and llm_client:
+        capability_index = timer.call(
+            "capability_index", build_capability_index, skills_registry, tool_registry
+        )
+        route_job = asyncio.create_task(
+            timer.run(
+                "route_llm",
+                asyncio.to_thread(
+                    route_llm_first,
+                    task.description,
+                    build_context(task, identity_pack=identity_pack),
+                    capability_index,
+                    llm_client,
+                    audit_logger=audit_logger,
+                    chat_history_messages=chat_history_messages,
+                ),
+            )
+        )
+
+    openmemory_results = await memory_job
+    context = build_context(task, identity_pack=identity_pack, openmemory_results=openmemory_results)
     task.context = context
     task.update_status(TASK_STATUS_CONTEXT_BUILT)
     task_manager.update_task(task)  # 保存快照
@@ -108,21 +153,56 @@ async def process_single_task(
             if _risk_rank(step.risk_level) < min_rank:
                 step.risk_level = min_risk
 
-    def _load_skill_fulltext(skill_id: str) -> str:
+    def _route_by_rule():
+        # 规则已有结论（技能或工具）且任务描述未变时复用提前计算的结果；
+        # 规则无结论时才需要带上 LLM 兜底重新路由
+        if task.description == rule_description and (rule_route[0] or rule_route[1]):
+            return rule_route
+        return route_task(
+            task,
+            available_tools,
+            available_skills,
+            llm_client=llm_client,
+            audit_logger=audit_logger,
+            chat_history_messages=chat_history_messages,
+        )
+
+    async def _load_skill_fulltext(skill_id: str) -> str:
         # 根据渐进式加载原则：只加载 SKILL.md，不自动加载引用文件
         # LLM 可以根据 SKILL.md 中的提示，在需要时通过文件工具读取引用文件
-        fulltext = skills_registry.load_skill_fulltext(skill_id, include_references=False)
+        if prefetch:
+            fulltext, prefetched = await prefetch.load(skill_id)
+        else:
+            fulltext = skills_registry.load_skill_fulltext(skill_id, include_references=False)
+            prefetched = False
         audit_logger.log("skill.loaded", {
             "skill_id": skill_id,
             "bytes_loaded": len(fulltext.encode("utf-8")),
             "progressive_disclosure": True,  # 标记使用了渐进式加载
+            "prefetched": prefetched,
+            "text_cache": skills_registry.text_cache.stats(),
         })
         return fulltext
 
+    def _finish_speculation(final_skill) -> None:
+        timer.finish()
+        prefetch_hit = bool(prefetch and final_skill and prefetch.matches(final_skill.skill_id))
+        if prefetch and not prefetch_hit:
+            prefetch.discard()
+        timings = timer.summary()
+        audit_logger.log("task.stage_timings", {
+            "task_id": task.task_id,
+            **timings,
+            "prefetch_skill_id": prefetch.skill_id if prefetch else None,
+            "prefetch_hit": prefetch_hit,
+        })
+        print(
+            f"  - 阶段耗时: 串行估算 {timings['sequential_ms']} ms, "
+            f"实际 {timings['wall_ms']} ms, 并行节省 {timings['saved_ms']} ms"
+        )
+
     # 4. Router 路由
     print("[4/8] 路由任务...")
-    available_tools = tool_registry.list_all()
-    available_skills = skills_registry.list_all()
 
     route_decision = None
     matched_skill = None
@@ -130,42 +210,20 @@ async def process_single_task(
     skill_fulltext = ""
     use_planner_for_skill = False
 
-    if llm_router_enabled and llm_client:
-        capability_index = build_capability_index(skills_registry, tool_registry)
-        route_decision = route_llm_first(
-            task.description,
-            context,
-            capability_index,
-            llm_client,
-            audit_logger=audit_logger,
-            chat_history_messages=chat_history_messages,
-        )
+    if route_job:
+        route_decision = await route_job
 
         if route_decision.get("fallback_to_rule"):
-            matched_skill, routed_tools = route_task(
-                task, 
-                available_tools, 
-                available_skills,
-                llm_client=llm_client,
-                audit_logger=audit_logger,
-                chat_history_messages=chat_history_messages,
-            )
+            matched_skill, routed_tools = _route_by_rule()
         else:
             route_type = route_decision.get("route_type")
             if route_type == "skill":
                 skill_id = route_decision.get("skill_id")
                 matched_skill = available_skills.get(skill_id)
                 if not matched_skill:
-                    matched_skill, routed_tools = route_task(
-                        task, 
-                        available_tools, 
-                        available_skills,
-                        llm_client=llm_client,
-                        audit_logger=audit_logger,
-                        chat_history_messages=chat_history_messages,
-                    )
+                    matched_skill, routed_tools = _route_by_rule()
                 else:
-                    skill_fulltext = _load_skill_fulltext(matched_skill.skill_id)
+                    skill_fulltext = await _load_skill_fulltext(matched_skill.skill_id)
                     # 如果启用了 LLM planner，使用 LLM 来生成计划（能理解技能文档并生成实际内容）
                     # 否则使用 skill_to_plan（解析执行步骤但只能生成占位文件）
                     use_planner_for_skill = llm_planner_enabled
@@ -177,16 +235,10 @@ async def process_single_task(
                     if tool_id in available_tools or (isinstance(tool_id, str) and tool_id.startswith("mcp."))
                 ]
                 if not routed_tools:
-                    matched_skill, routed_tools = route_task(
-                        task, 
-                        available_tools, 
-                        available_skills,
-                        llm_client=llm_client,
-                        audit_logger=audit_logger,
-                        chat_history_messages=chat_history_messages,
-                    )
+                    matched_skill, routed_tools = _route_by_rule()
             elif route_type == "qa":
                 print("\n进入问答模式，不进入规划与执行。")
+                _finish_speculation(None)
                 answer = handle_qa(
                     task.description,
                     context,
@@ -206,6 +258,7 @@ async def process_single_task(
                 return answer
             elif route_type == "clarify":
                 print("\n需要澄清，不进入规划与执行。")
+                _finish_speculation(None)
                 questions = route_decision.get("clarify_questions") or []
                 if questions:
                     print("澄清问题：")
@@ -216,23 +269,9 @@ async def process_single_task(
                 session_history.add_assistant(clarify_text)
                 return None
             else:
-                matched_skill, routed_tools = route_task(
-                    task, 
-                    available_tools, 
-                    available_skills,
-                    llm_client=llm_client,
-                    audit_logger=audit_logger,
-                    chat_history_messages=chat_history_messages,
-                )
+                matched_skill, routed_tools = _route_by_rule()
     else:
-        matched_skill, routed_tools = route_task(
-            task, 
-            available_tools, 
-            available_skills,
-            llm_client=llm_client,
-            audit_logger=audit_logger,
-            chat_history_messages=chat_history_messages,
-        )
+        matched_skill, routed_tools = _route_by_rule()
     
     if matched_skill:
         print(f"  - 匹配到技能: {matched_skill.name} ({matched_skill.skill_id})")
@@ -244,7 +283,9 @@ async def process_single_task(
     print("[5/8] 生成执行计划...")
     if matched_skill:
         if not skill_fulltext:
-            skill_fulltext = _load_skill_fulltext(matched_skill.skill_id)
+            skill_fulltext = await _load_skill_fulltext(matched_skill.skill_id)
+    _finish_speculation(matched_skill)
+    if matched_skill:
         # 如果启用了 LLM planner，优先使用 LLM 来生成计划（能理解技能文档并生成实际内容）
         # 否则使用 skill_to_plan（解析执行步骤但只能生成占位文件）
         if llm_planner_enabled and llm_client:
@@ -256,6 +297,7 @@ async def process_single_task(
                 llm_client=llm_client,
                 audit_logger=audit_logger,
                 chat_history_messages=chat_history_messages,
+                skill_sections=skills_registry.section_index(matched_skill.skill_id),
             )
             plan.source = f"skill:{matched_skill.skill_id}"
         else:
@@ -357,15 +399,17 @@ async def process_single_task(
     audit_logger.log("task_started", {"task_id": task.task_id})
     
     executed_tools = []
-    for i, step in enumerate(plan.steps, 1):
+    step_numbers = {step.step_id: i for i, step in enumerate(plan.steps, 1)}
+    
+    def handle_step_result(step, tool_result) -> None:
+        """处理单个步骤的结果（由调度器按计划顺序回调）。"""
+        i = step_numbers[step.step_id]
         print(f"\n  步骤 {i}/{len(plan.steps)}: {step.tool_id}")
         print(f"    描述: {step.description}")
         
-        tool = tool_registry.get(step.tool_id)
-        if not tool:
+        if not tool_registry.get(step.tool_id):
             if step.tool_id.startswith("mcp."):
                 print(f"    ✗ 错误: {step.tool_id} 未接入 MCP client")
-                tool_result = tool_runner.run_missing_mcp(step.tool_id, step.step_id)
                 audit_logger.log("mcp.missing_client", {
                     "task_id": task.task_id,
                     "step_id": step.step_id,
@@ -373,10 +417,7 @@ async def process_single_task(
                 })
             else:
                 print(f"    ✗ 错误: 工具 {step.tool_id} 未找到")
-                continue
-        else:
-            # 执行工具
-            tool_result = await tool_runner.run(tool, step.step_id, step.params)
+                return
         
         if tool_result.success:
             print(f"    ✓ 执行成功")
@@ -391,11 +432,13 @@ async def process_single_task(
                 "result": tool_result.result,
             })
             
-            # 收集产物
+            # 收集产物（附带内容摘要）
             if tool_result.evidence_refs:
                 for ref in tool_result.evidence_refs:
-                    task.add_artifact(ref)
-                    print(f"    📄 产物: {ref}")
+                    digest = tool_result.artifact_digests.get(os.path.abspath(ref))
+                    task.add_artifact(ref, digest)
+                    print(f"    📄 产物: {ref}" + (f" (blake2b {digest[:12]})" if digest else ""))
+            task.artifact_digests.update(tool_result.artifact_digests)
             
             # 特殊处理：python_run 工具的审计日志
             if step.tool_id == "python_run":
@@ -403,6 +446,8 @@ async def process_single_task(
                 meta = result.get("meta", {})
                 artifacts_changed = result.get("artifacts_changed", [])
                 artifacts_count = meta.get("artifacts_count", len(artifacts_changed))
+                if meta.get("cached"):
+                    print("    ♻ 命中结果缓存，未重新执行脚本")
                 
                 # 取前 20 个产物路径作为样本
                 artifacts_sample = [
@@ -422,6 +467,10 @@ async def process_single_task(
                     "duration_ms": meta.get("duration_ms", 0),
                     "artifacts_count": artifacts_count,
                     "artifacts_sample": artifacts_sample,
+                    "artifact_digests_count": len(tool_result.artifact_digests),
+                    "cached": meta.get("cached", False),
+                    "queued_ms": meta.get("queued_ms", 0),
+                    "resource_usage": meta.get("resource_usage"),
                 })
             else:
                 audit_logger.log("tool_executed", {
@@ -429,15 +478,19 @@ async def process_single_task(
                     "step_id": step.step_id,
                     "tool_id": step.tool_id,
                     "success": True,
+                    "status": tool_result.status,
                     "evidence_refs": tool_result.evidence_refs,
+                    "artifact_digests": tool_result.artifact_digests,
                 })
         else:
-            print(f"    ✗ 执行失败: {tool_result.error}")
+            label = {"timeout": "执行超时", "cancelled": "已取消"}.get(tool_result.status, "执行失败")
+            print(f"    ✗ {label}: {tool_result.error}")
             task.add_action({
                 "step_id": step.step_id,
                 "tool_id": step.tool_id,
                 "description": step.description,
                 "success": False,
+                "status": tool_result.status,
                 "error": tool_result.error,
             })
             audit_logger.log("tool_executed", {
@@ -445,9 +498,28 @@ async def process_single_task(
                 "step_id": step.step_id,
                 "tool_id": step.tool_id,
                 "success": False,
+                "status": tool_result.status,
                 "error": tool_result.error,
             })
     
+    # 无依赖、资源不冲突的步骤并行执行；结果按计划顺序回调，审计顺序与串行一致
+    schedule = await tool_runner.run_plan(
+        plan.steps, tool_registry.get, on_result=handle_step_result
+    )
+    audit_logger.log("plan.executed", {
+        "task_id": task.task_id,
+        "steps_count": len(plan.steps),
+        "makespan_ms": schedule["makespan_ms"],
+        "serial_ms": schedule["serial_ms"],
+        "max_parallel": schedule["max_parallel"],
+        "peak_concurrency": schedule["peak_concurrency"],
+    })
+    if schedule["peak_concurrency"] > 1:
+        print(
+            f"\n  并行执行: 耗时 {schedule['makespan_ms']:.0f} ms"
+            f"（串行合计 {schedule['serial_ms']:.0f} ms，最大并发 {schedule['peak_concurrency']}）"
+        )
+    
     # 8. 任务完成
     task.update_status(TASK_STATUS_COMPLETED)
     # 保存最终快照（包含完整信息）
@@ -549,8 +621,25 @@ def print_skills(skills_registry: SkillsRegistry):
     print("\n" + "=" * 60 + "\n")
 
 
-async def main():
-    """主函数 - REPL 模式，常驻在线。"""
+def parse_args(argv: Optional[list] = None) -> argparse.Namespace:
+    """解析命令行参数。"""
+    parser = argparse.ArgumentParser(description="Jarvis CLI (REPL Mode)")
+    parser.add_argument(
+        "--rebuild-skill-cache",
+        action="store_true",
+        help="忽略技能 manifest 缓存，强制全量重新扫描 skills_workspace",
+    )
+    # 兼容旧用法：忽略未识别的参数（如直接传入的任务描述）
+    args, _ = parser.parse_known_args(argv)
+    return args
+
+
+async def main(rebuild_skill_cache: bool = False):
+    """主函数 - REPL 模式，常驻在线。
+    
+    Args:
+        rebuild_skill_cache: 是否强制重建技能 manifest 缓存
+    """
     # 打印 banner（仅一次）
     print("=" * 60)
     print("Jarvis v0.1 - Kernel MVP (REPL Mode)")
@@ -568,14 +657,24 @@ async def main():
     executor = Executor()
     audit_logger = AuditLogger()
     tool_registry = ToolRegistry()
-    tool_runner = ToolRunner()
+    artifact_store = default_artifact_store()
+    tool_runner = ToolRunner(artifact_store=artifact_store)
     
     # 初始化技能注册表
-    skills_registry = SkillsRegistry(workspace_dir="./skills_workspace")
-    skills_registry.scan_workspace()
+    skills_registry = SkillsRegistry(
+        workspace_dir="./skills_workspace",
+        manifest_path=SKILLS_MANIFEST_PATH,
+    )
+    skills_registry.scan_workspace(rebuild_cache=rebuild_skill_cache)
+    
+    # 后台监听技能目录变化（新增/修改/删除技能无需重启）
+    skills_watcher = None
+    if os.getenv("JARVIS_SKILL_HOT_RELOAD", "1") != "0":
+        skills_watcher = SkillsWatcher(skills_registry)
+        skills_watcher.start()
     
     # 注册工具
-    file_tool = FileTool(sandbox_root=sandbox_root)
+    file_tool = FileTool(sandbox_root=sandbox_root, artifact_store=artifact_store)
     shell_tool = ShellTool()
     python_run_tool = PythonRunTool()
     tool_registry.register(file_tool)
@@ -660,11 +759,15 @@ async def main():
             # 继续下一轮，不退出
             continue
     
+    if skills_watcher:
+        skills_watcher.stop()
+    
 
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        args = parse_args()
+        asyncio.run(main(rebuild_skill_cache=args.rebuild_skill_cache))
     except KeyboardInterrupt:
         print("\n\n用户中断")
     except Exception as e:
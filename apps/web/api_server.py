@@ -44,6 +44,7 @@ from core.context_engine.build_context import build_context, search_openmemory
 from core.router.route import route_task, route_llm_first
 from core.llm.factory import build_llm_client
 from core.platform.audit import AuditLogger
+from core.platform.artifact_store import default_artifact_store
 from core.platform.config import Config
 from core.capabilities.index_builder import build_capability_index
 from tools.registry import ToolRegistry
@@ -52,6 +53,8 @@ from tools.local.shell_tool import ShellTool
 from tools.local.file_tool import FileTool
 from tools.python_run import PythonRunTool
 from skills.registry import SkillsRegistry
+from skills.manifest import DEFAULT_MANIFEST_PATH as SKILLS_MANIFEST_PATH
+from skills.watcher import SkillsWatcher
 from skills.runtime.to_plan import skill_to_plan
 from core.session.history import SessionHistoryBuffer
 
@@ -258,6 +261,7 @@ async def process_task_with_updates(
                     llm_client=llm_client,
                     audit_logger=audit_logger,
                     chat_history_messages=chat_history_messages,
+                    skill_sections=skills_registry.section_index(matched_skill.skill_id),
                 )
                 plan.source = f"skill:{matched_skill.skill_id}"
             else:
@@ -388,12 +392,22 @@ async def lifespan(app: FastAPI):
     executor = Executor()
     audit_logger = AuditLogger()
     tool_registry = ToolRegistry()
-    tool_runner = ToolRunner()
+    artifact_store = default_artifact_store()
+    tool_runner = ToolRunner(artifact_store=artifact_store)
     
-    skills_registry = SkillsRegistry(workspace_dir="./skills_workspace")
-    skills_registry.scan_workspace()
+    skills_registry = SkillsRegistry(
+        workspace_dir="./skills_workspace",
+        manifest_path=SKILLS_MANIFEST_PATH,
+    )
+    skills_registry.scan_workspace(
+        rebuild_cache=os.getenv("JARVIS_REBUILD_SKILL_CACHE") == "1"
+    )
+    skills_watcher = None
+    if os.getenv("JARVIS_SKILL_HOT_RELOAD", "1") != "0":
+        skills_watcher = SkillsWatcher(skills_registry)
+        skills_watcher.start()
     
-    file_tool = FileTool(sandbox_root=sandbox_root)
+    file_tool = FileTool(sandbox_root=sandbox_root, artifact_store=artifact_store)
     shell_tool = ShellTool()
     python_run_tool = PythonRunTool()
     tool_registry.register(file_tool)
@@ -413,7 +427,8 @@ async def lifespan(app: FastAPI):
     yield
     
     # 关闭时清理
-    pass
+    if skills_watcher:
+        skills_watcher.stop()
 
 
 app = FastAPI(title="Jarvis API", lifespan=lifespan)
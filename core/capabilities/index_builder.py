@@ -33,6 +33,7 @@ def build_capability_index(
         tools = list(tools_registry.list_tools_summary())
 
     return {
+        "version": getattr(skills_registry, "version", 0),
         "skills": skills,
         "tools": tools,
         "mcp": _build_mcp_summary(mcp_registry),
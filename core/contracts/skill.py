@@ -12,11 +12,17 @@ class PlanStep:
     description: str
     params: Dict[str, Any] = None
     risk_level: str = "R1"
+    depends_on: List[str] = None  # 必须先完成的步骤ID（仅限计划中位于之前的步骤）
+    resources: List[str] = None  # 访问的资源键（如沙箱相对路径），相同资源的步骤串行执行
     
     def __post_init__(self):
         """初始化后处理。"""
         if self.params is None:
             self.params = {}
+        if self.depends_on is None:
+            self.depends_on = []
+        if self.resources is None:
+            self.resources = []
 
 
 @dataclass
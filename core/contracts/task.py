@@ -26,6 +26,7 @@ class Task:
     updated_at: datetime = field(default_factory=datetime.now)
     context: Dict[str, Any] = field(default_factory=dict)
     artifacts: List[str] = field(default_factory=list)  # 产物路径列表
+    artifact_digests: Dict[str, str] = field(default_factory=dict)  # 产物路径 -> 内容摘要
     actions: List[Dict[str, Any]] = field(default_factory=list)  # 执行的动作记录
     
     def update_status(self, new_status: str) -> None:
@@ -33,10 +34,12 @@ class Task:
         self.status = new_status
         self.updated_at = datetime.now()
     
-    def add_artifact(self, artifact_path: str) -> None:
-        """添加产物路径。"""
+    def add_artifact(self, artifact_path: str, digest: Optional[str] = None) -> None:
+        """添加产物路径（可附带内容摘要）。"""
         if artifact_path not in self.artifacts:
             self.artifacts.append(artifact_path)
+        if digest:
+            self.artifact_digests[artifact_path] = digest
     
     def add_action(self, action: Dict[str, Any]) -> None:
         """添加动作记录。"""
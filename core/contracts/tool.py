@@ -15,6 +15,7 @@ class Tool:
     parameters: Dict[str, Any]  # JSON Schema
     risk_level: str = RISK_LEVEL_R1  # R0, R1, R2, R3
     requires_approval: bool = False
+    default_timeout: Optional[float] = None  # 默认超时（秒）；None 时使用 ToolRunner 的全局默认值
     
     async def execute(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """执行工具并返回结果。"""
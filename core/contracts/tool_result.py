@@ -4,6 +4,13 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional
 
 
+# 执行结果状态
+TOOL_STATUS_OK = "ok"
+TOOL_STATUS_ERROR = "error"
+TOOL_STATUS_TIMEOUT = "timeout"
+TOOL_STATUS_CANCELLED = "cancelled"
+
+
 @dataclass
 class ToolResult:
     """工具执行结果。"""
@@ -15,6 +22,13 @@ class ToolResult:
     error: Optional[str] = None
     evidence_refs: List[str] = field(default_factory=list)  # 证据引用（如生成的文件路径）
     executed_at: datetime = field(default_factory=datetime.now)
+    status: Optional[str] = None  # ok / error / timeout / cancelled（未指定时由 success 推断）
+    artifact_digests: Dict[str, str] = field(default_factory=dict)  # 产物路径 -> 内容摘要（BLAKE2b-256）
+    
+    def __post_init__(self):
+        """初始化后处理。"""
+        if self.status is None:
+            self.status = TOOL_STATUS_OK if self.success else TOOL_STATUS_ERROR
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典。"""
@@ -22,8 +36,10 @@ class ToolResult:
             "tool_id": self.tool_id,
             "step_id": self.step_id,
             "success": self.success,
+            "status": self.status,
             "result": self.result,
             "error": self.error,
             "evidence_refs": self.evidence_refs,
+            "artifact_digests": self.artifact_digests,
             "executed_at": self.executed_at.isoformat(),
         }
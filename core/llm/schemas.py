@@ -30,10 +30,17 @@ CAPABILITY_INDEX_SCHEMA_HINT = (
 PLAN_SCHEMA = (
     "JSON object with fields: "
     '"steps" (array of objects, required), '
-    '"notes" (string, optional). '
+    '"notes" (string, optional), '
+    '"expand_sections" (array of integers, optional; section numbers from the skill '
+    'table of contents to load before planning, return with empty steps). '
     'Each step object must have: '
     '"tool_id" (string, required), '
     '"description" (string, required), '
-    '"params" (object, required, tool-specific parameters like {"operation": "write", "path": "...", "content": "..."} for file tool), '
-    '"risk_level" (string enum: R0|R1|R2|R3, required).'
+    '"params" (object, required, tool-specific parameters like {"operation": "write", "path": "...", "content": "..."} for file tool; '
+    'several file writes can go in one step as {"operation": "batch", "operations": [{"operation": "write", "path": "...", "content": "..."}, ...]}), '
+    '"risk_level" (string enum: R0|R1|R2|R3, required), '
+    '"id" (string, optional, unique within the plan), '
+    '"depends_on" (array of ids of earlier steps whose output this step needs, optional; '
+    'steps without dependencies may run in parallel), '
+    '"resources" (array of sandbox paths the step reads or writes, optional).'
 )
@@ -15,6 +15,11 @@ from core.contracts.risk import (
 from core.llm.schemas import PLAN_SCHEMA
 from core.utils.ids import generate_id
 from core.prompts.loader import PromptLoader
+from skills.sections import SectionIndex, build_section_index, disclose
+
+
+# 技能文档摘录的 token 预算（超过时只提供相关章节 + 目录；<=0 表示总是内联全文）
+DEFAULT_SKILL_SECTION_BUDGET = 1500
 
 
 class Planner:
@@ -84,6 +89,78 @@ class Planner:
         }
         audit_logger.log("llm.plan", details)
 
+    def _skill_section_budget(self) -> int:
+        try:
+            return int(os.getenv("JARVIS_SKILL_SECTION_BUDGET", DEFAULT_SKILL_SECTION_BUDGET))
+        except ValueError:
+            return DEFAULT_SKILL_SECTION_BUDGET
+
+    def _build_skill_section(
+        self,
+        task: Task,
+        skill_fulltext: str,
+        skill_sections: Optional[SectionIndex],
+        expand: Optional[List[int]] = None,
+    ) -> Dict[str, Any]:
+        """构建技能部分的 prompt 文本（渐进式披露）。
+        
+        技能文档不超过预算时内联全文；否则按任务文本挑选最相关的章节，
+        附上目录，LLM 可通过 expand_sections 请求展开其他章节。
+        
+        Args:
+            task: 任务对象
+            skill_fulltext: 技能全文
+            skill_sections: 预先建立的章节索引（与全文不一致时重建）
+            expand: 需要额外展开的章节编号
+            
+        Returns:
+            {'text': prompt 文本, 'disclosure': 摘录信息（内联全文时为 None）}
+        """
+        budget = self._skill_section_budget()
+        if skill_sections is None or skill_sections.char_length != len(skill_fulltext):
+            skill_sections = build_section_index(skill_fulltext) if budget > 0 else None
+        if skill_sections is None or skill_sections.total_tokens <= budget:
+            return {"text": f"\n技能全文如下：\n{skill_fulltext}", "disclosure": None}
+        
+        disclosure = disclose(skill_sections, task.description, budget, expand=expand)
+        disclosure["total_tokens"] = skill_sections.total_tokens
+        disclosure["sections_total"] = len(skill_sections.sections)
+        text = (
+            f"\n技能文档较长，以下为与任务最相关的章节摘录"
+            f"（约 {disclosure['excerpt_tokens']}/{skill_sections.total_tokens} tokens）：\n"
+            f"{disclosure['excerpt']}\n\n"
+            f"技能文档目录（✓ 表示已包含在摘录中）：\n{disclosure['toc']}\n"
+        )
+        if not expand:
+            text += (
+                "\n如果缺少规划所需的章节，可以只返回 "
+                '{"steps": [], "expand_sections": [章节编号]}，'
+                "系统会补充这些章节后重新请求规划（仅一次）。"
+            )
+        return {"text": text, "disclosure": disclosure}
+
+    def _requested_sections(
+        self,
+        llm_result: Any,
+        disclosure: Optional[Dict[str, Any]],
+    ) -> List[int]:
+        """解析 LLM 请求展开的章节（只保留目录中存在且尚未包含的编号）。"""
+        if not disclosure or not isinstance(llm_result, dict):
+            return []
+        raw = llm_result.get("expand_sections")
+        if not isinstance(raw, list):
+            return []
+        included = set(disclosure["included"])
+        requested = []
+        for item in raw:
+            try:
+                number = int(str(item).lstrip("§"))
+            except ValueError:
+                continue
+            if 0 <= number < disclosure["sections_total"] and number not in included:
+                requested.append(number)
+        return sorted(set(requested))
+
     def _build_file_step(self, task: Task, suffix: str = "") -> PlanStep:
         filename = f"{task.task_id}{suffix}.txt"
         return PlanStep(
@@ -220,6 +297,7 @@ class Planner:
         llm_client: Any = None,
         audit_logger: Any = None,
         chat_history_messages: Optional[List[Dict[str, str]]] = None,
+        skill_sections: Optional[SectionIndex] = None,
     ) -> Plan:
         """为任务创建执行计划（生成2-3个步骤，至少包含一个file_tool）。
         
@@ -227,6 +305,7 @@ class Planner:
             task: 任务对象
             available_tools: 可用工具字典
             routed_tools: 路由后的工具ID列表
+            skill_sections: 可选的技能章节索引（技能文档过长时只提供相关章节 + 目录）
             
         Returns:
             执行计划
@@ -243,11 +322,6 @@ class Planner:
                 loader = PromptLoader()
                 parsed = loader.parse("planner/default.md")
                 
-                # 处理 skill_fulltext 条件
-                skill_fulltext_section = ""
-                if skill_fulltext:
-                    skill_fulltext_section = f"\n技能全文如下：\n{skill_fulltext}"
-                
                 system_prompt = loader.render(
                     parsed["sections"]["system"],
                     {
@@ -255,33 +329,66 @@ class Planner:
                     },
                     strict=True,
                 )
-                user_prompt = loader.render(
-                    parsed["sections"].get("user", ""),
-                    {
-                        "task_description": task.description,
-                        "skill_fulltext_section": skill_fulltext_section,
-                    },
-                    strict=True,
-                )
-                try:
-                    llm_result = llm_client.complete_json(
-                        purpose="plan",
-                        system=system_prompt,
-                        user=user_prompt,
-                        schema_hint=PLAN_SCHEMA,
-                        chat_history_messages=chat_history_messages,
+                
+                expand: List[int] = []
+                llm_result = None
+                # 技能文档按章节披露时，允许 LLM 请求展开章节并重新规划一次
+                for attempt in range(2):
+                    # 处理 skill_fulltext 条件
+                    skill_fulltext_section = ""
+                    disclosure = None
+                    if skill_fulltext:
+                        built = self._build_skill_section(
+                            task, skill_fulltext, skill_sections, expand
+                        )
+                        skill_fulltext_section = built["text"]
+                        disclosure = built["disclosure"]
+                    
+                    user_prompt = loader.render(
+                        parsed["sections"].get("user", ""),
+                        {
+                            "task_description": task.description,
+                            "skill_fulltext_section": skill_fulltext_section,
+                        },
+                        strict=True,
                     )
-                except Exception as json_err:
-                    print(f"LLM 返回的 JSON 解析失败: {json_err}")
-                    if os.getenv("DEBUG") == "1":
-                        import traceback
-                        traceback.print_exc()
-                    raise
+                    try:
+                        llm_result = llm_client.complete_json(
+                            purpose="plan",
+                            system=system_prompt,
+                            user=user_prompt,
+                            schema_hint=PLAN_SCHEMA,
+                            chat_history_messages=chat_history_messages,
+                        )
+                    except Exception as json_err:
+                        print(f"LLM 返回的 JSON 解析失败: {json_err}")
+                        if os.getenv("DEBUG") == "1":
+                            import traceback
+                            traceback.print_exc()
+                        raise
+                    
+                    requested = self._requested_sections(llm_result, disclosure)
+                    if disclosure and audit_logger:
+                        audit_logger.log("skill.sections_disclosed", {
+                            "task_id": task.task_id,
+                            "attempt": attempt + 1,
+                            "total_tokens": disclosure["total_tokens"],
+                            "excerpt_tokens": disclosure["excerpt_tokens"],
+                            "sections_total": disclosure["sections_total"],
+                            "sections_included": disclosure["included"],
+                            "expand_requested": requested,
+                        })
+                    if attempt == 0 and requested:
+                        expand = requested
+                        continue
+                    break
                 
                 if isinstance(llm_result, dict):
                     raw_steps = llm_result.get("steps") or []
                     notes = llm_result.get("notes", "")
                     steps: List[PlanStep] = []
+                    # LLM 输出中的步骤 id -> 生成的 step_id（用于解析 depends_on）
+                    local_ids: Dict[str, str] = {}
                     for raw_step in raw_steps:
                         if not isinstance(raw_step, dict):
                             continue
@@ -298,13 +405,26 @@ class Planner:
                         risk_level = self._normalize_risk_level(raw_step.get("risk_level"))
                         if is_mcp_tool and not raw_step.get("risk_level"):
                             risk_level = RISK_LEVEL_R2
+                        step_id = generate_id("step")
+                        raw_deps = raw_step.get("depends_on")
+                        if not isinstance(raw_deps, list):
+                            raw_deps = []
+                        # 只保留指向之前步骤的依赖（未知 id 忽略）
+                        depends_on = [local_ids[str(dep)] for dep in raw_deps if str(dep) in local_ids]
+                        resources = raw_step.get("resources")
+                        if not isinstance(resources, list):
+                            resources = []
+                        if raw_step.get("id") is not None:
+                            local_ids[str(raw_step["id"])] = step_id
                         steps.append(
                             PlanStep(
-                                step_id=generate_id("step"),
+                                step_id=step_id,
                                 tool_id=tool_id,
                                 description=description,
                                 params=params,
                                 risk_level=risk_level,
+                                depends_on=depends_on,
+                                resources=[str(item) for item in resources if isinstance(item, str)],
                             )
                         )
 
@@ -0,0 +1,147 @@
+"""Speculative execution helpers for the task pipeline."""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from core.prompts.loader import PromptLoader
+
+
+class StageTimer:
+    """阶段计时器。
+
+    记录各阶段耗时（毫秒），并与实际墙钟时间比较，
+    用于估算并行/推测执行节省的时间。
+    """
+
+    def __init__(self):
+        """初始化计时器（从构造时刻开始计算墙钟时间）。"""
+        self.stages: Dict[str, int] = {}
+        self._started_at = time.perf_counter()
+        self._finished_at: Optional[float] = None
+
+    def record(self, name: str, started_at: float) -> None:
+        """记录一个阶段的耗时。
+
+        Args:
+            name: 阶段名称
+            started_at: 阶段开始时间（time.perf_counter()）
+        """
+        self.stages[name] = int((time.perf_counter() - started_at) * 1000)
+
+    async def run(self, name: str, awaitable: Awaitable[Any]) -> Any:
+        """等待协程并记录耗时。"""
+        started_at = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.record(name, started_at)
+
+    def call(self, name: str, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """同步调用函数并记录耗时。"""
+        started_at = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.record(name, started_at)
+
+    def finish(self) -> None:
+        """标记重叠窗口结束（之后的阶段不计入墙钟时间）。"""
+        if self._finished_at is None:
+            self._finished_at = time.perf_counter()
+
+    def summary(self) -> Dict[str, Any]:
+        """返回耗时汇总。
+
+        Returns:
+            字典，包含 stages_ms、sequential_ms（串行执行的估算耗时）、
+            wall_ms（实际耗时）与 saved_ms（重叠节省的耗时）
+        """
+        finished_at = self._finished_at or time.perf_counter()
+        wall_ms = int((finished_at - self._started_at) * 1000)
+        sequential_ms = sum(self.stages.values())
+        return {
+            "stages_ms": dict(self.stages),
+            "sequential_ms": sequential_ms,
+            "wall_ms": wall_ms,
+            "saved_ms": max(0, sequential_ms - wall_ms),
+        }
+
+
+class SkillPrefetch:
+    """候选技能的推测性预取。
+
+    在路由结果确定前，后台加载规则路由首选技能的 SKILL.md 全文，
+    并预热 planner prompt 的解析缓存。若最终路由到其他技能则丢弃结果。
+    """
+
+    PLANNER_PROMPT_ID = "planner/default.md"
+
+    def __init__(
+        self,
+        skills_registry: Any,
+        skill_id: str,
+        timer: Optional[StageTimer] = None,
+    ):
+        """启动预取（需在事件循环中调用）。
+
+        Args:
+            skills_registry: 技能注册表
+            skill_id: 候选技能ID
+            timer: 可选的阶段计时器
+        """
+        self.skill_id = skill_id
+        self._skills_registry = skills_registry
+        self._timer = timer
+        self._job = asyncio.create_task(asyncio.to_thread(self._load))
+
+    def _load(self) -> str:
+        started_at = time.perf_counter()
+        try:
+            fulltext = self._skills_registry.load_skill_fulltext(
+                self.skill_id, include_references=False
+            )
+            try:
+                PromptLoader().parse(self.PLANNER_PROMPT_ID)
+            except Exception:
+                # 预热失败不影响主流程，planner 会在需要时重新加载
+                pass
+            return fulltext
+        finally:
+            if self._timer:
+                self._timer.record("skill_prefetch", started_at)
+
+    def matches(self, skill_id: Optional[str]) -> bool:
+        """判断最终路由的技能是否与预取的候选一致。"""
+        return bool(skill_id) and skill_id == self.skill_id
+
+    async def result(self) -> Optional[str]:
+        """获取预取结果，失败时返回 None（由调用方回退为同步加载）。"""
+        try:
+            return await self._job
+        except Exception:
+            return None
+
+    async def load(self, skill_id: str) -> Tuple[str, bool]:
+        """加载技能 SKILL.md 全文：命中预取时复用结果，否则（或预取失败时）同步加载。
+
+        Args:
+            skill_id: 最终路由的技能ID
+
+        Returns:
+            (全文, 是否使用了预取结果)
+        """
+        if self.matches(skill_id):
+            fulltext = await self.result()
+            if fulltext is not None:
+                return fulltext, True
+        fulltext = self._skills_registry.load_skill_fulltext(skill_id, include_references=False)
+        return fulltext, False
+
+    def discard(self) -> None:
+        """丢弃推测结果。"""
+        if not self._job.done():
+            self._job.cancel()
+        else:
+            # 消费异常，避免 "exception was never retrieved" 警告
+            if not self._job.cancelled():
+                self._job.exception()
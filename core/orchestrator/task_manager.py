@@ -40,6 +40,7 @@ class TaskManager:
             "created_at": task.created_at.isoformat() if isinstance(task.created_at, datetime) else str(task.created_at),
             "updated_at": task.updated_at.isoformat() if isinstance(task.updated_at, datetime) else str(task.updated_at),
             "artifacts": task.artifacts,
+            "artifact_digests": task.artifact_digests,
             "actions_count": len(task.actions),
         }
         
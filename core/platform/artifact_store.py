@@ -0,0 +1,490 @@
+"""Content-addressed artifact store."""
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+# 哈希算法：BLAKE2b-256（大块 update 时释放 GIL，可在线程池中并行）
+HASH_NAME = "blake2b-256"
+
+# 读取块大小
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# 索引格式版本
+INDEX_VERSION = 1
+
+# 日志累计超过该行数时合并进 index.json
+JOURNAL_COMPACT_LINES = 512
+
+# 去重方式
+DEDUPE_COPY = "copy"        # 对象为独立 inode 的副本（支持时用 reflink），沙箱文件不受影响
+DEDUPE_LINK = "link"        # 对象与沙箱文件共享 inode（硬链接入库，不额外占用磁盘）
+DEDUPE_SANDBOX = "sandbox"  # 在 link 基础上，沙箱中内容相同的文件也合并为同一 inode
+
+# Linux FICLONE ioctl：新文件与源文件共享数据块（写时复制），但 inode 独立
+FICLONE = 0x40049409
+
+# 入库状态
+STATUS_STORED = "stored"        # 新内容，已入库
+STATUS_DEDUPED = "deduped"      # 库中已有相同内容
+STATUS_UNCHANGED = "unchanged"  # 与该路径上次入库的内容相同（stat 未变时不重新读取）
+
+
+def hash_file(path: str) -> str:
+    """计算文件的 BLAKE2b-256 摘要（十六进制）。"""
+    digest = hashlib.blake2b(digest_size=32)
+    with open(path, "rb") as handle:
+        while True:
+            chunk = handle.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def clone_file(source: str, target: str) -> None:
+    """把 source 的内容复制到新文件 target。
+
+    文件系统支持 reflink（btrfs、XFS 等）时只共享数据块、不复制数据；
+    否则普通复制。两种方式下 target 都是独立的 inode，改写 source 不影响它。
+    """
+    if fcntl is not None:
+        with open(source, "rb") as src, open(target, "wb") as dst:
+            try:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                return
+            except OSError:
+                pass  # 不支持 reflink：下面普通复制（覆盖空文件）
+    shutil.copyfile(source, target)
+
+
+def default_artifact_store() -> Optional["ArtifactStore"]:
+    """按环境变量创建产物存储（JARVIS_ARTIFACT_STORE=0 时返回 None）。
+
+    创建时先清理：已删除的产物释放引用，无引用的对象删除。
+    """
+    if os.getenv("JARVIS_ARTIFACT_STORE", "1") == "0":
+        return None
+    store = ArtifactStore()
+    store.prune()
+    return store
+
+
+def _stat_key(stat: os.stat_result) -> List[int]:
+    return [stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns]
+
+
+class ArtifactStore:
+    """内容寻址的产物存储（memory/artifact_store）。
+
+    - objects/<前两位>/<摘要>：按内容摘要存放，相同内容只存一份
+    - index.json：对象引用计数，以及各产物路径上次入库时的 stat 与摘要
+      （stat 未变的产物直接复用摘要，不重新读取）
+    - index.journal：index.json 之后的增量（每次入库追加一行变更），
+      累计 JOURNAL_COMPACT_LINES 行后合并进 index.json
+
+    引用计数为指向该对象的产物路径数：路径内容变化时释放旧对象的引用，
+    产物被删除后由 prune() 释放，计数为 0 的对象由 gc() 删除。
+
+    去重方式（dedupe）：
+    - copy（默认）：对象是独立 inode 的副本（文件系统支持时为 reflink，不额外占用磁盘），
+      沙箱文件被就地改写也不影响对象
+    - link（需显式开启）：新内容以硬链接入库，不复制数据，但沙箱文件就是对象本身：
+      就地改写（不经替换）会同时改变对象内容，直到该路径再次入库时才被发现
+      （从其他内容未变的路径恢复对象，没有这样的路径时把它移出存储）
+    - sandbox（需显式开启）：在 link 基础上把沙箱中与已有对象相同的文件替换为指向对象的
+      硬链接，沙箱磁盘占用随之减少；此时就地改写其中一个文件会改变所有内容相同的文件
+    """
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        dedupe: Optional[str] = None,
+        max_workers: Optional[int] = None,
+    ):
+        """初始化。
+
+        Args:
+            root: 存储目录（默认 JARVIS_ARTIFACT_STORE_DIR 或 ./memory/artifact_store）
+            dedupe: copy / link / sandbox（默认 JARVIS_ARTIFACT_DEDUPE 或 copy）
+            max_workers: 并行哈希的线程数（默认 min(8, CPU 数)）
+        """
+        if root is None:
+            root = os.getenv("JARVIS_ARTIFACT_STORE_DIR", "./memory/artifact_store")
+        self.root = Path(root).resolve()
+        self.objects_dir = self.root / "objects"
+        self.index_path = self.root / "index.json"
+        self.journal_path = self.root / "index.journal"
+        self.dedupe = dedupe or os.getenv("JARVIS_ARTIFACT_DEDUPE", DEDUPE_COPY)
+        self.max_workers = max_workers or min(8, os.cpu_count() or 1)
+        self._lock = threading.Lock()
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self._objects: Dict[str, Dict[str, int]] = {}
+        self._paths: Dict[str, List] = {}
+        self._journal_lines = 0
+        self._load_index()
+
+    # ------------------------------------------------------------------
+    # 索引
+    # ------------------------------------------------------------------
+
+    def _load_index(self) -> None:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            data = {"version": INDEX_VERSION}
+        if data.get("version") != INDEX_VERSION:
+            return
+        self._objects = data.get("objects", {})
+        self._paths = data.get("paths", {})
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as handle:
+                for line in handle:
+                    try:
+                        change = json.loads(line)
+                    except ValueError:
+                        break  # 写到一半的末行
+                    self._apply_change(change)
+                    self._journal_lines += 1
+        except OSError:
+            pass
+
+    def _apply_change(self, change: Dict[str, Dict]) -> None:
+        for table, values in ((self._objects, change.get("objects", {})), (self._paths, change.get("paths", {}))):
+            for key, value in values.items():
+                if value is None:
+                    table.pop(key, None)
+                else:
+                    table[key] = value
+
+    def _record(self, digests: Iterable[str], paths: Iterable[str]) -> None:
+        """把变更的对象与路径追加到日志（调用方持有锁）；日志过长时合并进 index.json。"""
+        change = {
+            "objects": {digest: self._objects.get(digest) for digest in digests},
+            "paths": {path: self._paths.get(path) for path in paths},
+        }
+        if not change["objects"] and not change["paths"]:
+            return
+        if self._journal_lines >= JOURNAL_COMPACT_LINES:
+            self._save_index()
+            return
+        with open(self.journal_path, "a", encoding="utf-8") as handle:
+            handle.write(json.dumps(change) + "\n")
+        self._journal_lines += 1
+
+    def _save_index(self) -> None:
+        """写入完整索引并清空日志（调用方持有锁）。"""
+        tmp_path = self.index_path.with_name(f"{self.index_path.name}.{uuid.uuid4().hex}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(
+                {"version": INDEX_VERSION, "hash": HASH_NAME, "objects": self._objects, "paths": self._paths},
+                handle,
+            )
+        os.replace(tmp_path, self.index_path)
+        # 日志中的变更都是绝对值，替换后、删除前崩溃时重放也不会出错
+        try:
+            os.unlink(self.journal_path)
+        except FileNotFoundError:
+            pass
+        self._journal_lines = 0
+
+    def object_path(self, digest: str) -> Path:
+        """对象文件路径。"""
+        return self.objects_dir / digest[:2] / digest
+
+    # ------------------------------------------------------------------
+    # 入库
+    # ------------------------------------------------------------------
+
+    def _add_object(self, source: str, digest: str) -> bool:
+        """把文件内容加入对象库（已存在时返回 False）。"""
+        target = self.object_path(digest)
+        if target.exists():
+            return False
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if self.dedupe in (DEDUPE_LINK, DEDUPE_SANDBOX):
+            try:
+                os.link(source, target)
+                return True
+            except FileExistsError:
+                return False
+            except OSError:
+                pass  # 跨文件系统或不支持硬链接：退回复制
+        tmp_path = target.with_name(f"{digest}.{uuid.uuid4().hex}.tmp")
+        try:
+            clone_file(source, str(tmp_path))
+            os.replace(tmp_path, target)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        return True
+
+    def _link_to_object(self, path: str, digest: str) -> int:
+        """把沙箱文件替换为指向对象的硬链接，返回节省的字节数。"""
+        target = self.object_path(digest)
+        try:
+            source_stat = os.stat(path)
+            target_stat = os.stat(target)
+        except OSError:
+            return 0
+        if source_stat.st_ino == target_stat.st_ino and source_stat.st_dev == target_stat.st_dev:
+            return 0
+        tmp_path = f"{path}.{uuid.uuid4().hex}.link"
+        try:
+            os.link(target, tmp_path)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            return 0
+        return source_stat.st_size
+
+    def _evict_if_mutated(self, path: str, stat: os.stat_result, dirty_digests: set, dirty_paths: set) -> None:
+        """路径与某对象共享 inode 且内容已变：该对象已被就地改写。
+
+        先释放该路径的引用；对象仍有引用时，从内容未变（stat 与入库时一致）的其他路径
+        恢复对象，找不到则移出存储，并丢弃其余路径的索引（下次入库时重新计算摘要）。
+        """
+        cached = self._paths.get(path)
+        if not cached or cached[:2] != [stat.st_dev, stat.st_ino]:
+            return
+        old_digest = cached[4]
+        entry = self._objects.get(old_digest)
+        if not entry or entry.get("ino") != stat.st_ino:
+            return
+        del self._paths[path]
+        dirty_paths.add(path)
+        self._release_locked(old_digest)
+        dirty_digests.add(old_digest)
+        if entry["refs"] <= 0:
+            return  # 无其他引用，由 gc 删除
+        holders = [other for other, value in self._paths.items() if value[4] == old_digest]
+        for other in holders:
+            try:
+                other_stat = os.stat(other)
+            except OSError:
+                continue
+            if _stat_key(other_stat) != self._paths[other][:4] or other_stat.st_ino == stat.st_ino:
+                continue
+            if self._replace_object(other, old_digest):
+                return
+        try:
+            os.unlink(self.object_path(old_digest))
+        except OSError:
+            pass
+        del self._objects[old_digest]
+        for other in holders:
+            del self._paths[other]
+        dirty_paths.update(holders)
+
+    def _replace_object(self, source: str, digest: str) -> bool:
+        """用 source 的内容重建对象文件，返回是否成功。"""
+        target = self.object_path(digest)
+        tmp_path = target.with_name(f"{digest}.{uuid.uuid4().hex}.tmp")
+        try:
+            if self.dedupe in (DEDUPE_LINK, DEDUPE_SANDBOX):
+                try:
+                    os.link(source, tmp_path)
+                except OSError:
+                    clone_file(source, str(tmp_path))
+            else:
+                clone_file(source, str(tmp_path))
+            os.replace(tmp_path, target)
+            self._objects[digest]["ino"] = os.stat(target).st_ino
+        except OSError:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            return False
+        return True
+
+    def ingest(self, paths: Iterable[str]) -> Dict[str, Dict[str, object]]:
+        """把产物文件加入存储。
+
+        每个路径对其当前内容的对象持有一个引用：新路径引用 +1，内容变化的路径
+        释放旧对象、引用新对象，内容未变的路径计数不变。
+
+        stat（设备、inode、大小、mtime）与上次入库相同的文件直接复用摘要；
+        其余文件在线程池中并行计算 BLAKE2b。
+
+        Args:
+            paths: 产物文件路径（不存在或不是普通文件的跳过）
+
+        Returns:
+            {绝对路径: {'digest', 'size', 'status': stored|deduped|unchanged, 'bytes_saved'}}
+        """
+        stats = {}
+        for path in dict.fromkeys(os.path.abspath(str(p)) for p in paths):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if os.path.isfile(path):
+                stats[path] = stat
+
+        known: Dict[str, str] = {}
+        with self._lock:
+            for path, stat in stats.items():
+                cached = self._paths.get(path)
+                if cached and cached[:4] == _stat_key(stat) and cached[4] in self._objects:
+                    known[path] = cached[4]
+        to_hash = [path for path in stats if path not in known]
+        digests: Dict[str, Optional[str]] = {}
+        if len(to_hash) > 1 and self.max_workers > 1:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(to_hash))) as pool:
+                for path, digest in zip(to_hash, pool.map(self._safe_hash, to_hash)):
+                    digests[path] = digest
+        else:
+            digests = {path: self._safe_hash(path) for path in to_hash}
+
+        results: Dict[str, Dict[str, object]] = {}
+        with self._lock:
+            dirty_digests: set = set()
+            dirty_paths: set = set()
+            for path, stat in stats.items():
+                if path in known:
+                    # stat 未变：内容与引用都不变
+                    results[path] = {
+                        "digest": known[path],
+                        "size": stat.st_size,
+                        "status": STATUS_UNCHANGED,
+                        "bytes_saved": 0,
+                    }
+                    continue
+                digest = digests.get(path)
+                if digest is None:
+                    continue
+                self._evict_if_mutated(path, stat, dirty_digests, dirty_paths)
+                previous = (self._paths.get(path) or [None] * 5)[4]
+                try:
+                    added = self._add_object(path, digest)
+                except OSError:
+                    continue
+                saved = 0
+                if not added and self.dedupe == DEDUPE_SANDBOX:
+                    saved = self._link_to_object(path, digest)
+                if previous == digest:
+                    status = STATUS_UNCHANGED
+                else:
+                    status = STATUS_STORED if added else STATUS_DEDUPED
+                try:
+                    object_stat = os.stat(self.object_path(digest))
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entry = self._objects.setdefault(digest, {"size": stat.st_size, "refs": 0})
+                entry["ino"] = object_stat.st_ino
+                if previous != digest:
+                    # 每个路径只引用其当前内容的对象
+                    if previous is not None:
+                        self._release_locked(previous)
+                        dirty_digests.add(previous)
+                    entry["refs"] += 1
+                dirty_digests.add(digest)
+                self._paths[path] = _stat_key(stat) + [digest]
+                dirty_paths.add(path)
+                results[path] = {
+                    "digest": digest,
+                    "size": stat.st_size,
+                    "status": status,
+                    "bytes_saved": saved,
+                }
+            self._record(dirty_digests, dirty_paths)
+        return results
+
+    @staticmethod
+    def _safe_hash(path: str) -> Optional[str]:
+        try:
+            return hash_file(path)
+        except OSError:
+            return None
+
+    # ------------------------------------------------------------------
+    # 查询与维护
+    # ------------------------------------------------------------------
+
+    def refcount(self, digest: str) -> int:
+        """对象的引用计数（不存在时为 0）。"""
+        with self._lock:
+            return self._objects.get(digest, {}).get("refs", 0)
+
+    def shares_inode(self, path: str, stat: os.stat_result) -> bool:
+        """文件是否与存储中的对象共享 inode（link/sandbox 方式入库的产物）。
+
+        这样的文件不能就地改写，否则对象内容会一起改变；写入方应替换文件。
+
+        Args:
+            path: 文件路径
+            stat: 该文件当前的 os.stat 结果
+        """
+        with self._lock:
+            cached = self._paths.get(os.path.abspath(path))
+            if not cached or cached[:2] != [stat.st_dev, stat.st_ino]:
+                return False
+            return self._objects.get(cached[4], {}).get("ino") == stat.st_ino
+
+    def verify(self, digest: str) -> bool:
+        """重新计算对象摘要，确认内容未被改动。"""
+        try:
+            return hash_file(str(self.object_path(digest))) == digest
+        except OSError:
+            return False
+
+    def release(self, digest: str) -> int:
+        """引用计数 -1，返回剩余计数（计数为 0 的对象由 gc 删除）。"""
+        with self._lock:
+            remaining = self._release_locked(digest)
+            self._record([digest], [])
+            return remaining
+
+    def _release_locked(self, digest: str) -> int:
+        entry = self._objects.get(digest)
+        if entry is None:
+            return 0
+        entry["refs"] = max(0, entry["refs"] - 1)
+        return entry["refs"]
+
+    def prune(self) -> Dict[str, int]:
+        """释放已删除或已不是普通文件的产物路径的引用，再删除无引用的对象。
+
+        Returns:
+            {'released': 释放的路径数, 'removed': 删除的对象数}
+        """
+        with self._lock:
+            missing = [path for path in self._paths if not os.path.isfile(path)]
+            digests = [self._paths.pop(path)[4] for path in missing]
+            for digest in digests:
+                self._release_locked(digest)
+            self._record(digests, missing)
+        return {"released": len(missing), "removed": self.gc()}
+
+    def gc(self) -> int:
+        """删除引用计数为 0 的对象，返回删除的对象数（同时合并日志）。"""
+        removed = 0
+        with self._lock:
+            for digest in [d for d, entry in self._objects.items() if entry["refs"] <= 0]:
+                try:
+                    os.unlink(self.object_path(digest))
+                except FileNotFoundError:
+                    pass
+                del self._objects[digest]
+                removed += 1
+            self._paths = {path: entry for path, entry in self._paths.items() if entry[4] in self._objects}
+            if removed or self._journal_lines:
+                self._save_index()
+        return removed
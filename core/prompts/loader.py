@@ -1,7 +1,7 @@
 """Prompt loader for centralized prompt management."""
 import re
 from pathlib import Path
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, Tuple
 
 try:
     import yaml
@@ -16,6 +16,9 @@ class PromptLoader:
     从 prompts/ 目录加载 prompt 文件，支持变量替换和结构化解析。
     """
     
+    # parse() 结果缓存（进程级）：{prompt_path: (mtime_ns, size, parsed)}
+    _parse_cache: Dict[str, Tuple[int, int, Dict[str, Any]]] = {}
+    
     def __init__(self, project_root: Optional[str] = None):
         """初始化 PromptLoader。
         
@@ -119,7 +122,15 @@ class PromptLoader:
             FileNotFoundError: 如果文件不存在
             ValueError: 如果缺少必需的 system 分段
         """
-        raw_text = self.load_raw(prompt_id)
+        prompt_path = self._get_prompt_path(prompt_id)
+        stat = prompt_path.stat()
+        cache_key = str(prompt_path)
+        cached = self._parse_cache.get(cache_key)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            parsed = cached[2]
+            return {"meta": dict(parsed["meta"]), "sections": dict(parsed["sections"])}
+        
+        raw_text = prompt_path.read_text(encoding="utf-8")
         
         # 解析 frontmatter
         meta = {}
@@ -152,10 +163,12 @@ class PromptLoader:
                 f"Prompt {prompt_id} 缺少必需的 '## system' 分段"
             )
         
-        return {
+        parsed = {
             "meta": meta,
             "sections": sections,
         }
+        self._parse_cache[cache_key] = (stat.st_mtime_ns, stat.st_size, parsed)
+        return {"meta": dict(meta), "sections": dict(sections)}
     
     def _parse_frontmatter_minimal(self, frontmatter_text: str) -> Dict[str, Any]:
         """最小化解析 YAML frontmatter（不依赖 yaml 库）。
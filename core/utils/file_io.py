@@ -0,0 +1,154 @@
+"""Dedicated executor for blocking file-system calls."""
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+
+# 文件 I/O 线程池默认大小（环境变量 JARVIS_FILE_IO_WORKERS 可覆盖）
+DEFAULT_FILE_IO_WORKERS = 8
+
+# 写入持久化模式：none 只保证原子替换；fsync 每个文件写入后立即 fsync 文件与目录；
+# group 同一批写入在结束时一起 fsync 后再替换，目录每个只 fsync 一次
+DURABILITY_NONE = "none"
+DURABILITY_FSYNC = "fsync"
+DURABILITY_GROUP = "group"
+DURABILITY_MODES = (DURABILITY_NONE, DURABILITY_FSYNC, DURABILITY_GROUP)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def file_io_workers() -> int:
+    """文件 I/O 线程池大小。"""
+    try:
+        return max(1, int(os.getenv("JARVIS_FILE_IO_WORKERS", DEFAULT_FILE_IO_WORKERS)))
+    except ValueError:
+        return DEFAULT_FILE_IO_WORKERS
+
+
+def file_io_executor() -> ThreadPoolExecutor:
+    """进程内共享的文件 I/O 线程池（首次使用时创建）。
+
+    与事件循环的默认执行器分开：大量文件读写不会占满 asyncio.to_thread
+    使用的线程，反之亦然；线程数有上限，不会因并发步骤过多而无限增长。
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=file_io_workers(), thread_name_prefix="file-io")
+        return _executor
+
+
+def file_durability() -> str:
+    """默认写入持久化模式（环境变量 JARVIS_FILE_DURABILITY，默认 none）。
+
+    Raises:
+        ValueError: 取值不是 none/fsync/group（拼写错误不应静默降级为不持久化）
+    """
+    mode = os.getenv("JARVIS_FILE_DURABILITY", DURABILITY_NONE).strip().lower() or DURABILITY_NONE
+    if mode not in DURABILITY_MODES:
+        raise ValueError(f"JARVIS_FILE_DURABILITY 必须是 {'/'.join(DURABILITY_MODES)} 之一: {mode}")
+    return mode
+
+
+def fsync_file(path: Any) -> None:
+    """把文件内容刷到磁盘。"""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def fsync_directories(directories: Iterable[Any]) -> None:
+    """fsync 目录，使其中新建、替换的目录项持久化（每个目录只处理一次）。"""
+    for directory in dict.fromkeys(str(directory) for directory in directories):
+        fsync_file(directory)
+
+
+async def run_file_io(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """在文件 I/O 线程池中执行阻塞调用。"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(file_io_executor(), functools.partial(func, *args, **kwargs))
+
+
+class WriteCoalescer:
+    """合并小文件写入：同一轮事件循环中提交的写入合并为一次线程池任务。
+
+    并发步骤各自写一个小文件时，逐个提交会为每个文件付出一次线程切换与回调；
+    合并后一个任务按提交顺序依次写入，再一并唤醒等待方。单个写入失败只影响
+    它自己的结果。等待方被取消时，已提交的写入仍会完成。
+    """
+
+    def __init__(
+        self,
+        write: Callable[..., Any],
+        max_batch: int = 64,
+        commit: Optional[Callable[[List[Any]], None]] = None,
+    ):
+        """初始化。
+
+        Args:
+            write: 执行单个写入的阻塞函数
+            max_batch: 单个任务最多合并的写入数
+            commit: 一批写入执行完后在同一任务中调用（如组提交 fsync），参数为各成功写入的
+                返回值；抛出异常时这些写入都以该异常失败
+        """
+        self._write = write
+        self.max_batch = max_batch
+        self._commit = commit
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: List[Tuple[tuple, asyncio.Future]] = []
+
+    async def write(self, *args: Any) -> Any:
+        """提交一个写入并等待完成，返回写入函数的结果。"""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._pending = []
+        future = loop.create_future()
+        self._pending.append((args, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif len(self._pending) == 1:
+            # 本轮事件循环中其余协程提交的写入会进入同一批
+            loop.call_soon(self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        def run() -> List[Tuple[bool, Any]]:
+            outcomes = []
+            for args, _ in batch:
+                try:
+                    outcomes.append((True, self._write(*args)))
+                except Exception as e:
+                    outcomes.append((False, e))
+            if self._commit is not None:
+                try:
+                    self._commit([value for ok, value in outcomes if ok])
+                except Exception as e:
+                    outcomes = [(False, e) if ok else (ok, value) for ok, value in outcomes]
+            return outcomes
+
+        def settle(task: asyncio.Future) -> None:
+            error = task.exception() if not task.cancelled() else asyncio.CancelledError()
+            for index, (_, future) in enumerate(batch):
+                if future.done():
+                    continue
+                if error is not None:
+                    future.set_exception(error)
+                    continue
+                ok, value = task.result()[index]
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+
+        self._loop.run_in_executor(file_io_executor(), run).add_done_callback(settle)
@@ -0,0 +1,102 @@
+"""Bounded streaming capture of subprocess output."""
+import asyncio
+import codecs
+from typing import BinaryIO, Optional
+
+
+# 每次从管道读取的块大小
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class BoundedCapture:
+    """固定内存的输出捕获。
+
+    保留输出开头 head_bytes 与末尾 tail_bytes（环形缓冲），统计总字节数；
+    可选把完整输出写入 spill 文件。无论输出多大，内存占用恒定。
+    """
+
+    def __init__(self, head_bytes: int, tail_bytes: int, spill_path: Optional[str] = None):
+        """初始化。
+
+        Args:
+            head_bytes: 保留的开头字节数
+            tail_bytes: 保留的末尾字节数
+            spill_path: 完整输出写入的文件路径（None 表示不写）
+        """
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.spill_path = spill_path
+        self.total_bytes = 0
+        self._head = bytearray()
+        self._tail = bytearray()
+        self._spill: Optional[BinaryIO] = open(spill_path, "wb") if spill_path else None
+
+    @property
+    def truncated(self) -> bool:
+        """是否有输出被省略。"""
+        return self.total_bytes > len(self._head) + len(self._tail)
+
+    def feed(self, data: bytes) -> None:
+        """追加一块输出。"""
+        if not data:
+            return
+        self.total_bytes += len(data)
+        if self._spill is not None:
+            self._spill.write(data)
+        room = self.head_bytes - len(self._head)
+        if room > 0:
+            self._head += data[:room]
+            data = data[room:]
+        if not data or self.tail_bytes <= 0:
+            return
+        if len(data) >= self.tail_bytes:
+            self._tail[:] = data[-self.tail_bytes:]
+        else:
+            self._tail += data
+            overflow = len(self._tail) - self.tail_bytes
+            if overflow > 0:
+                del self._tail[:overflow]
+
+    def close(self) -> None:
+        """关闭 spill 文件（可重复调用）。"""
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+    def text(self, encoding: str = "utf-8") -> str:
+        """解码后的输出；有省略时在开头与末尾之间插入说明。
+
+        截断处被切开的多字节字符会被丢弃，而不是显示为替换字符。
+        """
+        if not self.truncated:
+            return bytes(self._head + self._tail).decode(encoding, errors="replace")
+        head = codecs.getincrementaldecoder(encoding)(errors="replace").decode(bytes(self._head))
+        tail = bytes(self._tail)
+        if encoding.replace("-", "").lower() == "utf8":
+            # 跳过开头残缺字符的后续字节（0b10xxxxxx）
+            skip = 0
+            while skip < min(3, len(tail)) and tail[skip] & 0xC0 == 0x80:
+                skip += 1
+            tail = tail[skip:]
+        omitted = self.total_bytes - len(self._head) - len(self._tail)
+        return (
+            f"{head}\n... (截断，共 {self.total_bytes} 字节，省略中间 {omitted} 字节) ...\n"
+            f"{tail.decode(encoding, errors='replace')}"
+        )
+
+
+async def drain_stream(reader: asyncio.StreamReader, capture: BoundedCapture) -> int:
+    """从流中分块读取直到 EOF，写入 capture。
+
+    Args:
+        reader: 子进程的 stdout/stderr 流
+        capture: 输出捕获
+
+    Returns:
+        读取的总字节数
+    """
+    while True:
+        chunk = await reader.read(READ_CHUNK_SIZE)
+        if not chunk:
+            return capture.total_bytes
+        capture.feed(chunk)
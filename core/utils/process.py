@@ -0,0 +1,225 @@
+"""Subprocess helpers."""
+import asyncio
+import os
+import signal
+import subprocess
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+
+# 不支持 pidfd 时轮询子进程是否退出的间隔（秒）：从最短开始，逐次加倍到最长
+REAP_POLL_MIN = 0.005
+REAP_POLL_MAX = 0.1
+
+# 启动失败后在后台回收的子进程（保持任务引用，避免被回收）
+_background_reaps: Set[asyncio.Future] = set()
+
+
+def kill_process_group(pid: int) -> None:
+    """终止进程所在的整个进程组（子进程需以 start_new_session=True 启动）。
+
+    脚本派生的孙进程也会一起终止；进程已退出时忽略。
+
+    Args:
+        pid: 进程组长的 PID
+    """
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(pid, signal.SIGKILL)
+        else:  # pragma: no cover - Windows 没有进程组信号
+            os.kill(pid, signal.SIGTERM)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def rusage_fields(rusage: Any) -> Dict[str, float]:
+    """resource.struct_rusage 中用于资源统计的字段。"""
+    return {
+        "utime": rusage.ru_utime,
+        "stime": rusage.ru_stime,
+        "maxrss": rusage.ru_maxrss,
+        "inblock": rusage.ru_inblock,
+        "oublock": rusage.ru_oublock,
+    }
+
+
+async def pipe_reader(pipe: Any):
+    """把管道读端（二进制文件对象）接入事件循环，返回 (StreamReader, transport)。
+
+    接入失败时关闭 pipe。
+    """
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    try:
+        transport, _ = await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(reader), pipe
+        )
+    except BaseException:
+        pipe.close()
+        raise
+    return reader, transport
+
+
+async def wait4(pid: int) -> Tuple[int, Any]:
+    """等待子进程退出并以 os.wait4 回收，不占用线程。
+
+    Linux 5.3+ 经 pidfd 接入事件循环，进程退出时立即回收；其他平台以逐渐加长的
+    间隔轮询 os.wait4(pid, WNOHANG)。
+
+    Args:
+        pid: 本进程的子进程 PID
+
+    Returns:
+        (wait 状态, resource.struct_rusage)
+
+    Raises:
+        ChildProcessError: 该进程已被其他地方回收
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def poll() -> bool:
+        if future.done():
+            return True
+        try:
+            reaped, status, rusage = os.wait4(pid, os.WNOHANG)
+        except ChildProcessError as e:
+            future.set_exception(e)
+            return True
+        if reaped == 0:
+            return False
+        future.set_result((status, rusage))
+        return True
+
+    pidfd = None
+    if hasattr(os, "pidfd_open"):
+        try:
+            pidfd = os.pidfd_open(pid)
+        except OSError:
+            pidfd = None  # 内核不支持或进程已被回收：轮询
+    timer = None
+    try:
+        if pidfd is not None:
+            loop.add_reader(pidfd, poll)
+            poll()  # 注册前可能已退出
+        else:
+            delay = REAP_POLL_MIN
+
+            def schedule() -> None:
+                nonlocal timer, delay
+                if not poll():
+                    timer = loop.call_later(delay, schedule)
+                    delay = min(delay * 2, REAP_POLL_MAX)
+
+            schedule()
+        return await future
+    finally:
+        if pidfd is not None:
+            loop.remove_reader(pidfd)
+            os.close(pidfd)
+        if timer is not None:
+            timer.cancel()
+
+
+def _reap_in_background(popen: subprocess.Popen) -> None:
+    """在后台回收已终止的子进程（不在事件循环中阻塞等待）。"""
+    def done(task: asyncio.Future) -> None:
+        _background_reaps.discard(task)
+        if not task.cancelled() and task.exception() is None:
+            popen.returncode = os.waitstatus_to_exitcode(task.result()[0])
+
+    task = asyncio.ensure_future(wait4(popen.pid))
+    _background_reaps.add(task)
+    task.add_done_callback(done)
+
+
+def _abandon_spawned(spawning: asyncio.Future) -> None:
+    """终止并回收启动完成时已无人等待的子进程。"""
+    if spawning.cancelled() or spawning.exception() is not None:
+        return
+    popen = spawning.result()
+    popen.stdout.close()
+    popen.stderr.close()
+    kill_process_group(popen.pid)
+    _reap_in_background(popen)
+
+
+class ReapedProcess:
+    """由本进程以 os.wait4 回收的子进程（接口与 asyncio.subprocess.Process 的常用部分一致）。
+
+    回收时同时拿到内核记录的资源用量（rusage，含该进程已回收的子进程）；
+    被信号终止的进程同样有记录，且不依赖子进程自己上报。等待退出不占用线程（见 wait4）。
+    """
+
+    def __init__(self, popen: subprocess.Popen, stdout: asyncio.StreamReader,
+                 stderr: asyncio.StreamReader, transports: list):
+        self.pid = popen.pid
+        self.returncode: Optional[int] = None
+        self.rusage: Optional[Dict[str, float]] = None
+        self.stdout = stdout
+        self.stderr = stderr
+        self._popen = popen
+        self._transports = transports
+        # 立即开始等待，进程退出后马上回收，不留僵尸进程
+        self._exit_task = asyncio.ensure_future(self._reap())
+
+    async def _reap(self) -> int:
+        status, rusage = await wait4(self.pid)
+        self.returncode = os.waitstatus_to_exitcode(status)
+        self.rusage = rusage_fields(rusage)
+        # 已回收：Popen 不再尝试 waitpid
+        self._popen.returncode = self.returncode
+        return self.returncode
+
+    async def wait(self) -> int:
+        """等待进程退出，返回退出码（被信号终止时为负数）。"""
+        return await asyncio.shield(self._exit_task)
+
+    def close_pipes(self) -> None:
+        """关闭输出管道（进程被终止、不再读取输出时调用）。"""
+        for transport in self._transports:
+            transport.close()
+
+
+async def spawn_reaped(command: Sequence[str], cwd: str, env: Dict[str, str]) -> ReapedProcess:
+    """在独立进程组中启动子进程，stdout/stderr 为管道（fork/exec 在线程池中进行）。
+
+    Args:
+        command: argv 列表
+        cwd: 工作目录
+        env: 完整的环境变量
+
+    Returns:
+        ReapedProcess
+
+    Raises:
+        OSError: 无法启动
+    """
+    spawning = asyncio.ensure_future(asyncio.to_thread(
+        subprocess.Popen,
+        list(command),
+        cwd=cwd,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        start_new_session=True,
+    ))
+    try:
+        popen = await asyncio.shield(spawning)
+    except asyncio.CancelledError:
+        # 取消时子进程可能仍在启动：启动完成后终止并回收
+        spawning.add_done_callback(_abandon_spawned)
+        raise
+    transports: List[asyncio.BaseTransport] = []
+    try:
+        stdout, stdout_transport = await pipe_reader(popen.stdout)
+        transports.append(stdout_transport)
+        stderr, stderr_transport = await pipe_reader(popen.stderr)
+        transports.append(stderr_transport)
+    except BaseException:
+        for transport in transports:
+            transport.close()
+        popen.stderr.close()
+        kill_process_group(popen.pid)
+        _reap_in_background(popen)
+        raise
+    return ReapedProcess(popen, stdout, stderr, transports)
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+重文件写入计划下服务端的响应延迟。
+
+Web 服务端（apps/web/api_server.py）在同一个事件循环中处理 WebSocket 消息与
+执行计划步骤；FileTool 若在协程中直接做阻塞文件 I/O，期间所有 WebSocket 的
+ping/pong 都会被推迟。本脚本在同一事件循环中运行：
+
+- 一个 ping/pong 服务（与 /ws 的 ping 处理相同：收到一行即回复一行，
+  使用 TCP 行协议代替 WebSocket 帧，省去 fastapi/uvicorn 依赖）
+- 一个重文件写入计划（batch 步骤写入大量小文件 + 若干大文件步骤，经 ToolRunner.run_plan 并行执行）
+
+客户端在独立进程中每 2ms 发送一次 ping，直到计划执行完毕，统计往返延迟。分别测量：
+空闲、inline（文件 I/O 在事件循环线程中执行，即改动前的行为）、
+executor（专用文件 I/O 线程池 + 小文件写入合并）。
+
+用法：
+    python scripts/bench_file_io_latency.py [--small 2000] [--batch-size 50] [--large 24] [--large-mb 32]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import tools.local.file_tool as file_tool_module  # noqa: E402
+from core.contracts.skill import PlanStep  # noqa: E402
+from tools.local.file_tool import FileTool  # noqa: E402
+from tools.runner import ToolRunner  # noqa: E402
+
+CLIENT = """
+import json, socket, sys, time
+sock = socket.create_connection(("127.0.0.1", int(sys.argv[1])))
+reader = sock.makefile("rb")
+samples = []
+while True:
+    started = time.perf_counter()
+    try:
+        sock.sendall(b"ping\\n")
+    except OSError:
+        break
+    if not reader.readline():
+        break
+    samples.append((time.perf_counter() - started) * 1000)
+    time.sleep(0.002)
+print(json.dumps(samples))
+"""
+
+
+class _PongServer:
+    """收到一行即回复一行；stop() 后断开连接，客户端随之结束。"""
+
+    def __init__(self):
+        self.connected = asyncio.Event()
+        self.stopping = asyncio.Event()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connected.set()
+        while not self.stopping.is_set() and await reader.readline():
+            writer.write(b"pong\n")
+            await writer.drain()
+        writer.close()
+
+
+def _plan(small: int, batch_size: int, large: int, large_mb: int) -> List[PlanStep]:
+    # 小文件按 batch_size 合并为 batch 步骤，大文件步骤均匀穿插其间
+    small_content = "x" * 4096
+    large_content = "y" * (large_mb * 1024 * 1024)
+    batches = [
+        PlanStep(f"b{start}", "file", "small batch", params={
+            "operation": "batch",
+            "operations": [
+                {"operation": "write", "path": f"small/{index}.txt", "content": small_content}
+                for index in range(start, min(small, start + batch_size))
+            ],
+        })
+        for start in range(0, small, batch_size)
+    ]
+    larges = [
+        PlanStep(f"l{index}", "file", "large", params={
+            "operation": "write", "path": f"large/{index}.txt", "content": large_content,
+        })
+        for index in range(large)
+    ]
+    steps = []
+    while batches or larges:
+        if batches:
+            steps.append(batches.pop(0))
+        if larges:
+            steps.append(larges.pop(0))
+    return steps
+
+
+async def _measure(sandbox: Path, steps: List[PlanStep], idle_seconds: float) -> Dict[str, float]:
+    pong = _PongServer()
+    server = await asyncio.start_server(pong.handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    client = await asyncio.create_subprocess_exec(
+        sys.executable, "-c", CLIENT, str(port), stdout=asyncio.subprocess.PIPE,
+    )
+    await pong.connected.wait()
+    makespan = 0.0
+    if steps:
+        tool = FileTool(sandbox_root=str(sandbox))
+        runner = ToolRunner()
+        started = time.perf_counter()
+        await runner.run_plan(steps, lambda tool_id: tool, max_parallel=8)
+        makespan = (time.perf_counter() - started) * 1000
+    else:
+        await asyncio.sleep(idle_seconds)
+    pong.stopping.set()
+    output, _ = await client.communicate()
+    server.close()
+    await server.wait_closed()
+    samples = sorted(json.loads(output))
+    return {
+        "p50": statistics.median(samples),
+        "p99": samples[max(0, int(len(samples) * 0.99) - 1)],
+        "pings": len(samples),
+        "max": samples[-1],
+        "makespan": makespan,
+    }
+
+
+async def _inline_io(func, *args, **kwargs):
+    return func(*args, **kwargs)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="重文件写入计划下服务端 ping/pong 延迟")
+    parser.add_argument("--small", type=int, default=2000, help="4 KiB 小文件数")
+    parser.add_argument("--batch-size", type=int, default=50, help="每个 batch 步骤的小文件数")
+    parser.add_argument("--large", type=int, default=24, help="大文件数")
+    parser.add_argument("--large-mb", type=int, default=32, help="大文件大小（MB）")
+    parser.add_argument("--idle-seconds", type=float, default=1.0, help="空闲基线的测量时长")
+    args = parser.parse_args()
+
+    steps = _plan(args.small, args.batch_size, args.large, args.large_mb)
+    print(
+        f"计划：{len(steps)} 个步骤（{args.small} x 4 KiB 分 {args.batch_size} 个一批，"
+        f"{args.large} x {args.large_mb} MB），max_parallel=8\n"
+    )
+    print(f"{'mode':<10} {'pings':>6} {'p50':>8} {'p99':>8} {'max':>8} {'makespan':>10}")
+    original_run, original_write = file_tool_module.run_file_io, file_tool_module.WriteCoalescer.write
+    for mode in ("idle", "inline", "executor"):
+        with tempfile.TemporaryDirectory() as sandbox:
+            if mode == "inline":
+                # 改动前的行为：文件 I/O 直接在事件循环线程中执行
+                file_tool_module.run_file_io = _inline_io
+                file_tool_module.WriteCoalescer.write = lambda self, *a: _inline_io(self._write, *a)
+            result = asyncio.run(_measure(Path(sandbox), [] if mode == "idle" else steps, args.idle_seconds))
+            if mode == "inline":
+                file_tool_module.run_file_io = original_run
+                file_tool_module.WriteCoalescer.write = original_write
+        print(
+            f"{mode:<10} {result['pings']:>6} {result['p50']:>6.2f}ms {result['p99']:>6.2f}ms {result['max']:>6.1f}ms "
+            f"{result['makespan']:>8.0f}ms"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
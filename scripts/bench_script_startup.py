@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+技能脚本启动耗时基准：对比 `python script.py` 与字节码缓存引导执行。
+
+对 skills_workspace/*/scripts/*.py 中的每个脚本（不带参数，在临时目录中运行），
+分别测量直接执行与经由预编译字节码执行的子进程耗时（中位数）。
+
+用法：
+    python scripts/bench_script_startup.py [--runs 15]
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from skills.bytecode import launch_command, precompile_script  # noqa: E402
+
+
+def _run_ms(cmd: List[str], cwd: str) -> float:
+    started = time.perf_counter()
+    subprocess.run(cmd, cwd=cwd, capture_output=True)
+    return (time.perf_counter() - started) * 1000
+
+
+def _compare_ms(direct: List[str], cached: List[str], cwd: str, runs: int) -> Tuple[float, float]:
+    """交替运行两种方式，减少机器负载漂移的影响；返回各自的中位数。"""
+    direct_samples, cached_samples = [], []
+    for _ in range(runs):
+        direct_samples.append(_run_ms(direct, cwd))
+        cached_samples.append(_run_ms(cached, cwd))
+    return statistics.median(direct_samples), statistics.median(cached_samples)
+
+
+def _synthetic_script(directory: str, lines: int) -> Path:
+    """生成一个较大的脚本（大量函数定义），用于观察编译耗时占比。"""
+    body = [f"def f{i}(x):\n    return [x * {i} for _ in range(3)]\n" for i in range(lines // 2)]
+    path = Path(directory) / f"synthetic_{lines}.py"
+    path.write_text("".join(body) + "print(f1(2))\n", encoding="utf-8")
+    return path
+
+
+def _compile_ms(script: Path, runs: int) -> float:
+    source = script.read_bytes()
+    started = time.perf_counter()
+    for _ in range(runs):
+        compile(source, str(script), "exec")
+    return (time.perf_counter() - started) * 1000 / runs
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="技能脚本启动耗时基准")
+    parser.add_argument("--runs", type=int, default=15)
+    parser.add_argument("--workspace", default=str(ROOT / "skills_workspace"))
+    parser.add_argument("--synthetic-lines", type=int, default=5000, help="额外测量的合成脚本行数（0 表示不测）")
+    args = parser.parse_args()
+
+    scripts = sorted(Path(args.workspace).glob("*/scripts/*.py"))
+    if not scripts:
+        print("未找到技能脚本")
+        return 1
+
+    with tempfile.TemporaryDirectory() as cache_root, tempfile.TemporaryDirectory() as cwd:
+        if args.synthetic_lines:
+            scripts.append(_synthetic_script(cache_root, args.synthetic_lines))
+        interpreter_ms = statistics.median(
+            _run_ms([sys.executable, "-c", "pass"], cwd) for _ in range(args.runs)
+        )
+        print(f"解释器空启动: {interpreter_ms:.1f} ms（runs={args.runs}）\n")
+        print(f"{'script':<40} {'compile':>9} {'direct':>9} {'cached':>9} {'saved':>8}")
+        total_direct = total_cached = 0.0
+        for script in scripts:
+            precompile_script(str(script), cache_root)
+            direct, cached = _compare_ms(
+                [sys.executable, str(script)],
+                launch_command(str(script), [], cache_root),
+                cwd,
+                args.runs,
+            )
+            try:
+                name = str(script.relative_to(Path(args.workspace)))
+                total_direct += direct
+                total_cached += cached
+            except ValueError:
+                name = f"{script.name} (合成)"
+            print(
+                f"{name:<40} {_compile_ms(script, args.runs):>7.2f}ms "
+                f"{direct:>7.1f}ms {cached:>7.1f}ms {direct - cached:>6.1f}ms"
+            )
+        print(f"\n技能脚本合计: 直接执行 {total_direct:.1f} ms，字节码缓存 {total_cached:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+技能工作空间扫描基准：对比串行 Path 扫描与 scandir 并行扫描。
+
+用法：
+    python scripts/bench_skill_scan.py [--skills 2000] [--assets 20] [--workers N]
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from skills.scanner import WorkspaceScanner, load_frontmatter  # noqa: E402
+
+
+def _make_workspace(root: Path, skills: int, assets: int) -> None:
+    for i in range(skills):
+        skill_dir = root / f"skill-{i:05d}"
+        for sub in ("scripts", "references", "assets/images"):
+            (skill_dir / sub).mkdir(parents=True, exist_ok=True)
+        (skill_dir / "SKILL.md").write_text(
+            f"---\nname: skill-{i:05d}\ndescription: benchmark skill {i}\n"
+            f"tags: [bench, t{i % 17}]\n---\n\n# Skill {i}\n\nSee references/guide.md.\n",
+            encoding="utf-8",
+        )
+        (skill_dir / "scripts" / "run.py").write_text("print('ok')\n", encoding="utf-8")
+        (skill_dir / "references" / "guide.md").write_text("# Guide\n", encoding="utf-8")
+        (skill_dir / "NOTES.md").write_text("notes\n", encoding="utf-8")
+        for j in range(assets):
+            (skill_dir / "assets" / "images" / f"a{j}.bin").write_bytes(b"x")
+
+
+def _legacy_scan(workspace: Path) -> Dict[str, float]:
+    """串行 Path 实现（与引入 WorkspaceScanner 之前的 scan_workspace 一致）。"""
+    timings = {"frontmatter_ms": 0.0, "discover_ms": 0.0}
+    started = time.perf_counter()
+    count = 0
+    for skill_dir in workspace.iterdir():
+        if not skill_dir.is_dir() or not (skill_dir / "SKILL.md").exists():
+            continue
+        t0 = time.perf_counter()
+        load_frontmatter(str(skill_dir / "SKILL.md"))
+        t1 = time.perf_counter()
+        discovered: Dict[str, List[Path]] = {"scripts": [], "references": [], "assets": [], "other_md": []}
+        for name in ("scripts", "references", "assets"):
+            subdir = skill_dir / name
+            if subdir.exists() and subdir.is_dir():
+                for file_path in subdir.rglob("*"):
+                    if file_path.is_file():
+                        discovered[name].append(file_path)
+        for file_path in skill_dir.iterdir():
+            if file_path.is_file() and file_path.suffix == ".md" and file_path.name != "SKILL.md":
+                discovered["other_md"].append(file_path)
+        t2 = time.perf_counter()
+        timings["frontmatter_ms"] += (t1 - t0) * 1000
+        timings["discover_ms"] += (t2 - t1) * 1000
+        count += 1
+    timings["wall_ms"] = (time.perf_counter() - started) * 1000
+    timings["skills"] = count
+    return timings
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="技能扫描基准")
+    parser.add_argument("--skills", type=int, default=2000)
+    parser.add_argument("--assets", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="jarvis_bench_skills_") as tmp:
+        workspace = Path(tmp)
+        print(f"生成工作空间: {args.skills} 个技能，每个 {args.assets} 个资源文件 ...")
+        _make_workspace(workspace, args.skills, args.assets)
+
+        legacy = _legacy_scan(workspace)
+        scanner = WorkspaceScanner(str(workspace), max_workers=args.workers)
+        scanner.scan()
+        parallel = scanner.last_timings
+
+    print("\n[串行 Path 扫描]")
+    for key in ("skills", "frontmatter_ms", "discover_ms", "wall_ms"):
+        value = legacy[key]
+        print(f"  {key:>15}: {value:.2f}" if isinstance(value, float) else f"  {key:>15}: {value}")
+    print("\n[scandir 并行扫描]")
+    for key, value in parallel.items():
+        print(f"  {key:>15}: {value}")
+    if parallel["wall_ms"]:
+        print(f"\n加速比: {legacy['wall_ms'] / parallel['wall_ms']:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+技能搜索基准：对比线性扫描与倒排索引的 search_by_keyword / search_by_tags。
+
+用法：
+    python scripts/bench_skill_search.py [--skills 10000] [--queries 200] [--words 3000]
+
+词表越小，每个查询命中的技能越多（--words 50 可模拟宽泛查询）。
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from core.contracts.skill import JarvisSkill  # noqa: E402
+from skills.search_index import SkillSearchIndex  # noqa: E402
+
+_SYLLABLES = ["ba", "co", "de", "fi", "ga", "ho", "ki", "lu", "ma", "no", "pe", "ri", "su", "ta", "vo", "xe"]
+_HANZI = "数据报告图表代码审查翻译摘要文章生成部署测试邮件视频图片表格合同会议计划客户财务"
+
+
+def _vocabulary(rng: random.Random, words: int, cjk_words: int):
+    latin = sorted({"".join(rng.choices(_SYLLABLES, k=rng.randint(2, 4))) for _ in range(words * 2)})
+    cjk = sorted({"".join(rng.sample(_HANZI, 2)) for _ in range(cjk_words * 3)})
+    return latin[:words], cjk[:cjk_words]
+
+
+def _make_skills(count: int, words: List[str], cjk: List[str], seed: int = 7) -> List[JarvisSkill]:
+    rng = random.Random(seed)
+    skills = []
+    for i in range(count):
+        picked = rng.sample(words, 6)
+        skills.append(
+            JarvisSkill(
+                skill_id=f"skill-{i:05d}",
+                name=f"{picked[0]}-{picked[1]}",
+                description=f"{' '.join(picked[2:])} {''.join(rng.sample(cjk, 3))}",
+                tags=[rng.choice(words), f"t{i % 97}"],
+                instructions_md="",
+            )
+        )
+    return skills
+
+
+def _legacy_keyword(skills: Dict[str, JarvisSkill], keyword: str) -> List[JarvisSkill]:
+    """线性实现（与引入倒排索引之前的 search_by_keyword 一致）。"""
+    keyword_lower = keyword.lower()
+    return [
+        skill for skill in skills.values()
+        if keyword_lower in skill.name.lower()
+        or keyword_lower in skill.description.lower()
+        or any(keyword_lower in tag.lower() for tag in skill.tags)
+    ]
+
+
+def _legacy_tags(skills: Dict[str, JarvisSkill], tags: List[str]) -> List[JarvisSkill]:
+    return [skill for skill in skills.values() if any(tag in skill.tags for tag in tags)]
+
+
+def _per_query_ms(func, queries) -> float:
+    started = time.perf_counter()
+    for query in queries:
+        func(query)
+    return (time.perf_counter() - started) * 1000 / max(1, len(queries))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="技能搜索基准")
+    parser.add_argument("--skills", type=int, default=10000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--words", type=int, default=3000, help="英文词表大小")
+    parser.add_argument("--cjk-words", type=int, default=300, help="中文词表大小")
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    words, cjk = _vocabulary(rng, args.words, args.cjk_words)
+    skills = {skill.skill_id: skill for skill in _make_skills(args.skills, words, cjk)}
+    keyword_queries = [
+        rng.choice([
+            rng.choice(words),
+            rng.choice(words)[:3],
+            rng.choice(cjk),
+            " ".join(rng.sample(words, 2)),
+        ])
+        for _ in range(args.queries)
+    ]
+    tag_queries = [[rng.choice(words), f"t{rng.randrange(97)}"] for _ in range(args.queries)]
+
+    started = time.perf_counter()
+    index = SkillSearchIndex()
+    index.rebuild(skills.values())
+    build_ms = (time.perf_counter() - started) * 1000
+
+    results = {
+        "legacy_keyword_ms": _per_query_ms(lambda q: _legacy_keyword(skills, q), keyword_queries),
+        "index_keyword_ms": _per_query_ms(lambda q: index.search(q), keyword_queries),
+        "index_keyword_top10_ms": _per_query_ms(lambda q: index.search(q, limit=10), keyword_queries),
+        "legacy_tags_ms": _per_query_ms(lambda t: _legacy_tags(skills, t), tag_queries),
+        "index_tags_ms": _per_query_ms(lambda t: index.search_tags(t), tag_queries),
+    }
+
+    print(f"技能数: {args.skills}，查询数: {args.queries}，建索引: {build_ms:.1f} ms")
+    print(f"索引词表: {len(index._vocabulary)} 个词\n")
+    print("[每次查询平均耗时]")
+    for key, value in results.items():
+        print(f"  {key:>24}: {value:.4f} ms")
+    print(f"\n关键词加速比: {results['legacy_keyword_ms'] / results['index_keyword_top10_ms']:.1f}x (top10)")
+    print(f"标签加速比: {results['legacy_tags_ms'] / results['index_tags_ms']:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
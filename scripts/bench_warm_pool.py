@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+python_run 冷启动与预热进程池的延迟对比。
+
+在临时项目中生成几个典型脚本（空脚本、导入常用标准库、导入 yaml 等第三方库），
+分别经 PythonRunTool 冷启动（每次新解释器）与预热进程池（fork 服务端）执行，
+报告端到端延迟中位数。
+
+用法：
+    python scripts/bench_warm_pool.py [--runs 20]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from tools.python_run import PythonRunTool  # noqa: E402
+from tools.warm_pool import WarmWorkerPool, warm_pool_available  # noqa: E402
+
+SCRIPTS: Dict[str, str] = {
+    "hello": "print('ok')\n",
+    "stdlib": (
+        "import argparse, csv, datetime, json, logging, pathlib, re, subprocess, zipfile\n"
+        "import urllib.request, xml.etree.ElementTree\n"
+        "print('ok')\n"
+    ),
+    "thirdparty": "import yaml\nprint(yaml.safe_dump({'ok': 1}).strip())\n",
+}
+
+
+async def _measure(tool: PythonRunTool, script: str, runs: int) -> List[float]:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = await tool.execute({"script_path": script})
+        samples.append((time.perf_counter() - started) * 1000)
+        if result["exit_code"] != 0:
+            raise RuntimeError(result["stderr_excerpt"])
+    return samples
+
+
+async def _run(project: Path, runs: int) -> None:
+    tool = PythonRunTool(project_root=str(project), sandbox_root=str(project / "sandbox"))
+    pool = WarmWorkerPool()
+    started = time.perf_counter()
+    await asyncio.to_thread(pool.start)
+    print(f"fork 服务端启动（预导入 {len(pool.modules)} 个模块）: {(time.perf_counter() - started) * 1000:.0f} ms\n")
+    print(f"{'script':<10} {'cold':>9} {'warm':>9} {'speedup':>8}")
+    try:
+        for name in SCRIPTS:
+            script = f"skills_workspace/bench/scripts/{name}.py"
+            # 交替测量，减少机器负载漂移的影响
+            cold, warm = [], []
+            for _ in range(runs):
+                tool.warm_pool = None
+                cold += await _measure(tool, script, 1)
+                tool.warm_pool = pool
+                warm += await _measure(tool, script, 1)
+            cold_ms, warm_ms = statistics.median(cold), statistics.median(warm)
+            print(f"{name:<10} {cold_ms:>7.1f}ms {warm_ms:>7.1f}ms {cold_ms / warm_ms:>7.1f}x")
+    finally:
+        pool.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="python_run 冷启动与预热进程池延迟对比")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    if not warm_pool_available():
+        print("当前平台不支持 fork 服务端")
+        return 1
+
+    with tempfile.TemporaryDirectory() as project:
+        scripts_dir = Path(project) / "skills_workspace" / "bench" / "scripts"
+        scripts_dir.mkdir(parents=True)
+        for name, source in SCRIPTS.items():
+            (scripts_dir / f"{name}.py").write_text(source, encoding="utf-8")
+        asyncio.run(_run(Path(project), args.runs))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,16 +2,20 @@
 import re
 from typing import Dict, Any, Optional
 from pathlib import Path
-import yaml
 
 from core.contracts.skill import JarvisSkill
+from skills.document import SkillDocument, load_skill_document
+
+
+# name 格式（根据标准：1-64字符，小写字母、数字、连字符）
+_NAME_PATTERN = re.compile(r'^[a-z0-9]([a-z0-9\-]*[a-z0-9])?$')
 
 
 class AgentSkillsAdapter:
     """Agent Skills 标准适配器（符合 Anthropic Agent Skills 规范）。"""
     
-    @staticmethod
-    def parse_skill_file(file_path: str) -> Optional[JarvisSkill]:
+    @classmethod
+    def parse_skill_file(cls, file_path: str) -> Optional[JarvisSkill]:
         """解析 Agent Skills 标准格式的技能文件。
         
         根据 Anthropic Agent Skills 标准：
@@ -26,42 +30,56 @@ class AgentSkillsAdapter:
         Returns:
             JarvisSkill 对象，如果解析失败则返回 None
         """
-        path = Path(file_path)
-        if not path.exists():
+        # 检查文件名必须是 SKILL.md
+        if Path(file_path).name != "SKILL.md":
             return None
         
+        try:
+            document = load_skill_document(file_path)
+        except Exception as e:
+            print(f"解析 Agent Skills 格式失败 {file_path}: {e}")
+            return None
+        if document is None:
+            return None
+        return cls.parse_document(document)
+    
+    @staticmethod
+    def parse_document(document: SkillDocument) -> Optional[JarvisSkill]:
+        """从预解析的文档构建技能（不再读取文件）。
+        
+        Args:
+            document: 共享解析阶段产出的 SkillDocument
+            
+        Returns:
+            JarvisSkill 对象，不符合 Agent Skills 标准时返回 None
+        """
         # 检查文件名必须是 SKILL.md
-        if path.name != "SKILL.md":
+        if document.file_name != "SKILL.md":
+            return None
+        
+        # Agent Skills 标准要求必须有 frontmatter
+        if not document.has_frontmatter:
+            return None
+        
+        if document.error is not None:
+            print(f"解析 Agent Skills 格式失败 {document.path}: {document.error}")
             return None
         
         try:
-            content = path.read_text(encoding="utf-8")
-            
-            # 解析 YAML frontmatter
-            frontmatter_pattern = r"^---\s*\n(.*?)\n---\s*\n(.*)$"
-            match = re.match(frontmatter_pattern, content, re.DOTALL)
-            
-            if not match:
-                # Agent Skills 标准要求必须有 frontmatter
-                return None
-            
-            yaml_content = match.group(1)
-            instructions_md = match.group(2)
-            
-            # 解析 YAML
-            metadata = yaml.safe_load(yaml_content) or {}
+            metadata = document.metadata
+            instructions_md = document.body
             
             # Agent Skills 标准要求：name 和 description 是必需的
             if "name" not in metadata or "description" not in metadata:
                 return None
             
             # 提取必需字段
-            skill_id = path.parent.name  # 使用目录名作为 skill_id
+            skill_id = document.skill_id  # 使用目录名作为 skill_id
             name = metadata.get("name", skill_id)
             description = metadata.get("description", "")
             
             # 验证 name 格式（根据标准：1-64字符，小写字母、数字、连字符）
-            if not re.match(r'^[a-z0-9]([a-z0-9\-]*[a-z0-9])?$', name.lower()):
+            if not _NAME_PATTERN.match(name.lower()):
                 # 如果不符合标准格式，使用 skill_id
                 name = skill_id
             
@@ -97,8 +115,8 @@ class AgentSkillsAdapter:
                 tags=tags,
                 instructions_md=instructions_md.strip(),
                 metadata=remaining_metadata,
-                file_path=str(path),
+                file_path=document.path,
             )
         except Exception as e:
-            print(f"解析 Agent Skills 格式失败 {file_path}: {e}")
+            print(f"解析 Agent Skills 格式失败 {document.path}: {e}")
             return None
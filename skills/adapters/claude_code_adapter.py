@@ -1,17 +1,15 @@
 """Claude Code adapter."""
-import re
-from pathlib import Path
 from typing import Dict, Any, Optional
-import yaml
 
 from core.contracts.skill import JarvisSkill
+from skills.document import SkillDocument, load_skill_document
 
 
 class ClaudeCodeAdapter:
     """Claude Code 技能适配器（解析 SKILL.md）。"""
     
-    @staticmethod
-    def parse_skill_md(file_path: str) -> Optional[JarvisSkill]:
+    @classmethod
+    def parse_skill_md(cls, file_path: str) -> Optional[JarvisSkill]:
         """解析 Claude Code 风格的 SKILL.md 文件。
         
         Args:
@@ -20,30 +18,39 @@ class ClaudeCodeAdapter:
         Returns:
             JarvisSkill 对象，如果解析失败则返回 None
         """
-        path = Path(file_path)
-        if not path.exists():
+        try:
+            document = load_skill_document(file_path)
+        except Exception as e:
+            print(f"解析 SKILL.md 失败 {file_path}: {e}")
+            return None
+        if document is None:
             return None
+        return cls.parse_document(document)
+    
+    @staticmethod
+    def parse_document(document: SkillDocument) -> Optional[JarvisSkill]:
+        """从预解析的文档构建技能（不再读取文件）。
         
-        try:
-            content = path.read_text(encoding="utf-8")
-            
-            # 解析 YAML frontmatter
-            frontmatter_pattern = r"^---\s*\n(.*?)\n---\s*\n(.*)$"
-            match = re.match(frontmatter_pattern, content, re.DOTALL)
+        Args:
+            document: 共享解析阶段产出的 SkillDocument
             
-            if not match:
+        Returns:
+            JarvisSkill 对象，如果解析失败则返回 None
+        """
+        if document.error is not None:
+            print(f"解析 SKILL.md 失败 {document.path}: {document.error}")
+            return None
+        
+        try:
+            if not document.has_frontmatter:
                 # 如果没有 frontmatter，尝试解析整个文件作为 Markdown
-                metadata = {}
-                instructions_md = content
+                metadata: Dict[str, Any] = {}
             else:
-                yaml_content = match.group(1)
-                instructions_md = match.group(2)
-                
-                # 解析 YAML
-                metadata = yaml.safe_load(yaml_content) or {}
+                metadata = document.metadata
+            instructions_md = document.body
             
             # 提取必需字段
-            skill_id = path.parent.name  # 使用目录名作为 skill_id
+            skill_id = document.skill_id  # 使用目录名作为 skill_id
             name = metadata.get("name", skill_id)
             description = metadata.get("description", "")
             tags = metadata.get("tags", [])
@@ -61,8 +68,8 @@ class ClaudeCodeAdapter:
                 tags=tags,
                 instructions_md=instructions_md.strip(),
                 metadata=remaining_metadata,
-                file_path=str(path),
+                file_path=document.path,
             )
         except Exception as e:
-            print(f"解析 SKILL.md 失败 {file_path}: {e}")
+            print(f"解析 SKILL.md 失败 {document.path}: {e}")
             return None
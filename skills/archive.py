@@ -0,0 +1,254 @@
+"""Mount `.skill` zip packages in place (no extraction)."""
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import zipfile
+from typing import Dict, List, Optional, Tuple
+
+
+# 技能包扩展名（skill-creator/scripts/package_skill.py 生成的 zip）
+ARCHIVE_SUFFIX = ".skill"
+
+_ARCHIVE_MARKER = ARCHIVE_SUFFIX + os.sep
+
+
+class SkillArchive:
+    """已挂载的 .skill 技能包。
+
+    打开时只读取 zip 的中央目录（成员列表），SKILL.md 与其他成员
+    在访问时才解压。兼容两种布局：成员位于包根目录，或位于唯一的
+    顶层目录下（package_skill.py 生成的 "<skill>/SKILL.md"）。
+    """
+
+    def __init__(self, path: str):
+        """挂载技能包。
+
+        Args:
+            path: .skill 文件路径
+
+        Raises:
+            OSError / zipfile.BadZipFile: 文件不可读或不是 zip
+            ValueError: 包内没有 SKILL.md
+        """
+        self.path = os.path.abspath(str(path))
+        stat = os.stat(self.path)
+        self.stat_key = (stat.st_mtime_ns, stat.st_size)
+        with zipfile.ZipFile(self.path) as archive:
+            infos = [info for info in archive.infolist() if not info.is_dir()]
+
+        names = {info.filename for info in infos}
+        if "SKILL.md" in names:
+            prefix = ""
+        else:
+            roots = [name[:-len("SKILL.md")] for name in names if name.endswith("/SKILL.md")]
+            roots = [root for root in roots if root.count("/") == 1]
+            if len(roots) != 1:
+                raise ValueError(f"技能包中没有 SKILL.md: {self.path}")
+            prefix = roots[0]
+
+        # 相对技能根目录的成员路径 -> ZipInfo（忽略绝对路径与 .. 等逃逸路径）
+        self.members: Dict[str, zipfile.ZipInfo] = {}
+        for info in infos:
+            if not info.filename.startswith(prefix):
+                continue
+            member = info.filename[len(prefix):]
+            parts = member.split("/")
+            if not member or member.startswith("/") or any(p in ("", ".", "..") for p in parts):
+                continue
+            self.members[member] = info
+
+    def member_path(self, member: str) -> str:
+        """成员的虚拟路径（<archive>.skill/<member>），与目录技能的路径形式一致。"""
+        return os.path.join(self.path, *member.split("/"))
+
+    def has(self, member: str) -> bool:
+        """包内是否存在该成员。"""
+        return member in self.members
+
+    def read_bytes(self, member: str) -> bytes:
+        """解压读取一个成员。"""
+        info = self.members[member]
+        with zipfile.ZipFile(self.path) as archive:
+            return archive.read(info)
+
+    def read_text(self, member: str) -> str:
+        """解压读取一个文本成员（UTF-8）。"""
+        return self.read_bytes(member).decode("utf-8")
+
+    def discover_files(self) -> Dict[str, List[str]]:
+        """按目录技能的规则归类包内的支持文件（返回虚拟路径）。
+
+        Returns:
+            {'scripts': [...], 'references': [...], 'assets': [...], 'other_md': [...]}
+        """
+        discovered: Dict[str, List[str]] = {
+            "scripts": [],
+            "references": [],
+            "assets": [],
+            "other_md": [],
+        }
+        for member in self.members:
+            head, sep, _ = member.partition("/")
+            if sep and head in ("scripts", "references", "assets"):
+                discovered[head].append(self.member_path(member))
+            elif not sep and member.endswith(".md") and member != "SKILL.md":
+                discovered["other_md"].append(self.member_path(member))
+        return discovered
+
+    def scripts_digest(self) -> Tuple[str, Dict[str, bytes]]:
+        """解压 scripts/ 下的所有成员并计算内容哈希。
+
+        Returns:
+            (sha256 十六进制摘要, {成员路径: 内容})
+        """
+        contents: Dict[str, bytes] = {}
+        with zipfile.ZipFile(self.path) as archive:
+            for member in sorted(self.members):
+                if member.startswith("scripts/"):
+                    contents[member] = archive.read(self.members[member])
+        digest = hashlib.sha256()
+        for member, data in contents.items():
+            digest.update(member.encode("utf-8") + b"\0")
+            digest.update(len(data).to_bytes(8, "big"))
+            digest.update(data)
+        return digest.hexdigest(), contents
+
+
+_mounted: Dict[str, SkillArchive] = {}
+_mounted_lock = threading.Lock()
+
+
+def is_archive(path: str) -> bool:
+    """路径是否为 .skill 技能包文件。"""
+    return str(path).endswith(ARCHIVE_SUFFIX) and os.path.isfile(path)
+
+
+def mount(path: str) -> SkillArchive:
+    """挂载技能包（按 mtime/size 复用已读取的中央目录）。
+
+    Args:
+        path: .skill 文件路径
+
+    Returns:
+        SkillArchive 实例
+    """
+    path = os.path.abspath(str(path))
+    stat = os.stat(path)
+    with _mounted_lock:
+        archive = _mounted.get(path)
+        if archive is not None and archive.stat_key == (stat.st_mtime_ns, stat.st_size):
+            return archive
+    archive = SkillArchive(path)
+    with _mounted_lock:
+        _mounted[path] = archive
+    return archive
+
+
+def split_archive_path(path: str) -> Optional[Tuple[str, str]]:
+    """把虚拟路径拆分为 (技能包路径, 成员路径)。
+
+    Args:
+        path: 形如 /ws/demo.skill/references/guide.md 的路径
+
+    Returns:
+        (技能包绝对路径, 'references/guide.md')；不是技能包内路径时返回 None
+    """
+    path = str(path)
+    if _ARCHIVE_MARKER not in path:
+        return None
+    path = os.path.abspath(path)
+    index = path.find(_ARCHIVE_MARKER)
+    while index != -1:
+        archive_path = path[:index + len(ARCHIVE_SUFFIX)]
+        if os.path.isfile(archive_path):
+            member = path[index + len(_ARCHIVE_MARKER):].replace(os.sep, "/")
+            return archive_path, member
+        index = path.find(_ARCHIVE_MARKER, index + 1)
+    return None
+
+
+def archive_stat_key(path: str) -> Optional[Tuple[int, int]]:
+    """技能包内路径的校验值：所在技能包的 (mtime_ns, size)；成员不存在时返回 None。"""
+    located = split_archive_path(path)
+    if located is None:
+        return None
+    archive_path, member = located
+    try:
+        archive = mount(archive_path)
+    except (OSError, ValueError, zipfile.BadZipFile):
+        return None
+    if member and not archive.has(member):
+        return None
+    return archive.stat_key
+
+
+def read_archive_text(path: str) -> Optional[str]:
+    """读取技能包内的文本成员（按需解压）。
+
+    Returns:
+        成员内容；不是技能包内路径或成员不存在时返回 None
+    """
+    located = split_archive_path(path)
+    if located is None:
+        return None
+    archive_path, member = located
+    try:
+        archive = mount(archive_path)
+    except (OSError, ValueError, zipfile.BadZipFile):
+        return None
+    if not archive.has(member):
+        return None
+    return archive.read_text(member)
+
+
+def path_exists(path: str) -> bool:
+    """文件是否存在（支持技能包内的虚拟路径）。"""
+    return os.path.exists(path) or archive_stat_key(path) is not None
+
+
+# 已提取的脚本目录：(技能包路径, mtime_ns, size) -> 缓存目录
+_extracted: Dict[Tuple[str, int, int], str] = {}
+
+
+def extract_scripts(archive_path: str, cache_root: str) -> str:
+    """把技能包的 scripts/ 提取到内容寻址缓存（内容相同的包共享同一目录）。
+
+    缓存目录为 <cache_root>/<sha256>/，其中包含 scripts/ 子树；
+    先写入临时目录再原子改名，并发提取不会看到半成品。
+
+    Args:
+        archive_path: .skill 文件路径
+        cache_root: 缓存根目录
+
+    Returns:
+        提取后的技能根目录（其下有 scripts/）
+    """
+    archive = mount(archive_path)
+    key = (archive.path,) + archive.stat_key
+    with _mounted_lock:
+        cached = _extracted.get(key)
+    if cached and os.path.isdir(cached):
+        return cached
+
+    digest, contents = archive.scripts_digest()
+    target = os.path.join(os.path.abspath(cache_root), digest)
+    if not os.path.isdir(target):
+        os.makedirs(cache_root, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=f".{digest[:12]}.", dir=cache_root)
+        try:
+            for member, data in contents.items():
+                dest = os.path.join(staging, *member.split("/"))
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                with open(dest, "wb") as handle:
+                    handle.write(data)
+            os.rename(staging, target)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            # 其他进程已完成同一内容的提取
+            if not os.path.isdir(target):
+                raise
+    with _mounted_lock:
+        _extracted[key] = target
+    return target
@@ -0,0 +1,138 @@
+"""Private bytecode cache for skill scripts run via python_run."""
+import hashlib
+import importlib.util
+import os
+import py_compile
+import sys
+from typing import Dict, Iterable, List, Optional
+
+
+# 解释器标签（如 cpython-311），不同解释器的字节码互不混用
+CACHE_TAG = sys.implementation.cache_tag or "python"
+
+# 子进程引导代码：校验 .pyc 头（魔数 + 源文件 mtime/size）后直接执行缓存的
+# code object，失效时回退为编译源码。语义与 `python script.py` 一致：
+# __name__ == "__main__"、sys.argv[0] 为脚本路径、sys.path[0] 为脚本目录。
+# 只使用解释器启动时已加载的模块（importlib 包本身的导入就要 ~2ms）。
+# .pyc 路径为空串时直接编译源码。
+BOOTSTRAP = """\
+import sys, os, marshal
+from _frozen_importlib_external import MAGIC_NUMBER as _magic
+_pyc, _script = sys.argv[1], sys.argv[2]
+sys.argv = sys.argv[2:]
+sys.path[0] = os.path.dirname(os.path.abspath(_script))
+_code = None
+try:
+    _st = os.stat(_script)
+    with open(_pyc, "rb") as _f:
+        _data = _f.read()
+    if (_data[:4] == _magic and _data[4:8] == bytes(4)
+            and int.from_bytes(_data[8:12], "little") == int(_st.st_mtime) & 0xFFFFFFFF
+            and int.from_bytes(_data[12:16], "little") == _st.st_size & 0xFFFFFFFF):
+        _code = marshal.loads(_data[16:])
+except OSError:
+    pass
+if _code is None:
+    with open(_script, "rb") as _f:
+        _code = compile(_f.read(), _script, "exec")
+_main = type(sys)("__main__")
+_main.__dict__.update(__file__=_script, __builtins__=__builtins__, __cached__=_pyc)
+sys.modules["__main__"] = _main
+exec(_code, _main.__dict__)
+"""
+
+
+def default_cache_root(project_root: str) -> str:
+    """字节码缓存根目录（环境变量 JARVIS_SKILL_PYCACHE 可覆盖）。"""
+    return os.getenv(
+        "JARVIS_SKILL_PYCACHE",
+        os.path.join(str(project_root), "memory", "cache", "skill_pycache"),
+    )
+
+
+def bytecode_path(script_path: str, cache_root: str) -> str:
+    """脚本对应的缓存 .pyc 路径（按脚本真实路径哈希命名）。"""
+    real = os.path.realpath(str(script_path))
+    digest = hashlib.sha1(real.encode("utf-8")).hexdigest()[:20]
+    stem = os.path.splitext(os.path.basename(real))[0]
+    return os.path.join(os.path.abspath(str(cache_root)), f"{stem}.{digest}.{CACHE_TAG}.pyc")
+
+
+def is_fresh(pyc_path: str, script_path: str) -> bool:
+    """缓存的 .pyc 是否与源文件一致（魔数、源文件 mtime 与 size）。"""
+    try:
+        stat = os.stat(script_path)
+        with open(pyc_path, "rb") as handle:
+            header = handle.read(16)
+    except OSError:
+        return False
+    return (
+        len(header) == 16
+        and header[:4] == importlib.util.MAGIC_NUMBER
+        and header[4:8] == bytes(4)
+        and int.from_bytes(header[8:12], "little") == int(stat.st_mtime) & 0xFFFFFFFF
+        and int.from_bytes(header[12:16], "little") == stat.st_size & 0xFFFFFFFF
+    )
+
+
+def precompile_script(script_path: str, cache_root: str) -> Optional[str]:
+    """把脚本编译到私有字节码缓存（已是最新时跳过）。
+
+    Args:
+        script_path: 脚本路径
+        cache_root: 缓存根目录
+
+    Returns:
+        .pyc 路径；脚本有语法错误或无法写入缓存时返回 None（按原方式执行）
+    """
+    pyc_path = bytecode_path(script_path, cache_root)
+    if is_fresh(pyc_path, script_path):
+        return pyc_path
+    try:
+        os.makedirs(os.path.dirname(pyc_path), exist_ok=True)
+        # py_compile 先写临时文件再原子替换，并发编译不会读到半成品
+        py_compile.compile(
+            str(script_path),
+            cfile=pyc_path,
+            dfile=os.path.abspath(str(script_path)),
+            doraise=True,
+            invalidation_mode=py_compile.PycInvalidationMode.TIMESTAMP,
+        )
+    except (py_compile.PyCompileError, OSError):
+        return None
+    return pyc_path
+
+
+def precompile_scripts(script_paths: Iterable[str], cache_root: str) -> Dict[str, int]:
+    """批量预编译脚本。
+
+    Returns:
+        {'compiled': 新编译数, 'fresh': 已是最新数, 'failed': 失败数}
+    """
+    stats = {"compiled": 0, "fresh": 0, "failed": 0}
+    for script_path in script_paths:
+        if is_fresh(bytecode_path(script_path, cache_root), script_path):
+            stats["fresh"] += 1
+        elif precompile_script(script_path, cache_root):
+            stats["compiled"] += 1
+        else:
+            stats["failed"] += 1
+    return stats
+
+
+def launch_command(script_path: str, args: List[str], cache_root: str, preamble: str = "") -> List[str]:
+    """构建执行脚本的命令行（有可用字节码或需要前导代码时经由引导代码执行）。
+
+    Args:
+        script_path: 脚本路径
+        args: 脚本参数
+        cache_root: 缓存根目录
+        preamble: 在引导代码之前执行的代码（如设置资源限制）
+
+    Returns:
+        argv 列表
+    """
+    pyc_path = precompile_script(script_path, cache_root)
+    if pyc_path is None and not preamble:
+        return [sys.executable, str(script_path)] + list(args)
+    return [sys.executable, "-c", preamble + BOOTSTRAP, pyc_path or "", str(script_path)] + list(args)
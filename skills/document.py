@@ -0,0 +1,100 @@
+"""Shared SKILL.md parse stage (read once, split once, YAML once)."""
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import yaml
+
+try:
+    # libyaml 绑定（C 实现），比纯 Python 的 SafeLoader 快一个数量级
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # pragma: no cover - 取决于 PyYAML 的编译方式
+    from yaml import SafeLoader as _SafeLoader
+
+
+# 与各适配器原有的 frontmatter 规则一致
+_FRONTMATTER_PATTERN = re.compile(r"^---\s*\n(.*?)\n---\s*\n(.*)$", re.DOTALL)
+
+
+def safe_load_yaml(text: str) -> Any:
+    """安全解析 YAML（优先使用 libyaml 的 CSafeLoader）。"""
+    return yaml.load(text, Loader=_SafeLoader)
+
+
+@dataclass
+class SkillDocument:
+    """预解析的 SKILL.md，供多个适配器共享。
+
+    适配器不应修改 metadata（需要时复制一份）。
+    """
+
+    path: str
+    content: str
+    has_frontmatter: bool = False
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    body: str = ""
+    error: Optional[Exception] = None  # frontmatter 存在但 YAML 解析失败
+
+    @property
+    def skill_id(self) -> str:
+        """技能ID（目录名）。"""
+        return Path(self.path).parent.name
+
+    @property
+    def file_name(self) -> str:
+        """文件名（如 SKILL.md）。"""
+        return Path(self.path).name
+
+    @classmethod
+    def from_text(cls, path: str, content: str) -> "SkillDocument":
+        """从已读取的文本构建文档（只做一次 frontmatter 切分与 YAML 解析）。
+
+        Args:
+            path: 文件路径
+            content: 文件内容
+
+        Returns:
+            SkillDocument
+        """
+        match = _FRONTMATTER_PATTERN.match(content)
+        if not match:
+            return cls(path=str(path), content=content, body=content)
+
+        document = cls(
+            path=str(path),
+            content=content,
+            has_frontmatter=True,
+            body=match.group(2),
+        )
+        try:
+            metadata = safe_load_yaml(match.group(1)) or {}
+            if not isinstance(metadata, dict):
+                raise ValueError(f"frontmatter 不是映射类型: {type(metadata).__name__}")
+            document.metadata = metadata
+        except Exception as exc:
+            document.error = exc
+        return document
+
+
+def load_skill_document(
+    file_path: str,
+    read_text: Optional[Callable[[str], Optional[str]]] = None,
+) -> Optional[SkillDocument]:
+    """读取并预解析 SKILL.md。
+
+    Args:
+        file_path: 文件路径
+        read_text: 可选的读取函数（如 SkillTextCache.read_text），文件不存在时返回 None
+
+    Returns:
+        SkillDocument；文件不存在时返回 None
+    """
+    if read_text is not None:
+        content = read_text(str(file_path))
+    else:
+        path = Path(file_path)
+        content = path.read_text(encoding="utf-8") if path.exists() else None
+    if content is None:
+        return None
+    return SkillDocument.from_text(str(file_path), content)
@@ -0,0 +1,194 @@
+"""Persistent skill manifest cache."""
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from skills.scanner import ScannedSkill
+
+
+# manifest 格式版本（结构变化时递增，旧文件自动失效）
+MANIFEST_VERSION = 1
+
+DEFAULT_MANIFEST_PATH = "./memory/cache/skills_manifest.json"
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SkillManifest:
+    """技能 manifest 缓存（JSON）。
+
+    为每个技能记录已解析的 frontmatter、发现的支持文件、SKILL.md 的
+    mtime/size/sha256 以及遍历过的目录 mtime。启动时只需 stat 这些目录，
+    未变化的技能直接复用缓存，变化的技能才重新解析。
+    """
+
+    def __init__(self, manifest_path: str = DEFAULT_MANIFEST_PATH):
+        """初始化 manifest。
+
+        Args:
+            manifest_path: manifest 文件路径
+        """
+        self.manifest_path = Path(manifest_path)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.workspace_dir: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def load(self, workspace_dir: str) -> None:
+        """加载 manifest（版本或工作空间不匹配时视为空）。
+
+        Args:
+            workspace_dir: 技能工作空间目录
+        """
+        self.workspace_dir = os.path.abspath(workspace_dir)
+        self.entries = {}
+        if not self.manifest_path.exists():
+            return
+        try:
+            data = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as exc:
+            print(f"读取技能 manifest 失败，将全量扫描: {exc}")
+            return
+        if not isinstance(data, dict):
+            return
+        if data.get("version") != MANIFEST_VERSION:
+            return
+        if data.get("workspace_dir") != self.workspace_dir:
+            return
+        skills = data.get("skills")
+        if isinstance(skills, dict):
+            self.entries = skills
+
+    def lookup(self, skill_id: str, skill_dir: str) -> Optional[ScannedSkill]:
+        """查找未变化的缓存条目。
+
+        Args:
+            skill_id: 技能ID
+            skill_dir: 技能目录路径
+
+        Returns:
+            缓存的扫描结果；目录或 SKILL.md 有变化时返回 None
+        """
+        entry = self.entries.get(skill_id)
+        if not entry or entry.get("skill_dir") != skill_dir:
+            return None
+        try:
+            for dir_path, mtime_ns in entry["dir_mtimes"].items():
+                if os.stat(dir_path).st_mtime_ns != mtime_ns:
+                    return None
+            skill_md = entry["skill_md"]
+            if entry.get("archive"):
+                # 技能包：包文件的 mtime/size 即可覆盖包内所有成员
+                if os.stat(skill_dir).st_size != entry["archive_size"]:
+                    return None
+            else:
+                md_stat = os.stat(entry["skill_md_path"])
+                if md_stat.st_mtime_ns != skill_md["mtime_ns"] or md_stat.st_size != skill_md["size"]:
+                    return None
+        except (OSError, KeyError, TypeError, AttributeError):
+            return None
+
+        return ScannedSkill(
+            skill_id=skill_id,
+            skill_dir=skill_dir,
+            skill_md_path=entry["skill_md_path"],
+            metadata=entry.get("metadata") or {},
+            discovered_files=entry.get("discovered_files") or {},
+            dir_mtimes=dict(entry["dir_mtimes"]),
+            skill_md_mtime_ns=skill_md["mtime_ns"],
+            skill_md_size=skill_md["size"],
+            from_cache=True,
+            archive=bool(entry.get("archive")),
+        )
+
+    def metadata_if_unchanged(
+        self,
+        skill_id: str,
+        skill_md_path: str,
+        size: int,
+    ) -> Optional[Dict[str, Any]]:
+        """SKILL.md 仅 mtime 变化而内容哈希相同时，返回缓存的 frontmatter。"""
+        entry = self.entries.get(skill_id)
+        if not entry or entry.get("skill_md_path") != skill_md_path:
+            return None
+        skill_md = entry.get("skill_md") or {}
+        if skill_md.get("size") != size or not skill_md.get("sha256"):
+            return None
+        try:
+            if _file_sha256(skill_md_path) != skill_md["sha256"]:
+                return None
+        except OSError:
+            return None
+        metadata = entry.get("metadata")
+        return metadata if isinstance(metadata, dict) else None
+
+    def record(self, scanned: ScannedSkill) -> None:
+        """记录一个技能的扫描结果（frontmatter 无法 JSON 序列化时不缓存）。"""
+        if scanned.from_cache:
+            with self._lock:
+                if scanned.skill_id in self.entries:
+                    return
+        try:
+            json.dumps(scanned.metadata, ensure_ascii=False)
+            # 技能包按包文件整体校验，不单独记录 SKILL.md 的哈希
+            sha256 = "" if scanned.archive else _file_sha256(scanned.skill_md_path)
+            archive_size = os.stat(scanned.skill_dir).st_size if scanned.archive else None
+        except (TypeError, ValueError, OSError):
+            with self._lock:
+                self.entries.pop(scanned.skill_id, None)
+            return
+
+        entry = {
+            "skill_dir": scanned.skill_dir,
+            "skill_md_path": scanned.skill_md_path,
+            "skill_md": {
+                "mtime_ns": scanned.skill_md_mtime_ns,
+                "size": scanned.skill_md_size,
+                "sha256": sha256,
+            },
+            "dir_mtimes": scanned.dir_mtimes,
+            "metadata": scanned.metadata,
+            "discovered_files": scanned.discovered_files,
+        }
+        if scanned.archive:
+            entry["archive"] = True
+            entry["archive_size"] = archive_size
+        with self._lock:
+            self.entries[scanned.skill_id] = entry
+
+    def remove(self, skill_id: str) -> None:
+        """移除一个技能的缓存条目。"""
+        with self._lock:
+            self.entries.pop(skill_id, None)
+
+    def retain(self, skill_ids: Any) -> None:
+        """只保留指定技能的条目（清理已删除的技能）。"""
+        keep = set(skill_ids)
+        with self._lock:
+            self.entries = {k: v for k, v in self.entries.items() if k in keep}
+
+    def save(self) -> None:
+        """原子写入 manifest（临时文件 + os.replace）。"""
+        with self._lock:
+            data = {
+                "version": MANIFEST_VERSION,
+                "workspace_dir": self.workspace_dir,
+                "skills": dict(self.entries),
+            }
+        try:
+            self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.manifest_path.with_name(
+                f".{self.manifest_path.name}.{os.getpid()}.tmp"
+            )
+            tmp_path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp_path, self.manifest_path)
+        except OSError as exc:
+            print(f"写入技能 manifest 失败: {exc}")
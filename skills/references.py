@@ -0,0 +1,124 @@
+"""Single-pass reference resolver for SKILL.md and its reference files."""
+import os
+import re
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+
+# 一次扫描同时识别“引导词 + 文件名”（see/read/参考…）与普通 .md 文件名：
+# 带引导词的引用排在前面，其余按出现顺序排列（与原四条正则的合并结果一致）
+_REFERENCE_TOKEN = re.compile(
+    r"(?:(?i:see also|see|read|参考|查看|refer to|check|follow)\s+)?"
+    r"([a-zA-Z0-9_\-/]+\.md)"
+)
+
+# 只要内容中提到文件名（或去掉扩展名的名字）就视为引用的常见文件
+COMMON_REFERENCE_FILES = (
+    "reference.md",
+    "references.md",
+    "forms.md",
+    "guide.md",
+    "tutorial.md",
+    "README.md",
+)
+
+
+def known_file_set(discovered_files: Dict[str, Iterable[str]]) -> Set[str]:
+    """把 discovered_files 展平为绝对路径集合（用于存在性判断，不访问文件系统）。
+
+    Args:
+        discovered_files: 扫描得到的支持文件 {'scripts': [...], 'references': [...], ...}
+
+    Returns:
+        规范化后的绝对路径集合
+    """
+    known: Set[str] = set()
+    for paths in discovered_files.values():
+        for path in paths:
+            known.add(os.path.abspath(str(path)))
+    return known
+
+
+def resolve_references(
+    content: str,
+    skill_dir: str,
+    known_files: Optional[Set[str]] = None,
+) -> List[str]:
+    """解析内容中引用的 Markdown 文件。
+
+    Args:
+        content: SKILL.md（或引用文件）的内容
+        skill_dir: 技能目录路径（引用路径相对于技能目录）
+        known_files: 技能已发现的文件集合（绝对路径）；为 None 时回退到文件系统检查
+
+    Returns:
+        引用的文件路径列表（绝对路径字符串，已去重）
+    """
+    skill_root = os.path.abspath(str(skill_dir))
+    if known_files is None:
+        exists: Callable[[str], bool] = os.path.isfile
+    else:
+        exists = known_files.__contains__
+
+    prioritized: List[str] = []
+    others: List[str] = []
+    seen: Set[str] = set()
+    for match in _REFERENCE_TOKEN.finditer(content):
+        name = match.group(1)
+        path = os.path.normpath(os.path.join(skill_root, name.lstrip("/")))
+        if path in seen or not exists(path):
+            continue
+        seen.add(path)
+        if match.start(1) > match.start():
+            prioritized.append(path)
+        else:
+            others.append(path)
+
+    referenced = prioritized + others
+    content_lower = content.lower()
+    for filename in COMMON_REFERENCE_FILES:
+        path = os.path.join(skill_root, filename)
+        if path in seen or not exists(path):
+            continue
+        lowered = filename.lower()
+        if lowered in content_lower or lowered[:-3] in content_lower:
+            referenced.append(path)
+            seen.add(path)
+    return referenced
+
+
+def build_reference_graph(
+    skill_dir: str,
+    root_path: str,
+    read_text: Callable[[str], Optional[str]],
+    resolve: Callable[[str, str], List[str]],
+) -> Dict[str, List[str]]:
+    """从 SKILL.md 出发构建技能内部的引用图。
+
+    Args:
+        skill_dir: 技能目录路径
+        root_path: 起点文件（通常为 SKILL.md）
+        read_text: 读取文件文本的函数（文件不存在时返回 None）
+        resolve: 解析引用的函数 (source_path, content) -> 引用路径列表
+
+    Returns:
+        {相对路径: [引用的相对路径, ...]}，以技能目录为基准
+    """
+    skill_root = os.path.abspath(str(skill_dir))
+    graph: Dict[str, List[str]] = {}
+    queue = deque([os.path.abspath(str(root_path))])
+    visited: Set[str] = set()
+    while queue:
+        source = queue.popleft()
+        if source in visited:
+            continue
+        visited.add(source)
+        content = read_text(source)
+        if content is None:
+            continue
+        targets = resolve(source, content)
+        graph[os.path.relpath(source, skill_root)] = [
+            os.path.relpath(target, skill_root) for target in targets
+        ]
+        queue.extend(target for target in targets if target not in visited)
+    return graph
@@ -1,27 +1,56 @@
 """Skills registry."""
+import os
+import threading
+import time
 import warnings
 from pathlib import Path
-from typing import Dict, Optional, List, Any
-import yaml
+from typing import Dict, Optional, List, Any, Set, Tuple
 
 from core.contracts.skill import JarvisSkill
 from core.platform.config import Config
 from skills.adapters.claude_code_adapter import ClaudeCodeAdapter
 from skills.adapters.agentskills_adapter import AgentSkillsAdapter
+from skills.archive import ARCHIVE_SUFFIX, mount, path_exists
+from skills.bytecode import default_cache_root, precompile_scripts
+from skills.document import load_skill_document
+from skills.manifest import SkillManifest
+from skills.references import build_reference_graph, known_file_set, resolve_references
+from skills.search_index import SkillSearchIndex
+from skills.sections import SectionIndex, build_section_index
+from skills.scanner import ScannedSkill, WorkspaceScanner, discover_skill_files, load_frontmatter
+from skills.text_cache import SkillTextCache
 
 
 class SkillsRegistry:
     """技能注册表。"""
     
-    def __init__(self, workspace_dir: str = "./skills_workspace"):
+    def __init__(self, workspace_dir: str = "./skills_workspace", manifest_path: Optional[str] = None):
         """初始化技能注册表。
         
         Args:
             workspace_dir: 技能工作空间目录
+            manifest_path: 可选的 manifest 缓存路径（如 memory/cache/skills_manifest.json），
+                           为 None 时不使用缓存
         """
         self.workspace_dir = Path(workspace_dir)
+        self.manifest = SkillManifest(manifest_path) if manifest_path else None
         self.skills: Dict[str, JarvisSkill] = {}
         self.adapters: List[Any] = []
+        self.last_scan_timings: Dict[str, Any] = {}
+        # 技能集合版本号（每次增删改递增，capability index 据此判断是否过期）
+        self.version = 0
+        self._load_fulltext = False
+        self._update_lock = threading.RLock()
+        # SKILL.md 全文与引用解析结果的 LRU 缓存（按 mtime/size 校验）
+        self.text_cache = SkillTextCache()
+        # 技能脚本的私有字节码缓存（python_run 经引导代码直接执行缓存的 code object）
+        self.pycache_root = default_cache_root(str(self.workspace_dir.resolve().parent))
+        # 技能内部引用图（加载技能时计算）：skill_id -> {相对路径: [引用的相对路径]}
+        self.reference_graphs: Dict[str, Dict[str, List[str]]] = {}
+        # SKILL.md 章节索引（渐进式披露）：skill_id -> (索引对应的文本, SectionIndex)
+        self._section_indexes: Dict[str, Tuple[str, SectionIndex]] = {}
+        # 名称/描述/标签倒排索引（register、扫描、热加载时同步更新）
+        self.search_index = SkillSearchIndex()
         
         # 加载启用的适配器
         self._load_adapters()
@@ -60,7 +89,7 @@ class SkillsRegistry:
         if not self.adapters:
             self.adapters.append(ClaudeCodeAdapter())
     
-    def _discover_skill_files(self, skill_dir: Path) -> Dict[str, Path]:
+    def _discover_skill_files(self, skill_dir: Path) -> Dict[str, List[Path]]:
         """发现技能目录中的支持文件。
         
         Args:
@@ -69,95 +98,227 @@ class SkillsRegistry:
         Returns:
             文件类型到路径的映射（如 {'scripts': [...], 'references': [...]}）
         """
-        discovered = {
-            'scripts': [],
-            'references': [],
-            'assets': [],
-            'other_md': [],
+        discovered = discover_skill_files(str(skill_dir))
+        return {
+            kind: [Path(f) for f in files]
+            for kind, files in discovered.items()
         }
+
+    def _parse_with_adapters(self, skill_md_path: Path) -> Optional[JarvisSkill]:
+        """尝试使用所有适配器解析技能文件。
         
-        if not skill_dir.exists():
-            return discovered
-        
-        # 扫描常见子目录
-        for subdir_name in ['scripts', 'references', 'assets']:
-            subdir = skill_dir / subdir_name
-            if subdir.exists() and subdir.is_dir():
-                for file_path in subdir.rglob('*'):
-                    if file_path.is_file():
-                        discovered[subdir_name].append(file_path)
+        SKILL.md 只读取一次（经 text_cache）、frontmatter 只切分与解析一次，
+        预解析的 SkillDocument 依次交给各适配器。
+        """
+        try:
+            document = load_skill_document(str(skill_md_path), self.text_cache.read_text)
+        except Exception as e:
+            print(f"读取 SKILL.md 失败 {skill_md_path}: {e}")
+            return None
+        if document is None:
+            return None
+        for adapter in self.adapters:
+            # 优先使用预解析文档接口
+            if hasattr(adapter, "parse_document"):
+                jarvis_skill = adapter.parse_document(document)
+                if jarvis_skill:
+                    return jarvis_skill
+            # 其次尝试 parse_skill_file 方法（Agent Skills 标准）
+            elif hasattr(adapter, "parse_skill_file"):
+                jarvis_skill = adapter.parse_skill_file(str(skill_md_path))
+                if jarvis_skill:
+                    return jarvis_skill
+            # 回退到 parse_skill_md 方法（Claude Code 风格）
+            elif hasattr(adapter, "parse_skill_md"):
+                jarvis_skill = adapter.parse_skill_md(str(skill_md_path))
+                if jarvis_skill:
+                    return jarvis_skill
+        return None
+
+    def _skill_from_frontmatter(
+        self,
+        skill_id: str,
+        metadata: Dict[str, Any],
+        skill_md_path: Path,
+    ) -> JarvisSkill:
+        """根据 frontmatter 构建技能（不读取全文）。"""
+        tags = metadata.get("tags", [])
+        if isinstance(tags, str):
+            tags = [tags]
+        return JarvisSkill(
+            skill_id=skill_id,
+            name=metadata.get("name") or skill_id,
+            description=metadata.get("description") or "",
+            tags=tags,
+            instructions_md="",
+            metadata={
+                k: v
+                for k, v in metadata.items()
+                if k not in ("name", "description", "tags")
+            },
+            file_path=str(skill_md_path),
+        )
+
+    def scan_workspace(self, load_fulltext: bool = False, rebuild_cache: bool = False) -> None:
+        """扫描工作空间目录，加载所有技能。
         
-        # 扫描技能目录根目录下的其他Markdown文件（除了SKILL.md）
-        for file_path in skill_dir.iterdir():
-            if file_path.is_file() and file_path.suffix == '.md' and file_path.name != 'SKILL.md':
-                discovered['other_md'].append(file_path)
+        目录列举、frontmatter 解析与支持文件发现由 WorkspaceScanner 并行完成，
+        各阶段耗时保存在 self.last_scan_timings。
+        配置了 manifest 时（仅 frontmatter 模式），目录未变化的技能直接复用缓存。
         
-        return discovered
-
-    def scan_workspace(self, load_fulltext: bool = False) -> None:
-        """扫描工作空间目录，加载所有技能。"""
+        Args:
+            load_fulltext: 是否使用适配器解析 SKILL.md 全文
+            rebuild_cache: 忽略已有 manifest，强制全量重新扫描
+        """
         if not self.workspace_dir.exists():
             print(f"警告: 技能工作空间目录不存在: {self.workspace_dir}")
             return
         
-        # 扫描所有包含 SKILL.md 的子目录
-        for skill_dir in self.workspace_dir.iterdir():
-            if not skill_dir.is_dir():
-                continue
+        manifest = self.manifest if not load_fulltext else None
+        if manifest is not None:
+            manifest.load(str(self.workspace_dir))
+            if rebuild_cache:
+                manifest.entries = {}
+        
+        scanner = WorkspaceScanner(str(self.workspace_dir))
+        scanned_skills = scanner.scan(parse_frontmatter=not load_fulltext, manifest=manifest)
+        
+        if manifest is not None:
+            cached_count = len(manifest.entries)
+            for scanned in scanned_skills:
+                manifest.record(scanned)
+            manifest.retain(scanned.skill_id for scanned in scanned_skills)
+            all_hits = scanner.last_timings.get("cache_hits") == len(scanned_skills)
+            if rebuild_cache or not all_hits or cached_count != len(scanned_skills):
+                manifest.save()
+        
+        skills = dict(self.skills)
+        for scanned in scanned_skills:
+            jarvis_skill = self._build_skill(scanned, load_fulltext)
+            if jarvis_skill:
+                skills[jarvis_skill.skill_id] = jarvis_skill
+                print(f"已加载技能: {jarvis_skill.name} ({jarvis_skill.skill_id})")
+        
+        self.search_index.rebuild(skills.values())
+        self.skills = skills
+        self._load_fulltext = load_fulltext
+        self.version += 1
+        self.last_scan_timings = scanner.last_timings
+        self.last_scan_timings["precompile"] = self._precompile_scripts(scanned_skills)
+
+    def _precompile_scripts(self, scanned_skills: List[ScannedSkill]) -> Dict[str, Any]:
+        """把技能目录 scripts/ 下的 .py 预编译到私有字节码缓存。
+        
+        已是最新的脚本只做一次 stat 与 16 字节头校验；技能包中的脚本在
+        python_run 提取时再编译。设置 JARVIS_SKILL_PRECOMPILE=0 可关闭。
+        
+        Args:
+            scanned_skills: 扫描结果
             
-            skill_md_path = skill_dir / "SKILL.md"
-            if skill_md_path.exists():
-                if load_fulltext:
-                    # 尝试使用所有适配器解析技能文件
-                    jarvis_skill = None
-                    for adapter in self.adapters:
-                        # 优先尝试 parse_skill_file 方法（Agent Skills 标准）
-                        if hasattr(adapter, "parse_skill_file"):
-                            jarvis_skill = adapter.parse_skill_file(str(skill_md_path))
-                            if jarvis_skill:
-                                break
-                        # 回退到 parse_skill_md 方法（Claude Code 风格）
-                        elif hasattr(adapter, "parse_skill_md"):
-                            jarvis_skill = adapter.parse_skill_md(str(skill_md_path))
-                            if jarvis_skill:
-                                break
-                else:
-                    metadata = self._load_frontmatter(skill_md_path)
-                    tags = metadata.get("tags", [])
-                    if isinstance(tags, str):
-                        tags = [tags]
-                    jarvis_skill = JarvisSkill(
-                        skill_id=skill_dir.name,
-                        name=metadata.get("name") or skill_dir.name,
-                        description=metadata.get("description") or "",
-                        tags=tags,
-                        instructions_md="",
-                        metadata={
-                            k: v
-                            for k, v in metadata.items()
-                            if k not in ("name", "description", "tags")
-                        },
-                        file_path=str(skill_md_path),
-                    )
-                
-                if jarvis_skill:
-                    # 发现技能目录中的支持文件
-                    discovered_files = self._discover_skill_files(skill_dir)
-                    if discovered_files:
-                        # 将发现的文件信息添加到metadata中
-                        jarvis_skill.metadata['discovered_files'] = {
-                            'scripts': [str(f) for f in discovered_files['scripts']],
-                            'references': [str(f) for f in discovered_files['references']],
-                            'assets': [str(f) for f in discovered_files['assets']],
-                            'other_md': [str(f) for f in discovered_files['other_md']],
-                        }
-                    
-                    self.skills[jarvis_skill.skill_id] = jarvis_skill
-                    print(f"已加载技能: {jarvis_skill.name} ({jarvis_skill.skill_id})")
+        Returns:
+            {'compiled', 'fresh', 'failed', 'ms'}
+        """
+        if os.getenv("JARVIS_SKILL_PRECOMPILE", "1") == "0":
+            return {}
+        started = time.perf_counter()
+        scripts = [
+            path
+            for scanned in scanned_skills
+            if not scanned.archive
+            for path in scanned.discovered_files.get("scripts", [])
+            if path.endswith(".py")
+        ]
+        stats: Dict[str, Any] = precompile_scripts(scripts, self.pycache_root)
+        stats["ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return stats
+
+    def _build_skill(self, scanned: ScannedSkill, load_fulltext: bool) -> Optional[JarvisSkill]:
+        """根据扫描结果构建技能对象。"""
+        skill_md_path = Path(scanned.skill_md_path)
+        if scanned.archive:
+            # 技能包只能从包内读取：frontmatter 已由扫描器解析，全文按需解压
+            jarvis_skill = self._skill_from_frontmatter(
+                scanned.skill_id, scanned.metadata, skill_md_path
+            )
+            if load_fulltext:
+                jarvis_skill.instructions_md = self.text_cache.read_text(skill_md_path) or ""
+        elif load_fulltext:
+            jarvis_skill = self._parse_with_adapters(skill_md_path)
+        else:
+            jarvis_skill = self._skill_from_frontmatter(
+                scanned.skill_id, scanned.metadata, skill_md_path
+            )
+        if jarvis_skill:
+            # 将发现的支持文件信息添加到metadata中
+            jarvis_skill.metadata['discovered_files'] = scanned.discovered_files
+        return jarvis_skill
+
+    def reload_skill(self, skill_id: str) -> Optional[JarvisSkill]:
+        """增量重新加载单个技能（目录已删除时移除）。
+        
+        只重新解析受影响的技能目录，并以整体替换 self.skills 的方式原子更新，
+        读取方不会看到中间状态。
+        
+        Args:
+            skill_id: 技能ID（工作空间下的目录名）
+            
+        Returns:
+            重新加载后的技能；技能已不存在时返回 None
+        """
+        with self._update_lock:
+            scanner = WorkspaceScanner(str(self.workspace_dir), max_workers=1)
+            scanned = scanner.scan_skill(skill_id, parse_frontmatter=not self._load_fulltext)
+            jarvis_skill = self._build_skill(scanned, self._load_fulltext) if scanned else None
+            if jarvis_skill is None:
+                self._remove_locked(skill_id)
+                return None
+            
+            skills = dict(self.skills)
+            skills[jarvis_skill.skill_id] = jarvis_skill
+            self.search_index.add(jarvis_skill)
+            self.skills = skills
+            self.version += 1
+            if self.manifest is not None and not self._load_fulltext:
+                self.manifest.record(scanned)
+                self.manifest.save()
+            self._precompile_scripts([scanned])
+            return jarvis_skill
+
+    def remove_skill(self, skill_id: str) -> bool:
+        """移除技能（原子更新）。
+        
+        Args:
+            skill_id: 技能ID
+            
+        Returns:
+            是否移除了已注册的技能
+        """
+        with self._update_lock:
+            return self._remove_locked(skill_id)
+
+    def _remove_locked(self, skill_id: str) -> bool:
+        if skill_id not in self.skills:
+            return False
+        skills = dict(self.skills)
+        skills.pop(skill_id, None)
+        self.search_index.remove(skill_id)
+        self._section_indexes.pop(skill_id, None)
+        self.reference_graphs.pop(skill_id, None)
+        self.skills = skills
+        self.version += 1
+        if self.manifest is not None:
+            self.manifest.remove(skill_id)
+            self.manifest.save()
+        return True
     
     def register(self, skill: JarvisSkill) -> None:
         """注册技能。"""
-        self.skills[skill.skill_id] = skill
+        with self._update_lock:
+            skills = dict(self.skills)
+            skills[skill.skill_id] = skill
+            self.search_index.add(skill)
+            self.skills = skills
+            self.version += 1
     
     def get(self, skill_id: str) -> Optional[JarvisSkill]:
         """获取技能。"""
@@ -169,24 +330,7 @@ class SkillsRegistry:
 
     def _load_frontmatter(self, skill_md_path: Path) -> Dict[str, Any]:
         """仅读取 YAML frontmatter，避免读取全文。"""
-        try:
-            with skill_md_path.open("r", encoding="utf-8") as handle:
-                first_line = handle.readline()
-                if not first_line.strip().startswith("---"):
-                    return {}
-
-                yaml_lines: List[str] = []
-                for line in handle:
-                    if line.strip() == "---":
-                        break
-                    yaml_lines.append(line)
-
-            if not yaml_lines:
-                return {}
-            return yaml.safe_load("".join(yaml_lines)) or {}
-        except Exception as exc:
-            print(f"读取 frontmatter 失败 {skill_md_path}: {exc}")
-            return {}
+        return load_frontmatter(str(skill_md_path))
 
     def _scan_skill_scripts(self, skill_dir: Path) -> List[Dict[str, str]]:
         """扫描技能目录下的 scripts/*.py 文件。
@@ -198,6 +342,14 @@ class SkillsRegistry:
             脚本列表，每个元素包含 name 和 relative_path
         """
         scripts = []
+        if skill_dir.suffix == ARCHIVE_SUFFIX and skill_dir.is_file():
+            # 技能包：直接读取中央目录中的 scripts/*.py
+            for member in sorted(mount(str(skill_dir)).members):
+                head, _, name = member.partition("/")
+                if head == "scripts" and "/" not in name and name.endswith(".py"):
+                    scripts.append({"name": name, "relative_path": member})
+            return scripts
+        
         scripts_dir = skill_dir / "scripts"
         
         if not scripts_dir.exists() or not scripts_dir.is_dir():
@@ -302,9 +454,36 @@ class SkillsRegistry:
 
         return results
 
+    def _skill_dir(self, skill_id: str) -> Path:
+        """技能根目录（.skill 技能包返回包文件路径，包内文件以其为前缀）。"""
+        skill_dir = self.workspace_dir / skill_id
+        if not skill_dir.is_dir():
+            archive_path = self.workspace_dir / f"{skill_id}{ARCHIVE_SUFFIX}"
+            if archive_path.is_file():
+                return archive_path
+        return skill_dir
+
+    def _known_files(self, skill_dir: Path) -> Optional[Set[str]]:
+        """技能已发现文件的绝对路径集合（未注册或缺少 discovered_files 时返回 None）。"""
+        skill_id = skill_dir.name
+        if skill_id.endswith(ARCHIVE_SUFFIX):
+            skill_id = skill_id[:-len(ARCHIVE_SUFFIX)]
+        skill = self.skills.get(skill_id)
+        if not skill or not isinstance(skill.metadata, dict):
+            return None
+        discovered = skill.metadata.get("discovered_files")
+        if not isinstance(discovered, dict):
+            return None
+        known = known_file_set(discovered)
+        # SKILL.md 不在 discovered_files 中，但可以被引用文件反向引用
+        known.add(os.path.abspath(str(skill_dir / "SKILL.md")))
+        return known
+
     def _parse_file_references(self, content: str, skill_dir: Path) -> List[str]:
         """解析内容中引用的Markdown文件。
         
+        单次扫描 + 预编译正则；存在性按技能已发现的文件集合判断，不访问文件系统。
+        
         Args:
             content: SKILL.md的内容
             skill_dir: 技能目录路径
@@ -312,56 +491,70 @@ class SkillsRegistry:
         Returns:
             引用的文件路径列表（绝对路径字符串）
         """
-        import re
-        referenced_files = []
-        seen_paths = set()
-        
-        # 匹配常见的文件引用模式：
-        # - "see reference.md"
-        # - "read forms.md"
-        # - "see reference.md and forms.md"
-        # - "For details, see reference.md"
-        # - "参考 reference.md"
-        # - "see reference.md, forms.md"
-        patterns = [
-            r'(?:see|read|参考|查看|see also|refer to|check|follow)\s+([a-zA-Z0-9_\-/]+\.md)',
-            r'([a-zA-Z0-9_\-/]+\.md)(?:\s+and\s+([a-zA-Z0-9_\-/]+\.md))?',
-            r'follow\s+the\s+instructions\s+in\s+([a-zA-Z0-9_\-/]+\.md)',
-            r'([a-zA-Z0-9_\-/]+\.md)(?:\s*,\s*([a-zA-Z0-9_\-/]+\.md))?',
+        return resolve_references(content, str(skill_dir), self._known_files(skill_dir))
+
+    def _resolve_references(
+        self,
+        content: str,
+        skill_dir: Path,
+        source_path: Optional[Path] = None,
+    ) -> List[str]:
+        """解析引用文件（结果按源文件与目录的 mtime 缓存）。"""
+        source_path = source_path or skill_dir / "SKILL.md"
+        if not path_exists(str(source_path)):
+            return self._parse_file_references(content, skill_dir)
+        watch_dirs = [skill_dir] + [
+            skill_dir / name for name in ("references", "reference", "docs")
         ]
+        return self.text_cache.get_references(
+            str(source_path),
+            lambda: self._parse_file_references(content, skill_dir),
+            watch_dirs=watch_dirs,
+        )
+
+    def reference_graph(self, skill_id: str) -> Dict[str, List[str]]:
+        """获取技能内部的引用图（SKILL.md 及其传递引用的 Markdown 文件）。
+        
+        每个节点的解析结果都经过 text_cache 缓存，重复调用不再读盘。
         
-        for pattern in patterns:
-            matches = re.finditer(pattern, content, re.IGNORECASE)
-            for match in matches:
-                for group in match.groups():
-                    if group and group.endswith('.md'):
-                        # 处理相对路径
-                        if '/' in group:
-                            file_path = skill_dir / group
-                        else:
-                            file_path = skill_dir / group
-                        
-                        # 标准化路径并检查是否存在
-                        file_path = file_path.resolve()
-                        if file_path.exists() and str(file_path) not in seen_paths:
-                            referenced_files.append(str(file_path))
-                            seen_paths.add(str(file_path))
-        
-        # 也检查技能目录中常见的文件（如果内容中提到了）
-        common_files = ['reference.md', 'references.md', 'forms.md', 'guide.md', 'tutorial.md', 'README.md']
-        for filename in common_files:
-            file_path = skill_dir / filename
-            if file_path.exists():
-                file_path = file_path.resolve()
-                # 检查内容中是否提到了这个文件（文件名或去掉扩展名）
-                filename_base = filename.replace('.md', '')
-                if (filename.lower() in content.lower() or 
-                    filename_base.lower() in content.lower()):
-                    if str(file_path) not in seen_paths:
-                        referenced_files.append(str(file_path))
-                        seen_paths.add(str(file_path))
-        
-        return referenced_files
+        Args:
+            skill_id: 技能ID
+            
+        Returns:
+            {相对路径: [引用的相对路径, ...]}，如 {'SKILL.md': ['references/guide.md'], ...}
+        """
+        skill_dir = self._skill_dir(skill_id)
+        graph = build_reference_graph(
+            str(skill_dir),
+            str(skill_dir / "SKILL.md"),
+            self.text_cache.read_text,
+            lambda source, content: self._resolve_references(content, skill_dir, Path(source)),
+        )
+        self.reference_graphs[skill_id] = graph
+        return graph
+
+    def _index_sections(self, skill_id: str, text: str) -> SectionIndex:
+        cached = self._section_indexes.get(skill_id)
+        # text_cache 命中时返回同一个字符串对象，可直接按身份判断是否过期
+        if cached is not None and (cached[0] is text or cached[0] == text):
+            return cached[1]
+        index = build_section_index(text)
+        self._section_indexes[skill_id] = (text, index)
+        return index
+
+    def section_index(self, skill_id: str) -> Optional[SectionIndex]:
+        """获取 SKILL.md 的章节索引（标题、字节偏移、token 估算、关键词）。
+        
+        Args:
+            skill_id: 技能ID
+            
+        Returns:
+            SectionIndex；SKILL.md 不存在时返回 None
+        """
+        text = self.text_cache.read_text(self._skill_dir(skill_id) / "SKILL.md")
+        if text is None:
+            return None
+        return self._index_sections(skill_id, text)
 
     def load_skill_fulltext(self, skill_id: str, include_references: bool = False) -> str:
         """加载指定技能的完整说明文本。
@@ -382,25 +575,27 @@ class SkillsRegistry:
             技能说明文本
         """
         # 优先读取 SKILL.md 全文
-        skill_dir = self.workspace_dir / skill_id
+        skill_dir = self._skill_dir(skill_id)
         skill_md_path = skill_dir / "SKILL.md"
         
-        main_content = ""
-        if skill_md_path.exists():
-            main_content = skill_md_path.read_text(encoding="utf-8")
-        else:
+        main_content = self.text_cache.read_text(skill_md_path)
+        if main_content is None:
+            main_content = ""
             skill = self.skills.get(skill_id)
             if skill:
                 if skill.instructions_md:
                     main_content = skill.instructions_md
                 elif skill.file_path:
-                    path = Path(skill.file_path)
-                    if path.exists():
-                        main_content = path.read_text(encoding="utf-8")
+                    main_content = self.text_cache.read_text(skill.file_path) or ""
         
         if not main_content:
             return ""
         
+        # 加载技能时预计算引用图与章节索引（各节点经 text_cache 缓存，热技能不再读盘）
+        if path_exists(str(skill_md_path)):
+            self.reference_graph(skill_id)
+            self._index_sections(skill_id, main_content)
+        
         # 根据渐进式加载原则：默认不自动加载引用文件
         # SKILL.md 中已经包含了引用提示（如 "see reference.md"）
         # LLM 可以根据需要决定是否读取这些文件
@@ -409,7 +604,7 @@ class SkillsRegistry:
         
         # 向后兼容：如果明确要求加载引用文件，则加载
         # 解析并加载引用的文件
-        referenced_files = self._parse_file_references(main_content, skill_dir)
+        referenced_files = self._resolve_references(main_content, skill_dir)
         
         if not referenced_files:
             return main_content
@@ -421,8 +616,8 @@ class SkillsRegistry:
         for ref_file_path in referenced_files:
             try:
                 ref_path = Path(ref_file_path)
-                if ref_path.exists():
-                    ref_content = ref_path.read_text(encoding="utf-8")
+                ref_content = self.text_cache.read_text(ref_path)
+                if ref_content is not None:
                     # 提取文件名（不含路径）
                     filename = ref_path.name
                     full_content.append(f"### {filename}\n\n")
@@ -443,59 +638,58 @@ class SkillsRegistry:
         Returns:
             引用文件列表，每个元素包含 'name' 和 'path'
         """
-        skill_dir = self.workspace_dir / skill_id
+        skill_dir = self._skill_dir(skill_id)
         skill_md_path = skill_dir / "SKILL.md"
         
-        if not skill_md_path.exists():
+        main_content = self.text_cache.read_text(skill_md_path)
+        if main_content is None:
             return []
         
-        main_content = skill_md_path.read_text(encoding="utf-8")
-        referenced_files = self._parse_file_references(main_content, skill_dir)
+        referenced_files = self._resolve_references(main_content, skill_dir)
         
+        skill_root = os.path.abspath(str(skill_dir))
         references = []
         for ref_file_path in referenced_files:
-            try:
-                ref_path = Path(ref_file_path)
-                if ref_path.exists():
-                    references.append({
-                        'name': ref_path.name,
-                        'path': str(ref_path.relative_to(skill_dir)),
-                        'full_path': str(ref_path),
-                    })
-            except Exception:
-                pass
+            references.append({
+                'name': os.path.basename(ref_file_path),
+                'path': os.path.relpath(ref_file_path, skill_root),
+                'full_path': ref_file_path,
+            })
         
         return references
     
     def search_by_tags(self, tags: List[str]) -> List[JarvisSkill]:
-        """根据标签搜索技能。
+        """根据标签搜索技能（倒排索引，命中任一标签即返回）。
         
         Args:
             tags: 标签列表
             
         Returns:
-            匹配的技能列表
+            匹配的技能列表（按注册顺序）
         """
-        results = []
-        for skill in self.skills.values():
-            if any(tag in skill.tags for tag in tags):
-                results.append(skill)
-        return results
+        skills = self.skills
+        return [
+            skills[skill_id]
+            for skill_id in self.search_index.search_tags(tags)
+            if skill_id in skills
+        ]
     
-    def search_by_keyword(self, keyword: str) -> List[JarvisSkill]:
+    def search_by_keyword(self, keyword: str, limit: int = 0) -> List[JarvisSkill]:
         """根据关键词搜索技能（搜索名称、描述、标签）。
         
+        基于倒排索引：支持多词查询、英文前缀匹配与中文 n-gram 匹配，
+        结果按命中词数与字段加权得分排序。
+        
         Args:
-            keyword: 搜索关键词
+            keyword: 搜索关键词（可包含多个词）
+            limit: 最多返回条数（0 表示不限）
             
         Returns:
-            匹配的技能列表
+            匹配的技能列表（按相关度排序）
         """
-        keyword_lower = keyword.lower()
-        results = []
-        for skill in self.skills.values():
-            if (keyword_lower in skill.name.lower() or
-                keyword_lower in skill.description.lower() or
-                any(keyword_lower in tag.lower() for tag in skill.tags)):
-                results.append(skill)
-        return results
+        skills = self.skills
+        return [
+            skills[skill_id]
+            for skill_id, _ in self.search_index.search(keyword, limit=limit)
+            if skill_id in skills
+        ]
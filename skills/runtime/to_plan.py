@@ -64,6 +64,9 @@ def step_to_dict(step: PlanStep) -> Dict[str, Any]:
     else:
         step_dict["params"] = {}
     
+    step_dict["depends_on"] = list(step.depends_on or [])
+    step_dict["resources"] = list(step.resources or [])
+    
     return step_dict
 
 
@@ -94,11 +97,77 @@ def dict_to_plan(data: Dict[str, Any]) -> Plan:
     )
 
 
+def batch_file_writes(steps: List[PlanStep], max_items: int = 64) -> List[PlanStep]:
+    """把连续的文件写入步骤合并为一个 FileTool batch 步骤。
+    
+    合并后只需一次工具调用、审批评估与审计记录。只合并没有依赖、没有显式
+    资源声明、风险等级相同的 write 步骤；被其他步骤依赖的步骤保持独立。
+    参数只有 operation/path/content 且 path 非空的写入才合并，其余参数
+    （如 durability）会被 batch 忽略，带有这些参数的步骤保持独立。
+    
+    Args:
+        steps: 计划步骤
+        max_items: 单个 batch 最多包含的写入数
+        
+    Returns:
+        合并后的步骤列表（不超过一个可合并步骤的片段保持原样）
+    """
+    depended = {dep for step in steps for dep in (step.depends_on or [])}
+    
+    def mergeable(step: PlanStep) -> bool:
+        params = step.params or {}
+        path = params.get("path")
+        return (
+            step.tool_id == "file"
+            and params.get("operation") == "write"
+            and isinstance(path, str)
+            and bool(path)
+            and set(params) <= {"operation", "path", "content"}
+            and not step.depends_on
+            and not step.resources
+            and step.step_id not in depended
+        )
+    
+    merged: List[PlanStep] = []
+    run: List[PlanStep] = []
+    
+    def flush() -> None:
+        if len(run) == 1:
+            merged.append(run[0])
+        elif run:
+            merged.append(PlanStep(
+                step_id=generate_id("step"),
+                tool_id="file",
+                description="；".join(step.description for step in run),
+                params={
+                    "operation": "batch",
+                    "operations": [
+                        {"operation": "write", "path": step.params["path"], "content": step.params.get("content", "")}
+                        for step in run
+                    ],
+                },
+                risk_level=run[0].risk_level,
+            ))
+        run.clear()
+    
+    for step in steps:
+        if mergeable(step) and (not run or (step.risk_level == run[0].risk_level and len(run) < max_items)):
+            run.append(step)
+            continue
+        flush()
+        if mergeable(step):
+            run.append(step)
+        else:
+            merged.append(step)
+    flush()
+    return merged
+
+
 def skill_to_plan(jarvis_skill: JarvisSkill, task_id: str, sandbox_root: str = "./sandbox") -> Plan:
     """将 JarvisSkill 的 instructions_md 转换为 Task plan。
     
     解析技能文档中的"执行步骤"部分，生成实际的执行计划。
-    如果没有找到"执行步骤"，则回退到简单模板。
+    如果没有找到"执行步骤"，则回退到简单模板。连续的文件写入合并为一个 batch 步骤。
     
     Args:
         jarvis_skill: JarvisSkill 对象
@@ -191,6 +260,8 @@ def skill_to_plan(jarvis_skill: JarvisSkill, task_id: str, sandbox_root: str = "
         )
         steps.append(final_step)
     
+    steps = batch_file_writes(steps)
+    
     return Plan(
         plan_id=plan_id,
         steps=steps,
@@ -0,0 +1,325 @@
+"""Parallel skills workspace scanner built on os.scandir."""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from skills.archive import ARCHIVE_SUFFIX, mount
+from skills.document import safe_load_yaml
+
+
+# 技能目录下需要递归发现文件的子目录
+SUPPORT_SUBDIRS = ("scripts", "references", "assets")
+
+
+@dataclass
+class ScannedSkill:
+    """单个技能目录的扫描结果。"""
+
+    skill_id: str
+    skill_dir: str
+    skill_md_path: str
+    metadata: Dict[str, Any] = field(default_factory=dict)  # frontmatter（未解析时为空）
+    discovered_files: Dict[str, List[str]] = field(default_factory=dict)
+    dir_mtimes: Dict[str, int] = field(default_factory=dict)  # 已遍历目录 -> mtime_ns
+    skill_md_mtime_ns: int = 0
+    skill_md_size: int = 0
+    from_cache: bool = False  # 是否来自 manifest 缓存
+    archive: bool = False  # 是否为 .skill 技能包（skill_dir 为包文件路径）
+
+
+def read_frontmatter(handle: Iterable[str]) -> Dict[str, Any]:
+    """从文本流中读取 YAML frontmatter（读到结束分隔符即停止）。
+
+    Args:
+        handle: 按行迭代的文本流（文件或解压流）
+
+    Returns:
+        frontmatter 字典（不存在时返回空字典）
+    """
+    lines = iter(handle)
+    first_line = next(lines, "")
+    if not first_line.strip().startswith("---"):
+        return {}
+
+    yaml_lines: List[str] = []
+    for line in lines:
+        if line.strip() == "---":
+            break
+        yaml_lines.append(line)
+
+    if not yaml_lines:
+        return {}
+    return safe_load_yaml("".join(yaml_lines)) or {}
+
+
+def load_frontmatter(skill_md_path: str) -> Dict[str, Any]:
+    """仅读取 SKILL.md 的 YAML frontmatter，避免读取全文。
+
+    Args:
+        skill_md_path: SKILL.md 文件路径
+
+    Returns:
+        frontmatter 字典（不存在或解析失败时返回空字典）
+    """
+    try:
+        with open(skill_md_path, "r", encoding="utf-8") as handle:
+            return read_frontmatter(handle)
+    except Exception as exc:
+        print(f"读取 frontmatter 失败 {skill_md_path}: {exc}")
+        return {}
+
+
+def _walk_files(root: str, out: List[str], dir_mtimes: Optional[Dict[str, int]] = None) -> None:
+    """递归收集 root 下的文件（复用 dirent 类型信息，不跟随目录符号链接）。"""
+    try:
+        if dir_mtimes is not None:
+            dir_mtimes[root] = os.stat(root).st_mtime_ns
+        with os.scandir(root) as entries:
+            subdirs = []
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.is_file():
+                    out.append(entry.path)
+    except OSError:
+        return
+    for subdir in subdirs:
+        _walk_files(subdir, out, dir_mtimes)
+
+
+def discover_skill_files(
+    skill_dir: str,
+    dir_mtimes: Optional[Dict[str, int]] = None,
+) -> Dict[str, List[str]]:
+    """发现技能目录中的支持文件（语义与 SkillsRegistry._discover_skill_files 一致）。
+
+    Args:
+        skill_dir: 技能目录路径
+        dir_mtimes: 可选，收集遍历过的目录及其 mtime_ns（供 manifest 校验）
+
+    Returns:
+        {'scripts': [...], 'references': [...], 'assets': [...], 'other_md': [...]}
+    """
+    discovered: Dict[str, List[str]] = {
+        "scripts": [],
+        "references": [],
+        "assets": [],
+        "other_md": [],
+    }
+    try:
+        if dir_mtimes is not None:
+            dir_mtimes[skill_dir] = os.stat(skill_dir).st_mtime_ns
+        with os.scandir(skill_dir) as entries:
+            for entry in entries:
+                if entry.name in SUPPORT_SUBDIRS and entry.is_dir():
+                    _walk_files(entry.path, discovered[entry.name], dir_mtimes)
+                elif (
+                    entry.name.endswith(".md")
+                    and entry.name != "SKILL.md"
+                    and entry.is_file()
+                ):
+                    discovered["other_md"].append(entry.path)
+    except OSError:
+        pass
+    return discovered
+
+
+class WorkspaceScanner:
+    """技能工作空间扫描器。
+
+    使用 os.scandir 列目录（dirent 自带类型信息，省去逐文件 stat），
+    并在线程池中并行解析 frontmatter、发现支持文件。
+    """
+
+    def __init__(self, workspace_dir: str, max_workers: Optional[int] = None):
+        """初始化扫描器。
+
+        Args:
+            workspace_dir: 技能工作空间目录
+            max_workers: 线程数（默认读取 JARVIS_SKILL_SCAN_WORKERS，否则 min(32, cpu+4)）
+        """
+        self.workspace_dir = str(workspace_dir)
+        if max_workers is None:
+            env_workers = os.getenv("JARVIS_SKILL_SCAN_WORKERS")
+            max_workers = int(env_workers) if env_workers else min(32, (os.cpu_count() or 1) + 4)
+        self.max_workers = max(1, max_workers)
+        self.last_timings: Dict[str, Any] = {}
+
+    def list_skill_dirs(self) -> List[Tuple[str, str]]:
+        """列出包含 SKILL.md 的技能目录与 .skill 技能包。
+
+        同名时目录优先于技能包。
+
+        Returns:
+            [(skill_id, skill_dir)] 列表，保持 scandir 顺序（技能包排在目录之后）
+        """
+        skill_dirs: List[Tuple[str, str]] = []
+        archives: List[Tuple[str, str]] = []
+        try:
+            with os.scandir(self.workspace_dir) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        if os.path.isfile(os.path.join(entry.path, "SKILL.md")):
+                            skill_dirs.append((entry.name, entry.path))
+                    elif entry.name.endswith(ARCHIVE_SUFFIX) and entry.is_file():
+                        archives.append((entry.name[:-len(ARCHIVE_SUFFIX)], entry.path))
+        except OSError:
+            return []
+        dir_ids = {skill_id for skill_id, _ in skill_dirs}
+        return skill_dirs + [item for item in archives if item[0] not in dir_ids]
+
+    def _scan_archive(
+        self,
+        item: Tuple[str, str],
+        manifest: Any = None,
+    ) -> Tuple[Optional[ScannedSkill], float, float]:
+        """扫描技能包：只读中央目录与 SKILL.md 成员。"""
+        skill_id, archive_path = item
+        started_at = time.perf_counter()
+        if manifest is not None:
+            cached = manifest.lookup(skill_id, archive_path)
+            if cached is not None:
+                return cached, time.perf_counter() - started_at, 0.0
+        try:
+            archive = mount(archive_path)
+            # frontmatter 总是从包内解析（适配器无法直接读取包内文件）
+            text = archive.read_text("SKILL.md")
+            metadata = read_frontmatter(text.splitlines(keepends=True))
+        except Exception as exc:
+            print(f"读取技能包失败 {archive_path}: {exc}")
+            return None, time.perf_counter() - started_at, 0.0
+        parsed_at = time.perf_counter()
+        scanned = ScannedSkill(
+            skill_id=skill_id,
+            skill_dir=archive_path,
+            skill_md_path=archive.member_path("SKILL.md"),
+            metadata=metadata if isinstance(metadata, dict) else {},
+            discovered_files=archive.discover_files(),
+            dir_mtimes={archive_path: archive.stat_key[0]},
+            skill_md_mtime_ns=archive.stat_key[0],
+            skill_md_size=archive.members["SKILL.md"].file_size,
+            archive=True,
+        )
+        return scanned, parsed_at - started_at, time.perf_counter() - parsed_at
+
+    def _scan_one(
+        self,
+        item: Tuple[str, str],
+        parse_frontmatter: bool,
+        manifest: Any = None,
+    ) -> Tuple[Optional[ScannedSkill], float, float]:
+        skill_id, skill_dir = item
+        if skill_dir.endswith(ARCHIVE_SUFFIX) and not os.path.isdir(skill_dir):
+            return self._scan_archive(item, manifest)
+        skill_md_path = os.path.join(skill_dir, "SKILL.md")
+
+        started_at = time.perf_counter()
+        if manifest is not None:
+            cached = manifest.lookup(skill_id, skill_dir)
+            if cached is not None:
+                return cached, time.perf_counter() - started_at, 0.0
+
+        try:
+            md_stat = os.stat(skill_md_path)
+            md_mtime_ns, md_size = md_stat.st_mtime_ns, md_stat.st_size
+        except OSError:
+            md_mtime_ns, md_size = 0, 0
+
+        metadata: Any = None
+        if manifest is not None:
+            # SKILL.md 内容未变（仅 mtime 变化）时复用已解析的 frontmatter
+            metadata = manifest.metadata_if_unchanged(skill_id, skill_md_path, md_size)
+        if metadata is None:
+            metadata = load_frontmatter(skill_md_path) if parse_frontmatter else {}
+        parsed_at = time.perf_counter()
+        dir_mtimes: Dict[str, int] = {}
+        discovered = discover_skill_files(skill_dir, dir_mtimes)
+        discovered_at = time.perf_counter()
+
+        scanned = ScannedSkill(
+            skill_id=skill_id,
+            skill_dir=skill_dir,
+            skill_md_path=skill_md_path,
+            metadata=metadata if isinstance(metadata, dict) else {},
+            discovered_files=discovered,
+            dir_mtimes=dir_mtimes,
+            skill_md_mtime_ns=md_mtime_ns,
+            skill_md_size=md_size,
+        )
+        return scanned, parsed_at - started_at, discovered_at - parsed_at
+
+    def scan_skill(
+        self,
+        skill_id: str,
+        parse_frontmatter: bool = True,
+        manifest: Any = None,
+    ) -> Optional[ScannedSkill]:
+        """扫描单个技能目录或技能包（增量更新用）。
+
+        Args:
+            skill_id: 技能ID（工作空间下的目录名，或技能包去掉 .skill 后的文件名）
+            parse_frontmatter: 是否解析 frontmatter
+            manifest: 可选的 SkillManifest
+
+        Returns:
+            扫描结果；目录/SKILL.md 与技能包都不存在时返回 None
+        """
+        skill_dir = os.path.join(self.workspace_dir, skill_id)
+        if not os.path.isfile(os.path.join(skill_dir, "SKILL.md")):
+            archive_path = skill_dir + ARCHIVE_SUFFIX
+            if not os.path.isfile(archive_path):
+                return None
+            scanned, _, _ = self._scan_archive((skill_id, archive_path), manifest)
+            return scanned
+        scanned, _, _ = self._scan_one((skill_id, skill_dir), parse_frontmatter, manifest)
+        return scanned
+
+    def scan(self, parse_frontmatter: bool = True, manifest: Any = None) -> List[ScannedSkill]:
+        """扫描工作空间。
+
+        Args:
+            parse_frontmatter: 是否解析 frontmatter（全文解析由适配器负责时可关闭）
+            manifest: 可选的 SkillManifest；命中且未变化的技能目录直接复用缓存
+
+        Returns:
+            扫描结果列表（与目录列举顺序一致）
+        """
+        started_at = time.perf_counter()
+        skill_dirs = self.list_skill_dirs()
+        listed_at = time.perf_counter()
+
+        results: List[ScannedSkill] = []
+        parse_seconds = 0.0
+        discover_seconds = 0.0
+        if skill_dirs:
+            workers = min(self.max_workers, len(skill_dirs))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="skill-scan") as pool:
+                for scanned, parse_s, discover_s in pool.map(
+                    lambda item: self._scan_one(item, parse_frontmatter, manifest), skill_dirs
+                ):
+                    if scanned is None:
+                        continue
+                    results.append(scanned)
+                    parse_seconds += parse_s
+                    discover_seconds += discover_s
+        finished_at = time.perf_counter()
+
+        self.last_timings = {
+            "skills": len(results),
+            "files": sum(
+                len(files)
+                for scanned in results
+                for files in scanned.discovered_files.values()
+            ),
+            "workers": self.max_workers,
+            "cache_hits": sum(1 for scanned in results if scanned.from_cache),
+            "list_ms": round((listed_at - started_at) * 1000, 2),
+            # 以下两项为各线程耗时之和（CPU 视角），wall_ms 为实际墙钟时间
+            "frontmatter_ms": round(parse_seconds * 1000, 2),
+            "discover_ms": round(discover_seconds * 1000, 2),
+            "parallel_ms": round((finished_at - listed_at) * 1000, 2),
+            "wall_ms": round((finished_at - started_at) * 1000, 2),
+        }
+        return results
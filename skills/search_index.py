@@ -0,0 +1,226 @@
+"""Inverted index for skill keyword and tag search."""
+import bisect
+import heapq
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+
+# 拉丁字母/数字词，以及连续的中日韩字符
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-_][a-z0-9]+)*|[\u3040-\u30ff\u3400-\u9fff\uf900-\ufaff]+")
+
+# 字段权重：名称 > 标签 > 描述
+FIELD_WEIGHTS = {"name": 3.0, "tags": 2.0, "description": 1.0}
+
+# 前缀匹配的得分折扣
+PREFIX_WEIGHT = 0.5
+
+# 单个查询词最多展开的前缀词数（避免过短的前缀拖慢查询）
+MAX_PREFIX_EXPANSIONS = 64
+
+
+def tokenize(text: str, query: bool = False) -> List[str]:
+    """分词（小写化；中文按 n-gram 切分）。
+
+    - 拉丁词：整词；含 - 或 _ 的复合词同时输出各部分
+    - 中文：索引时输出单字与二元组；查询时长度 ≥2 的片段只用二元组，提高精度
+
+    Args:
+        text: 待分词文本
+        query: 是否为查询分词
+
+    Returns:
+        词列表（保持出现顺序，可能重复）
+    """
+    tokens: List[str] = []
+    for match in _TOKEN_PATTERN.finditer(text.lower()):
+        run = match.group(0)
+        if run[0].isascii():
+            tokens.append(run)
+            if "-" in run or "_" in run:
+                tokens.extend(part for part in re.split(r"[-_]", run) if part)
+            continue
+        bigrams = [run[i:i + 2] for i in range(len(run) - 1)]
+        if query and bigrams:
+            tokens.extend(bigrams)
+        else:
+            tokens.extend(run)
+            tokens.extend(bigrams)
+    return tokens
+
+
+class SkillSearchIndex:
+    """技能倒排索引。
+
+    维护 词 -> {skill_id: 权重} 与 标签 -> {skill_id}，并保存有序词表
+    用于前缀查找（bisect）。增删单个技能只更新其自身的倒排项。
+    """
+
+    def __init__(self):
+        """初始化空索引。"""
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._tags: Dict[str, Set[str]] = {}
+        self._doc_tokens: Dict[str, Set[str]] = {}
+        self._doc_tags: Dict[str, Set[str]] = {}
+        self._order: Dict[str, int] = {}
+        self._vocabulary: List[str] = []
+        self._counter = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._doc_tokens)
+
+    def add(self, skill: Any) -> None:
+        """索引（或重新索引）一个技能。
+
+        Args:
+            skill: JarvisSkill（使用 skill_id/name/description/tags）
+        """
+        skill_id = skill.skill_id
+        weights: Dict[str, float] = {}
+        fields = {
+            "name": skill.name or "",
+            "description": skill.description or "",
+            "tags": " ".join(str(tag) for tag in (skill.tags or [])),
+        }
+        for field, text in fields.items():
+            weight = FIELD_WEIGHTS[field]
+            for token in tokenize(text):
+                weights[token] = weights.get(token, 0.0) + weight
+        tags = {str(tag) for tag in (skill.tags or [])}
+
+        with self._lock:
+            if skill_id in self._doc_tokens:
+                self._remove_locked(skill_id, keep_order=True)
+            else:
+                self._order[skill_id] = self._counter
+                self._counter += 1
+            for token, weight in weights.items():
+                posting = self._postings.get(token)
+                if posting is None:
+                    posting = self._postings[token] = {}
+                    bisect.insort(self._vocabulary, token)
+                posting[skill_id] = weight
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(skill_id)
+            self._doc_tokens[skill_id] = set(weights)
+            self._doc_tags[skill_id] = tags
+
+    def remove(self, skill_id: str) -> None:
+        """从索引中移除技能。"""
+        with self._lock:
+            self._remove_locked(skill_id)
+
+    def _remove_locked(self, skill_id: str, keep_order: bool = False) -> None:
+        for token in self._doc_tokens.pop(skill_id, ()):
+            posting = self._postings.get(token)
+            if posting is None:
+                continue
+            posting.pop(skill_id, None)
+            if not posting:
+                del self._postings[token]
+                index = bisect.bisect_left(self._vocabulary, token)
+                if index < len(self._vocabulary) and self._vocabulary[index] == token:
+                    del self._vocabulary[index]
+        for tag in self._doc_tags.pop(skill_id, ()):
+            holders = self._tags.get(tag)
+            if holders is not None:
+                holders.discard(skill_id)
+                if not holders:
+                    del self._tags[tag]
+        if not keep_order:
+            self._order.pop(skill_id, None)
+
+    def rebuild(self, skills: Iterable[Any]) -> None:
+        """按给定技能集合重建索引（保持迭代顺序作为默认排序）。"""
+        fresh = SkillSearchIndex()
+        for skill in skills:
+            fresh.add(skill)
+        with self._lock:
+            self._postings = fresh._postings
+            self._tags = fresh._tags
+            self._doc_tokens = fresh._doc_tokens
+            self._doc_tags = fresh._doc_tags
+            self._order = fresh._order
+            self._vocabulary = fresh._vocabulary
+            self._counter = fresh._counter
+
+    def _expand(self, term: str, prefix: bool) -> List[Tuple[str, float]]:
+        """查询词 -> [(索引词, 权重系数)]：精确匹配 + 前缀匹配。"""
+        matches: List[Tuple[str, float]] = []
+        if term in self._postings:
+            matches.append((term, 1.0))
+        if prefix and term.isascii() and len(term) >= 2:
+            start = bisect.bisect_right(self._vocabulary, term)
+            for token in self._vocabulary[start:start + MAX_PREFIX_EXPANSIONS]:
+                if not token.startswith(term):
+                    break
+                matches.append((token, PREFIX_WEIGHT))
+        return matches
+
+    def search(self, query: str, limit: int = 0, prefix: bool = True) -> List[Tuple[str, float]]:
+        """多词排序查询。
+
+        先按命中的查询词个数排序，再按字段加权得分排序，最后按注册顺序。
+
+        Args:
+            query: 查询文本（可含多个词，中英文均可）
+            limit: 最多返回条数（0 表示不限）
+            prefix: 是否启用前缀匹配
+
+        Returns:
+            [(skill_id, score)] 列表
+        """
+        terms = list(dict.fromkeys(tokenize(query, query=True)))
+        if not terms:
+            return []
+        with self._lock:
+            per_term: List[Dict[str, float]] = []
+            for term in terms:
+                expansions = self._expand(term, prefix)
+                if not expansions:
+                    continue
+                token, factor = expansions[0]
+                posting = self._postings[token]
+                if factor == 1.0:
+                    matched = dict(posting)
+                else:
+                    matched = {skill_id: weight * factor for skill_id, weight in posting.items()}
+                # 同一查询词的多个展开只取最高分
+                for token, factor in expansions[1:]:
+                    for skill_id, weight in self._postings[token].items():
+                        score = weight * factor
+                        if score > matched.get(skill_id, 0.0):
+                            matched[skill_id] = score
+                per_term.append(matched)
+            order = self._order
+
+        if not per_term:
+            return []
+        if len(per_term) == 1:
+            scores = per_term[0]
+
+            def rank_key(item: Tuple[str, float]) -> Tuple:
+                return (-item[1], order.get(item[0], 0))
+        else:
+            scores = {}
+            hits: Dict[str, int] = {}
+            for matched in per_term:
+                for skill_id, score in matched.items():
+                    scores[skill_id] = scores.get(skill_id, 0.0) + score
+                    hits[skill_id] = hits.get(skill_id, 0) + 1
+
+            def rank_key(item: Tuple[str, float]) -> Tuple:
+                return (-hits[item[0]], -item[1], order.get(item[0], 0))
+
+        if limit:
+            return heapq.nsmallest(limit, scores.items(), key=rank_key)
+        return sorted(scores.items(), key=rank_key)
+
+    def search_tags(self, tags: Iterable[Any]) -> List[str]:
+        """按标签查找（命中任一标签即返回，按注册顺序排列）。"""
+        with self._lock:
+            found: Set[str] = set()
+            for tag in tags:
+                found.update(self._tags.get(str(tag), ()))
+            return sorted(found, key=lambda skill_id: self._order.get(skill_id, 0))
@@ -0,0 +1,215 @@
+"""Section index for progressive disclosure of long SKILL.md files."""
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from skills.search_index import tokenize
+
+
+_HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+_FENCE_PATTERN = re.compile(r"^\s*(```|~~~)")
+_CJK_PATTERN = re.compile(r"[\u3040-\u30ff\u3400-\u9fff\uf900-\ufaff]")
+
+# 标题命中查询词时的额外权重
+HEADING_BOOST = 2.0
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算 token 数：中日韩字符约 1 token/字，其余约 4 字符/token。"""
+    cjk = len(_CJK_PATTERN.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+@dataclass
+class SkillSection:
+    """SKILL.md 中的一个章节（按标题切分，不含子章节嵌套）。"""
+
+    number: int  # 章节编号（0 为标题前的前言/frontmatter）
+    heading: str
+    level: int  # 标题级别（前言为 0）
+    start: int  # UTF-8 字节偏移
+    end: int
+    tokens: int
+    keywords: Dict[str, int] = field(default_factory=dict)  # 词 -> 词频
+    heading_terms: frozenset = frozenset()
+
+
+class SectionIndex:
+    """单个技能文档的章节索引。"""
+
+    def __init__(self, text: str, sections: List[SkillSection]):
+        self._data = text.encode("utf-8")
+        self.char_length = len(text)
+        self.sections = sections
+        self.total_tokens = sum(section.tokens for section in sections)
+        document_frequency: Counter = Counter()
+        for section in sections:
+            document_frequency.update(section.keywords.keys())
+        count = max(1, len(sections))
+        self._idf = {
+            term: math.log(1 + count / freq) for term, freq in document_frequency.items()
+        }
+
+    def section_text(self, section: SkillSection) -> str:
+        """按字节偏移取出章节原文。"""
+        return self._data[section.start:section.end].decode("utf-8")
+
+    def score(self, query: str) -> Dict[int, float]:
+        """计算各章节与查询的相关度（词频对数 × idf，标题命中加权）。"""
+        terms = set(tokenize(query, query=True))
+        scores: Dict[int, float] = {}
+        for section in self.sections:
+            total = 0.0
+            for term in terms:
+                tf = section.keywords.get(term)
+                if not tf:
+                    continue
+                weight = (1 + math.log(tf)) * self._idf.get(term, 0.0)
+                if term in section.heading_terms:
+                    weight *= HEADING_BOOST
+                total += weight
+            if total > 0:
+                scores[section.number] = total
+        return scores
+
+    def select(
+        self,
+        query: str,
+        budget_tokens: int,
+        required: Iterable[int] = (),
+    ) -> List[SkillSection]:
+        """在 token 预算内选出与任务最相关的章节。
+
+        前言（frontmatter 与首个标题前的内容）与 required 中的章节总是包含，
+        其中 required 章节不占用预算（展开请求是在预算之外追加）；其余章节按
+        相关度贪心加入。没有任何章节命中查询时，按文档顺序填充。
+
+        Args:
+            query: 任务文本
+            budget_tokens: token 预算
+            required: 必须包含的章节编号（如 LLM 请求展开的章节）
+
+        Returns:
+            选中的章节（按文档顺序）
+        """
+        by_number = {section.number: section for section in self.sections}
+        chosen: Dict[int, SkillSection] = {}
+        used = 0
+        if 0 in by_number:
+            chosen[0] = by_number[0]
+            used = by_number[0].tokens
+        for number in required:
+            if number in by_number:
+                chosen[number] = by_number[number]
+
+        scores = self.score(query)
+        if scores:
+            candidates = sorted(scores, key=lambda number: (-scores[number], number))
+        else:
+            candidates = [section.number for section in self.sections]
+        for number in candidates:
+            section = by_number[number]
+            if number in chosen or used + section.tokens > budget_tokens:
+                continue
+            chosen[number] = section
+            used += section.tokens
+        return [chosen[number] for number in sorted(chosen)]
+
+    def render_excerpt(self, selected: List[SkillSection]) -> str:
+        """拼接选中章节的原文，省略处以编号提示。"""
+        parts: List[str] = []
+        expected = 0
+        for section in selected:
+            if section.number > expected:
+                skipped = ", ".join(f"§{n}" for n in range(expected, section.number))
+                parts.append(f"\n…（已省略章节 {skipped}）…\n\n")
+            parts.append(self.section_text(section))
+            expected = section.number + 1
+        if expected < len(self.sections):
+            skipped = ", ".join(f"§{n}" for n in range(expected, len(self.sections)))
+            parts.append(f"\n…（已省略章节 {skipped}）…\n")
+        return "".join(parts)
+
+    def render_toc(self, included: Iterable[int]) -> str:
+        """生成目录（编号、标题、token 估算，✓ 表示已包含）。"""
+        included = set(included)
+        lines = []
+        for section in self.sections:
+            indent = "  " * max(0, section.level - 1)
+            mark = "✓" if section.number in included else " "
+            lines.append(
+                f"{mark} §{section.number} {indent}{section.heading} (~{section.tokens} tokens)"
+            )
+        return "\n".join(lines)
+
+
+def build_section_index(text: str) -> SectionIndex:
+    """按 Markdown 标题切分文档并建立章节索引（忽略代码块中的 #）。
+
+    Args:
+        text: SKILL.md 全文
+
+    Returns:
+        SectionIndex
+    """
+    boundaries = [(0, "(前言)", 0)]  # (字节偏移, 标题, 级别)
+    offset = 0
+    in_fence = False
+    for line in text.splitlines(keepends=True):
+        if _FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+        elif not in_fence:
+            match = _HEADING_PATTERN.match(line.rstrip("\r\n"))
+            if match:
+                boundaries.append((offset, match.group(2), len(match.group(1))))
+        offset += len(line.encode("utf-8"))
+
+    data = text.encode("utf-8")
+    sections: List[SkillSection] = []
+    for position, (start, heading, level) in enumerate(boundaries):
+        end = boundaries[position + 1][0] if position + 1 < len(boundaries) else len(data)
+        if end <= start and position == 0:
+            continue  # 文档以标题开头：没有前言
+        body = data[start:end].decode("utf-8")
+        sections.append(
+            SkillSection(
+                number=len(sections),
+                heading=heading,
+                level=level,
+                start=start,
+                end=end,
+                tokens=estimate_tokens(body),
+                keywords=dict(Counter(tokenize(body))),
+                heading_terms=frozenset(tokenize(heading)),
+            )
+        )
+    return SectionIndex(text, sections)
+
+
+def disclose(
+    index: SectionIndex,
+    query: str,
+    budget_tokens: int,
+    expand: Optional[Iterable[int]] = None,
+) -> Dict[str, object]:
+    """生成渐进式披露的摘录与目录。
+
+    Args:
+        index: 章节索引
+        query: 任务文本
+        budget_tokens: token 预算
+        expand: 额外需要展开的章节编号
+
+    Returns:
+        {'excerpt', 'toc', 'included', 'excerpt_tokens'}
+    """
+    selected = index.select(query, budget_tokens, required=expand or ())
+    included = [section.number for section in selected]
+    return {
+        "excerpt": index.render_excerpt(selected),
+        "toc": index.render_toc(included),
+        "included": included,
+        "excerpt_tokens": sum(section.tokens for section in selected),
+    }
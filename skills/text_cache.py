@@ -0,0 +1,156 @@
+"""Bounded LRU cache for skill text and resolved references."""
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from skills.archive import archive_stat_key, read_archive_text
+
+
+# 默认缓存上限：8 MiB 解码文本
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+
+
+def _stat_key(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        # .skill 技能包内的虚拟路径：以包文件的 mtime/size 校验
+        return archive_stat_key(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class SkillTextCache:
+    """SKILL.md 全文与引用解析结果的 LRU 缓存。
+
+    条目按路径索引，并用 (mtime_ns, size) 校验：文件变化后自动失效。
+    缓存总大小按解码文本的 UTF-8 字节数计算，超出上限时淘汰最久未用的条目。
+    命中时只需一次 stat，不再读取文件。
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        """初始化缓存。
+
+        Args:
+            max_bytes: 缓存字节上限（默认读取 JARVIS_SKILL_CACHE_MAX_BYTES，否则 8 MiB）
+        """
+        if max_bytes is None:
+            max_bytes = int(os.getenv("JARVIS_SKILL_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Any, Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _get(self, key: Tuple[str, str], validator: Any) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == validator:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            self.misses += 1
+            return False, None
+
+    def _put(self, key: Tuple[str, str], validator: Any, value: Any, size: int) -> None:
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (validator, value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted[2]
+                self.evictions += 1
+
+    def read_text(self, path: str) -> Optional[str]:
+        """读取文本文件（UTF-8，支持 .skill 技能包内路径），命中缓存时不读盘。
+
+        Args:
+            path: 文件路径
+
+        Returns:
+            文件内容；文件不存在时返回 None
+        """
+        path = str(path)
+        validator = _stat_key(path)
+        if validator is None:
+            return None
+        hit, value = self._get(("text", path), validator)
+        if hit:
+            return value
+        if os.path.isfile(path):
+            with open(path, "r", encoding="utf-8") as handle:
+                text = handle.read()
+        else:
+            # 技能包成员：按需解压
+            text = read_archive_text(path)
+            if text is None:
+                return None
+        # 读取期间文件可能被改写：以读取后的 stat 作为校验值，避免缓存过期内容
+        if _stat_key(path) == validator:
+            self._put(("text", path), validator, text, len(text.encode("utf-8")))
+        return text
+
+    def get_references(
+        self,
+        skill_md_path: str,
+        resolve: Callable[[], List[str]],
+        watch_dirs: Iterable[str] = (),
+    ) -> List[str]:
+        """获取（缓存的）引用文件解析结果。
+
+        以 SKILL.md 及 watch_dirs 中各目录的 (mtime_ns, size) 作为校验值，
+        SKILL.md 改动或这些目录内增删文件时重新解析。
+
+        Args:
+            skill_md_path: SKILL.md 路径
+            resolve: 未命中时调用的解析函数
+            watch_dirs: 引用文件所在的目录（技能目录、references/ 等）
+
+        Returns:
+            引用文件路径列表
+        """
+        skill_md_path = str(skill_md_path)
+        validator = (_stat_key(skill_md_path),) + tuple(
+            _stat_key(str(path)) for path in watch_dirs
+        )
+        hit, value = self._get(("refs", skill_md_path), validator)
+        if hit:
+            return list(value)
+        references = resolve()
+        size = sum(len(ref) for ref in references)
+        self._put(("refs", skill_md_path), validator, list(references), size)
+        return references
+
+    def invalidate(self, path: str) -> None:
+        """移除某个路径的所有缓存条目。"""
+        path = str(path)
+        with self._lock:
+            for kind in ("text", "refs"):
+                entry = self._entries.pop((kind, path), None)
+                if entry is not None:
+                    self._bytes -= entry[2]
+
+    def clear(self) -> None:
+        """清空缓存。"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """返回命中统计。"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
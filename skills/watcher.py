@@ -0,0 +1,237 @@
+"""Hot-reload watcher for the skills workspace."""
+import os
+import select
+import threading
+import time
+from typing import Any, Dict, Optional, Set, Tuple
+
+from core.utils.inotify import (
+    IN_CHANGES,
+    IN_CREATE,
+    IN_IGNORED,
+    IN_ISDIR,
+    IN_MOVED_TO,
+    IN_Q_OVERFLOW,
+    Inotify,
+    inotify_available,
+)
+from skills.archive import ARCHIVE_SUFFIX
+from skills.scanner import SUPPORT_SUBDIRS
+
+
+class SkillsWatcher:
+    """技能工作空间监听器（后台线程）。
+
+    优先使用 inotify 监听工作空间及各技能目录，不可用时回退到定时轮询
+    目录 mtime。检测到技能目录新增、变化或删除后，只重新解析受影响的技能，
+    通过 SkillsRegistry.reload_skill 原子更新注册表并递增版本号。
+    所有工作都在后台线程完成，不阻塞事件循环。
+    """
+
+    def __init__(
+        self,
+        skills_registry: Any,
+        poll_interval: float = 2.0,
+        debounce_seconds: float = 0.3,
+        use_inotify: Optional[bool] = None,
+    ):
+        """初始化监听器。
+
+        Args:
+            skills_registry: 技能注册表
+            poll_interval: 轮询模式的扫描间隔（秒）
+            debounce_seconds: 事件合并窗口（秒），避免编辑器多次写入触发多次重载
+            use_inotify: 是否使用 inotify（None 表示自动检测）
+        """
+        self.skills_registry = skills_registry
+        self.workspace_dir = os.path.abspath(str(skills_registry.workspace_dir))
+        self.poll_interval = poll_interval
+        self.debounce_seconds = debounce_seconds
+        self.use_inotify = inotify_available() if use_inotify is None else use_inotify
+        self.mode: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """启动后台监听线程。"""
+        if self._thread and self._thread.is_alive():
+            return
+        if not os.path.isdir(self.workspace_dir):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="skills-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """停止监听线程。"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        if self.use_inotify:
+            try:
+                self.mode = "inotify"
+                self._run_inotify()
+                return
+            except OSError as exc:
+                print(f"技能监听 inotify 不可用，回退到轮询: {exc}")
+        self.mode = "polling"
+        self._run_polling()
+
+    def _apply(self, skill_ids: Set[str]) -> None:
+        """重新加载（或移除）受影响的技能。"""
+        for skill_id in sorted(skill_ids):
+            was_registered = skill_id in self.skills_registry.skills
+            try:
+                skill = self.skills_registry.reload_skill(skill_id)
+            except Exception as exc:
+                print(f"技能热加载失败 {skill_id}: {exc}")
+                continue
+            if skill:
+                print(f"\n技能已更新: {skill.name} ({skill.skill_id})")
+            elif was_registered:
+                print(f"\n技能已移除: {skill_id}")
+
+    def _skill_id_for(self, path: str) -> Optional[str]:
+        rel = os.path.relpath(path, self.workspace_dir)
+        if rel.startswith(os.pardir) or rel == os.curdir:
+            return None
+        skill_id = rel.split(os.sep, 1)[0]
+        if skill_id.endswith(ARCHIVE_SUFFIX):
+            skill_id = skill_id[:-len(ARCHIVE_SUFFIX)]
+        return skill_id
+
+    # ---- inotify 模式 ----
+
+    def _watch_tree(
+        self,
+        inotify: Inotify,
+        watches: Dict[int, str],
+        root: str,
+        is_skill_dir: bool = True,
+    ) -> None:
+        """监听目录树（技能目录只下钻 scripts/references/assets 子树）。"""
+        pending = [root]
+        while pending:
+            current = pending.pop()
+            try:
+                watches[inotify.add_watch(current, IN_CHANGES)] = current
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        if not entry.is_dir(follow_symlinks=False):
+                            continue
+                        if is_skill_dir and current == root and entry.name not in SUPPORT_SUBDIRS:
+                            continue
+                        pending.append(entry.path)
+            except OSError:
+                continue
+
+    def _run_inotify(self) -> None:
+        with Inotify() as inotify:
+            watches: Dict[int, str] = {}
+            watches[inotify.add_watch(self.workspace_dir, IN_CHANGES)] = self.workspace_dir
+            with os.scandir(self.workspace_dir) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        self._watch_tree(inotify, watches, entry.path)
+
+            pending: Set[str] = set()
+            deadline = 0.0
+            while not self._stop.is_set():
+                timeout = self.debounce_seconds if pending else 0.5
+                ready, _, _ = select.select([inotify.fd], [], [], timeout)
+                if ready:
+                    for event in inotify.read_events():
+                        if event.mask & IN_Q_OVERFLOW:
+                            # 事件队列溢出：对所有技能目录做一次增量重载
+                            pending.update(self._list_skill_ids())
+                            pending.update(self.skills_registry.skills.keys())
+                            continue
+                        if event.mask & IN_IGNORED:
+                            watches.pop(event.wd, None)
+                            continue
+                        base = watches.get(event.wd)
+                        if base is None:
+                            continue
+                        path = os.path.join(base, event.name) if event.name else base
+                        skill_id = self._skill_id_for(path)
+                        if not skill_id:
+                            continue
+                        if event.mask & IN_ISDIR and event.mask & (IN_CREATE | IN_MOVED_TO):
+                            # 新目录：补充监听（新技能目录或技能内新建的子目录）
+                            self._watch_tree(
+                                inotify, watches, path,
+                                is_skill_dir=(base == self.workspace_dir),
+                            )
+                        pending.add(skill_id)
+                    deadline = time.monotonic() + self.debounce_seconds
+                elif pending and time.monotonic() >= deadline:
+                    self._apply(pending)
+                    pending = set()
+
+    # ---- 轮询模式 ----
+
+    def _list_skill_ids(self) -> Set[str]:
+        try:
+            with os.scandir(self.workspace_dir) as entries:
+                skill_ids = set()
+                for entry in entries:
+                    if entry.is_dir():
+                        skill_ids.add(entry.name)
+                    elif entry.name.endswith(ARCHIVE_SUFFIX):
+                        skill_ids.add(entry.name[:-len(ARCHIVE_SUFFIX)])
+                return skill_ids
+        except OSError:
+            return set()
+
+    def _fingerprint(self, skill_dir: str) -> Tuple:
+        """技能目录指纹：SKILL.md 的 mtime/size + 相关目录的 mtime（及同名技能包）。"""
+        parts = []
+        try:
+            archive_stat = os.stat(skill_dir + ARCHIVE_SUFFIX)
+            parts.append((ARCHIVE_SUFFIX, archive_stat.st_mtime_ns, archive_stat.st_size))
+        except OSError:
+            pass
+        try:
+            md_stat = os.stat(os.path.join(skill_dir, "SKILL.md"))
+            parts.append(("SKILL.md", md_stat.st_mtime_ns, md_stat.st_size))
+        except OSError:
+            parts.append(("SKILL.md", None, None))
+        pending = [skill_dir]
+        while pending:
+            current = pending.pop()
+            try:
+                parts.append((current, os.stat(current).st_mtime_ns))
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        if not entry.is_dir(follow_symlinks=False):
+                            continue
+                        if current == skill_dir and entry.name not in SUPPORT_SUBDIRS:
+                            continue
+                        pending.append(entry.path)
+            except OSError:
+                continue
+        return tuple(sorted(parts, key=lambda item: item[0]))
+
+    def _snapshot(self) -> Dict[str, Tuple]:
+        return {
+            skill_id: self._fingerprint(os.path.join(self.workspace_dir, skill_id))
+            for skill_id in self._list_skill_ids()
+        }
+
+    def _run_polling(self) -> None:
+        previous = self._snapshot()
+        while not self._stop.wait(self.poll_interval):
+            current = self._snapshot()
+            changed = {
+                skill_id
+                for skill_id in set(previous) | set(current)
+                if previous.get(skill_id) != current.get(skill_id)
+            }
+            if changed:
+                self._apply(changed)
+            previous = current
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Batch Skill Packager - Validates and packages every skill in a workspace in parallel
+
+Usage:
+    python batch_package.py <skills-workspace> [output-directory] [--jobs N] [--validate-only] [--force]
+
+Example:
+    python batch_package.py skills_workspace ./dist
+    python batch_package.py skills_workspace --validate-only --jobs 8
+
+Skills are processed across a process pool. Each skill's content hash is kept in
+<output-directory>/.skill-build-cache.json; skills whose files are unchanged since
+the last run are skipped (a file stat check avoids re-reading them at all).
+Archives are reproducible, so an unchanged skill always yields the same bytes.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from package_skill import archive_mode, collect_skill_files, write_skill_archive
+from quick_validate import validate_skill_md
+
+CACHE_FILENAME = ".skill-build-cache.json"
+
+# Bump when validation rules or the archive layout change, to invalidate old cache entries
+CACHE_VERSION = 2
+
+
+def find_skills(workspace):
+    """Return the skill folders (directories containing SKILL.md) in a workspace, sorted by name"""
+    workspace = Path(workspace)
+    return sorted(
+        (path for path in workspace.iterdir() if path.is_dir() and (path / "SKILL.md").is_file()),
+        key=lambda path: path.name,
+    )
+
+
+def stat_fingerprint(entries):
+    """Cheap fingerprint of a skill's file list: paths, sizes, mtimes and archive modes (no file reads)"""
+    digest = hashlib.sha256()
+    for arcname, file_path in entries:
+        stat = os.stat(file_path)
+        mode = archive_mode(stat.st_mode)
+        digest.update(f"{arcname}\0{stat.st_size}\0{stat.st_mtime_ns}\0{mode:o}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def process_skill(job):
+    """
+    Validate (and optionally package) one skill. Runs in a worker process.
+
+    Every file is read exactly once: the same bytes feed the content hash,
+    validation of SKILL.md and the archive.
+
+    Args:
+        job: dict with skill_path, output_dir, fingerprint, cached (previous cache entry or None)
+
+    Returns:
+        Result dict with status: packaged | validated | unchanged | invalid | error
+    """
+    started = time.perf_counter()
+    skill_path = Path(job["skill_path"])
+    result = {"skill": skill_path.name, "fingerprint": job["fingerprint"], "bytes": 0, "files": 0}
+    try:
+        entries = collect_skill_files(skill_path)
+        contents = []
+        digest = hashlib.sha256()
+        for arcname, file_path in entries:
+            mode = os.stat(file_path).st_mode
+            data = file_path.read_bytes()
+            contents.append((arcname, data, mode))
+            digest.update(arcname.encode("utf-8") + b"\0" + len(data).to_bytes(8, "big"))
+            digest.update(archive_mode(mode).to_bytes(2, "big"))
+            digest.update(data)
+            result["bytes"] += len(data)
+        result["files"] = len(contents)
+        result["content_hash"] = digest.hexdigest()
+
+        cached = job.get("cached") or {}
+        archive = Path(job["output_dir"]) / f"{skill_path.name}.skill" if job["output_dir"] else None
+        if (
+            cached.get("content_hash") == result["content_hash"]
+            and cached.get("valid")
+            and (archive is None or archive.is_file())
+        ):
+            result.update(status="unchanged", valid=True, message=cached.get("message", ""))
+            return result
+
+        skill_md = (skill_path / "SKILL.md").read_bytes().decode("utf-8")
+        valid, message = validate_skill_md(skill_md)
+        result.update(valid=valid, message=message)
+        if not valid:
+            result["status"] = "invalid"
+        elif archive is None:
+            result["status"] = "validated"
+        else:
+            write_skill_archive(archive, contents)
+            result["status"] = "packaged"
+            result["archive"] = str(archive)
+    except Exception as e:
+        result.update(status="error", valid=False, message=str(e))
+    finally:
+        result["seconds"] = time.perf_counter() - started
+    return result
+
+
+def load_cache(cache_path):
+    try:
+        with open(cache_path, "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != CACHE_VERSION:
+        return {}
+    return data.get("skills", {})
+
+
+def save_cache(cache_path, skills):
+    cache_path = Path(cache_path)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump({"version": CACHE_VERSION, "skills": skills}, handle, indent=2, sort_keys=True)
+    os.replace(tmp_path, cache_path)
+
+
+def batch_package(workspace, output_dir=None, jobs=None, force=False, cache_path=None):
+    """
+    Validate and package every skill in a workspace.
+
+    Args:
+        workspace: Folder containing skill folders
+        output_dir: Where .skill files go; None validates only
+        jobs: Worker processes (defaults to CPU count)
+        force: Ignore the incremental cache
+        cache_path: Cache file (defaults to <output_dir>/.skill-build-cache.json,
+                    or <workspace>/.skill-build-cache.json when validating only)
+
+    Returns:
+        (results, summary) where results is a list of per-skill result dicts
+    """
+    started = time.perf_counter()
+    workspace = Path(workspace).resolve()
+    if output_dir:
+        output_dir = Path(output_dir).resolve()
+        output_dir.mkdir(parents=True, exist_ok=True)
+    if cache_path is None:
+        cache_path = (output_dir or workspace) / CACHE_FILENAME
+    mode = "package" if output_dir else "validate"
+    cache = {} if force else load_cache(cache_path)
+
+    results = []
+    pending = []
+    for skill_path in find_skills(workspace):
+        cached = cache.get(skill_path.name, {})
+        if cached.get("mode") != mode:
+            cached = {}
+        try:
+            fingerprint = stat_fingerprint(collect_skill_files(skill_path))
+        except OSError as e:
+            results.append({"skill": skill_path.name, "status": "error", "valid": False,
+                            "message": str(e), "bytes": 0, "files": 0, "seconds": 0.0})
+            continue
+        archive = output_dir / f"{skill_path.name}.skill" if output_dir else None
+        if (
+            cached.get("fingerprint") == fingerprint
+            and cached.get("valid")
+            and (archive is None or archive.is_file())
+        ):
+            # Nothing touched since the last run: skip without reading any file
+            results.append({"skill": skill_path.name, "status": "unchanged", "valid": True,
+                            "message": cached.get("message", ""), "bytes": 0, "files": 0,
+                            "seconds": 0.0, "fingerprint": fingerprint,
+                            "content_hash": cached.get("content_hash")})
+            continue
+        pending.append({
+            "skill_path": str(skill_path),
+            "output_dir": str(output_dir) if output_dir else None,
+            "fingerprint": fingerprint,
+            "cached": cached,
+        })
+
+    if pending:
+        workers = max(1, min(jobs or os.cpu_count() or 1, len(pending)))
+        if workers == 1:
+            results.extend(process_skill(job) for job in pending)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results.extend(executor.map(process_skill, pending))
+    results.sort(key=lambda result: result["skill"])
+
+    for result in results:
+        if result.get("content_hash"):
+            cache[result["skill"]] = {
+                "mode": mode,
+                "fingerprint": result.get("fingerprint"),
+                "content_hash": result["content_hash"],
+                "valid": result["valid"],
+                "message": result.get("message", ""),
+            }
+    present = {result["skill"] for result in results}
+    save_cache(cache_path, {name: entry for name, entry in cache.items() if name in present})
+
+    elapsed = time.perf_counter() - started
+    processed = [result for result in results if result["status"] != "unchanged"]
+    summary = {
+        "skills": len(results),
+        "processed": len(processed),
+        "unchanged": len(results) - len(processed),
+        "failed": sum(1 for result in results if result["status"] in ("invalid", "error")),
+        "bytes": sum(result["bytes"] for result in processed),
+        "seconds": elapsed,
+        "workers": min(jobs or os.cpu_count() or 1, max(1, len(pending))),
+    }
+    return results, summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate and package every skill in a workspace")
+    parser.add_argument("workspace", help="Folder containing skill folders")
+    parser.add_argument("output_dir", nargs="?", help="Output directory for .skill files")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--validate-only", action="store_true", help="Validate without packaging")
+    parser.add_argument("--force", action="store_true", help="Ignore the incremental cache")
+    args = parser.parse_args()
+
+    if not Path(args.workspace).is_dir():
+        print(f"❌ Error: Workspace not found: {args.workspace}")
+        sys.exit(1)
+    output_dir = None if args.validate_only else (args.output_dir or Path.cwd())
+
+    results, summary = batch_package(args.workspace, output_dir, jobs=args.jobs, force=args.force)
+
+    icons = {"packaged": "📦", "validated": "✅", "unchanged": "⏭️ ", "invalid": "❌", "error": "❌"}
+    for result in results:
+        line = f"{icons[result['status']]} {result['skill']}: {result['status']}"
+        if result["status"] in ("invalid", "error"):
+            line += f" - {result['message']}"
+        elif result["status"] != "unchanged":
+            line += f" ({result['files']} files, {result['seconds'] * 1000:.0f} ms)"
+        print(line)
+
+    seconds = summary["seconds"] or 1e-9
+    print(
+        f"\n{summary['skills']} skills in {seconds:.2f}s with {summary['workers']} worker(s): "
+        f"{summary['processed']} processed, {summary['unchanged']} unchanged, {summary['failed']} failed"
+    )
+    print(
+        f"Throughput: {summary['skills'] / seconds:.1f} skills/s, "
+        f"{summary['bytes'] / seconds / 1024 / 1024:.2f} MiB/s read"
+    )
+    sys.exit(1 if summary["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
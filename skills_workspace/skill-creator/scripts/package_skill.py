@@ -8,13 +8,97 @@ Usage:
 Example:
     python utils/package_skill.py skills/public/my-skill
     python utils/package_skill.py skills/public/my-skill ./dist
+
+Archives are reproducible: entries are sorted, timestamps are fixed, permissions
+are normalised to 0755 (owner-executable sources) or 0644, and __pycache__/*.pyc
+files are left out. To validate and package a whole
+workspace in parallel, see batch_package.py.
 """
 
+import os
+import stat
 import sys
+import time
 import zipfile
 from pathlib import Path
 from quick_validate import validate_skill
 
+# Fixed timestamp for every entry so identical content gives identical archives
+# (SOURCE_DATE_EPOCH is honoured when set; zip cannot store dates before 1980)
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+
+# Build byproducts that would make archives differ between machines
+EXCLUDED_DIRS = {'__pycache__', '.git'}
+EXCLUDED_SUFFIXES = {'.pyc', '.pyo'}
+EXCLUDED_NAMES = {'.DS_Store'}
+
+
+def _zip_timestamp():
+    epoch = os.environ.get('SOURCE_DATE_EPOCH')
+    if not epoch:
+        return ZIP_EPOCH
+    stamp = time.gmtime(max(int(epoch), 315532800))
+    return stamp[:5] + (stamp[5] // 2 * 2,)
+
+
+def archive_mode(file_mode):
+    """Normalised permission bits for an archive entry: 0755 if the source is owner-executable, else 0644"""
+    return 0o755 if file_mode & stat.S_IXUSR else 0o644
+
+
+def collect_skill_files(skill_path):
+    """
+    List the files that go into a skill package, in archive order.
+
+    Args:
+        skill_path: Path to the skill folder
+
+    Returns:
+        Sorted list of (arcname, file_path); arcnames are "<skill-name>/<relative/posix/path>"
+    """
+    skill_path = Path(skill_path)
+    entries = []
+    for root, dirs, files in os.walk(skill_path):
+        dirs[:] = [d for d in dirs if d not in EXCLUDED_DIRS]
+        for name in files:
+            if name in EXCLUDED_NAMES or os.path.splitext(name)[1] in EXCLUDED_SUFFIXES:
+                continue
+            file_path = Path(root) / name
+            arcname = file_path.relative_to(skill_path.parent).as_posix()
+            entries.append((arcname, file_path))
+    entries.sort(key=lambda entry: entry[0])
+    return entries
+
+
+def write_skill_archive(skill_filename, entries):
+    """
+    Write a reproducible .skill file: sorted entries, fixed timestamps, normalised permissions.
+
+    Args:
+        skill_filename: Output path
+        entries: Iterable of (arcname, data) or (arcname, data, mode) where data is bytes or
+                 a file path; mode is the source's st_mode (taken from the file path when omitted,
+                 0644 for bytes without a mode)
+    """
+    timestamp = _zip_timestamp()
+    tmp_filename = Path(f"{skill_filename}.tmp")
+    try:
+        with zipfile.ZipFile(tmp_filename, 'w', zipfile.ZIP_DEFLATED, compresslevel=9) as zipf:
+            for arcname, data, *mode in entries:
+                if not isinstance(data, bytes):
+                    if not mode:
+                        mode = [os.stat(data).st_mode]
+                    data = Path(data).read_bytes()
+                info = zipfile.ZipInfo(arcname, date_time=timestamp)
+                info.compress_type = zipfile.ZIP_DEFLATED
+                info.create_system = 3  # Unix, so the permission bits below are honoured
+                info.external_attr = (stat.S_IFREG | archive_mode(mode[0] if mode else 0)) << 16
+                zipf.writestr(info, data, compresslevel=9)
+        os.replace(tmp_filename, skill_filename)
+    except BaseException:
+        tmp_filename.unlink(missing_ok=True)
+        raise
+
 
 def package_skill(skill_path, output_dir=None):
     """
@@ -63,16 +147,12 @@ def package_skill(skill_path, output_dir=None):
 
     skill_filename = output_path / f"{skill_name}.skill"
 
-    # Create the .skill file (zip format)
+    # Create the .skill file (zip format, reproducible)
     try:
-        with zipfile.ZipFile(skill_filename, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            # Walk through the skill directory
-            for file_path in skill_path.rglob('*'):
-                if file_path.is_file():
-                    # Calculate the relative path within the zip
-                    arcname = file_path.relative_to(skill_path.parent)
-                    zipf.write(file_path, arcname)
-                    print(f"  Added: {arcname}")
+        entries = collect_skill_files(skill_path)
+        write_skill_archive(skill_filename, entries)
+        for arcname, _ in entries:
+            print(f"  Added: {arcname}")
 
         print(f"\n✅ Successfully packaged skill to: {skill_filename}")
         return skill_filename
@@ -18,8 +18,12 @@ def validate_skill(skill_path):
     if not skill_md.exists():
         return False, "SKILL.md not found"
 
+    return validate_skill_md(skill_md.read_text())
+
+
+def validate_skill_md(content):
+    """Validate the text of a SKILL.md (used when the file is already in memory)"""
     # Read and validate frontmatter
-    content = skill_md.read_text()
     if not content.startswith('---'):
         return False, "No YAML frontmatter found"
 
@@ -0,0 +1,108 @@
+"""Tests for skill-creator packaging scripts (single and batch)."""
+import os
+import stat
+import sys
+import zipfile
+from pathlib import Path
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "skills_workspace" / "skill-creator" / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from batch_package import batch_package  # noqa: E402
+from package_skill import package_skill, write_skill_archive  # noqa: E402
+
+
+def _write_skill(root: Path, name: str) -> Path:
+    """创建一个可通过校验的最小技能（含一个可执行脚本）。"""
+    skill_dir = root / name
+    (skill_dir / "scripts" / "__pycache__").mkdir(parents=True)
+    (skill_dir / "SKILL.md").write_text(
+        f"---\nname: {name}\ndescription: {name} skill\n---\n\n# {name}\n", encoding="utf-8"
+    )
+    script = skill_dir / "scripts" / "run.py"
+    script.write_text("print('ok')\n", encoding="utf-8")
+    script.chmod(0o755)
+    (skill_dir / "scripts" / "data.txt").write_text("data\n", encoding="utf-8")
+    (skill_dir / "scripts" / "__pycache__" / "run.cpython-311.pyc").write_bytes(b"\0")
+    return skill_dir
+
+
+def _statuses(results):
+    return {result["skill"]: result["status"] for result in results}
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    root = tmp_path / "workspace"
+    root.mkdir()
+    _write_skill(root, "alpha-skill")
+    _write_skill(root, "beta-skill")
+    return root
+
+
+class TestPackageSkill:
+    def test_archive_is_reproducible_and_keeps_exec_bit(self, workspace, tmp_path, capsys):
+        first = package_skill(workspace / "alpha-skill", tmp_path / "one")
+        second = package_skill(workspace / "alpha-skill", tmp_path / "two")
+        assert first.read_bytes() == second.read_bytes()
+
+        with zipfile.ZipFile(first) as archive:
+            modes = {info.filename: info.external_attr >> 16 for info in archive.infolist()}
+        assert modes == {
+            "alpha-skill/SKILL.md": stat.S_IFREG | 0o644,
+            "alpha-skill/scripts/data.txt": stat.S_IFREG | 0o644,
+            "alpha-skill/scripts/run.py": stat.S_IFREG | 0o755,
+        }
+
+    def test_failed_write_removes_temp_file(self, tmp_path):
+        target = tmp_path / "broken.skill"
+        with pytest.raises(OSError):
+            write_skill_archive(target, [("broken/SKILL.md", tmp_path / "missing.md")])
+        assert not target.exists()
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestBatchPackage:
+    def test_batch_matches_single_archives(self, workspace, tmp_path, capsys):
+        results, summary = batch_package(workspace, tmp_path / "batch", jobs=2)
+        assert _statuses(results) == {"alpha-skill": "packaged", "beta-skill": "packaged"}
+        assert summary["failed"] == 0
+        for name in ("alpha-skill", "beta-skill"):
+            single = package_skill(workspace / name, tmp_path / "single")
+            assert (tmp_path / "batch" / f"{name}.skill").read_bytes() == single.read_bytes()
+
+    def test_cache_skips_unchanged_and_touched_skills(self, workspace, tmp_path):
+        output = tmp_path / "dist"
+        batch_package(workspace, output, jobs=1)
+        archive = output / "alpha-skill.skill"
+        packaged = archive.read_bytes()
+
+        # 未改动：按 stat 指纹跳过，不读取文件
+        results, summary = batch_package(workspace, output, jobs=1)
+        assert _statuses(results) == {"alpha-skill": "unchanged", "beta-skill": "unchanged"}
+        assert [result["files"] for result in results] == [0, 0]
+        assert summary["processed"] == 0
+
+        # 只更新 mtime：指纹变化，但内容哈希一致，仍不重新打包
+        data_file = workspace / "alpha-skill" / "scripts" / "data.txt"
+        stamp = data_file.stat().st_mtime_ns + 5_000_000_000
+        os.utime(data_file, ns=(stamp, stamp))
+        archive.touch()
+        before = archive.stat().st_mtime_ns
+        results, _ = batch_package(workspace, output, jobs=1)
+        assert _statuses(results) == {"alpha-skill": "unchanged", "beta-skill": "unchanged"}
+        assert [result["files"] for result in results] == [3, 0]
+        assert archive.stat().st_mtime_ns == before
+        assert archive.read_bytes() == packaged
+
+        # 去掉执行位：内容不变，但归档权限不同，需要重新打包
+        (workspace / "alpha-skill" / "scripts" / "run.py").chmod(0o644)
+        results, _ = batch_package(workspace, output, jobs=1)
+        assert _statuses(results) == {"alpha-skill": "packaged", "beta-skill": "unchanged"}
+        assert archive.read_bytes() != packaged
+
+        # force 忽略缓存
+        results, _ = batch_package(workspace, output, jobs=1, force=True)
+        assert _statuses(results) == {"alpha-skill": "packaged", "beta-skill": "packaged"}
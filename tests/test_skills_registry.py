@@ -0,0 +1,411 @@
+"""Tests for skills registry scanning and loading."""
+import shutil
+import time
+from pathlib import Path
+
+import pytest
+
+from core.utils.inotify import inotify_available
+from skills.registry import SkillsRegistry
+from skills.scanner import WorkspaceScanner
+from skills.watcher import SkillsWatcher
+
+
+def _write_skill(root: Path, skill_id: str, body: str = "", tags: str = "[demo]") -> Path:
+    """在工作空间中创建一个最小技能目录。
+
+    Args:
+        root: 工作空间目录
+        skill_id: 技能ID（目录名）
+        body: SKILL.md 正文
+        tags: frontmatter 中的 tags
+
+    Returns:
+        技能目录路径
+    """
+    skill_dir = root / skill_id
+    (skill_dir / "scripts" / "nested").mkdir(parents=True)
+    (skill_dir / "references").mkdir()
+    (skill_dir / "SKILL.md").write_text(
+        f"---\nname: {skill_id}\ndescription: {skill_id} skill\ntags: {tags}\n---\n\n{body}",
+        encoding="utf-8",
+    )
+    (skill_dir / "scripts" / "run.py").write_text("print('ok')\n", encoding="utf-8")
+    (skill_dir / "scripts" / "nested" / "helper.py").write_text("", encoding="utf-8")
+    (skill_dir / "references" / "guide.md").write_text("# Guide\n", encoding="utf-8")
+    (skill_dir / "NOTES.md").write_text("notes\n", encoding="utf-8")
+    return skill_dir
+
+
+class TestWorkspaceScanner:
+    """测试 scandir 并行扫描器。"""
+
+    def test_discovers_same_files_as_registry(self, tmp_path):
+        """测试扫描结果与注册表的文件发现语义一致。"""
+        _write_skill(tmp_path, "alpha")
+        _write_skill(tmp_path, "beta")
+        (tmp_path / "not-a-skill").mkdir()
+
+        scanner = WorkspaceScanner(str(tmp_path), max_workers=2)
+        results = {item.skill_id: item for item in scanner.scan()}
+
+        assert sorted(results) == ["alpha", "beta"]
+        registry = SkillsRegistry(workspace_dir=str(tmp_path))
+        expected = registry._discover_skill_files(tmp_path / "alpha")
+        discovered = results["alpha"].discovered_files
+        for kind, files in expected.items():
+            assert sorted(discovered[kind]) == sorted(str(f) for f in files)
+        assert results["alpha"].metadata["name"] == "alpha"
+        assert scanner.last_timings["skills"] == 2
+
+    def test_scan_workspace_registers_skills(self, tmp_path):
+        """测试 scan_workspace 注册技能并记录阶段耗时。"""
+        _write_skill(tmp_path, "alpha", tags="writing")
+
+        registry = SkillsRegistry(workspace_dir=str(tmp_path))
+        registry.scan_workspace()
+
+        skill = registry.get("alpha")
+        assert skill is not None
+        assert skill.tags == ["writing"]
+        assert len(skill.metadata["discovered_files"]["scripts"]) == 2
+        assert "wall_ms" in registry.last_scan_timings
+
+
+class TestSkillManifest:
+    """测试技能 manifest 缓存。"""
+
+    def test_unchanged_skills_come_from_cache(self, tmp_path):
+        """测试第二次启动复用缓存，变化的技能重新解析。"""
+        workspace = tmp_path / "ws"
+        workspace.mkdir()
+        _write_skill(workspace, "alpha")
+        _write_skill(workspace, "beta")
+        manifest_path = tmp_path / "cache" / "skills_manifest.json"
+
+        first = SkillsRegistry(workspace_dir=str(workspace), manifest_path=str(manifest_path))
+        first.scan_workspace()
+        assert manifest_path.exists()
+        assert first.last_scan_timings["cache_hits"] == 0
+
+        (workspace / "beta" / "scripts" / "extra.py").write_text("", encoding="utf-8")
+        second = SkillsRegistry(workspace_dir=str(workspace), manifest_path=str(manifest_path))
+        second.scan_workspace()
+        assert second.last_scan_timings["cache_hits"] == 1
+        beta_scripts = second.get("beta").metadata["discovered_files"]["scripts"]
+        assert any(path.endswith("extra.py") for path in beta_scripts)
+        assert second.get("alpha").description == "alpha skill"
+
+        third = SkillsRegistry(workspace_dir=str(workspace), manifest_path=str(manifest_path))
+        third.scan_workspace(rebuild_cache=True)
+        assert third.last_scan_timings["cache_hits"] == 0
+
+
+class TestSkillsWatcher:
+    """测试技能热加载监听器。"""
+
+    @pytest.mark.parametrize("use_inotify", [True, False])
+    def test_detects_added_changed_removed(self, tmp_path, use_inotify):
+        """测试新增、修改、删除技能目录后注册表增量更新。"""
+        if use_inotify and not inotify_available():
+            pytest.skip("inotify 不可用")
+        _write_skill(tmp_path, "alpha")
+        registry = SkillsRegistry(workspace_dir=str(tmp_path))
+        registry.scan_workspace()
+        watcher = SkillsWatcher(
+            registry, poll_interval=0.1, debounce_seconds=0.05, use_inotify=use_inotify
+        )
+        watcher.start()
+        try:
+            time.sleep(0.2)
+            version = registry.version
+            _write_skill(tmp_path, "beta")
+            assert _wait_for(lambda: registry.get("beta") is not None)
+            assert registry.version > version
+
+            (tmp_path / "alpha" / "SKILL.md").write_text(
+                "---\nname: alpha\ndescription: changed\n---\n", encoding="utf-8"
+            )
+            assert _wait_for(lambda: registry.get("alpha").description == "changed")
+
+            shutil.rmtree(tmp_path / "beta")
+            assert _wait_for(lambda: registry.get("beta") is None)
+        finally:
+            watcher.stop()
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+class TestSkillTextCache:
+    """测试技能全文 LRU 缓存。"""
+
+    def test_hits_until_file_changes(self, tmp_path):
+        """测试重复加载命中缓存，文件变化后重新读取。"""
+        skill_dir = _write_skill(tmp_path, "alpha", body="see references/guide.md\n")
+        registry = SkillsRegistry(workspace_dir=str(tmp_path))
+        registry.scan_workspace()
+
+        first = registry.load_skill_fulltext("alpha", include_references=True)
+        assert "# Guide" in first
+        misses = registry.text_cache.stats()["misses"]
+        assert registry.load_skill_fulltext("alpha", include_references=True) == first
+        assert registry.list_skill_references("alpha")[0]["name"] == "guide.md"
+        assert registry.text_cache.stats()["misses"] == misses
+
+        (skill_dir / "references" / "guide.md").write_text("# Guide v2\n", encoding="utf-8")
+        assert "# Guide v2" in registry.load_skill_fulltext("alpha", include_references=True)
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """测试超过字节上限时淘汰最久未用的条目。"""
+        from skills.text_cache import SkillTextCache
+
+        paths = []
+        for name in ("a", "b", "c"):
+            path = tmp_path / f"{name}.md"
+            path.write_text(name * 40, encoding="utf-8")
+            paths.append(path)
+        cache = SkillTextCache(max_bytes=100)
+        cache.read_text(paths[0])
+        cache.read_text(paths[1])
+        cache.read_text(paths[0])
+        cache.read_text(paths[2])
+
+        stats = cache.stats()
+        assert stats["evictions"] == 1
+        assert stats["bytes"] <= 100
+        cache.read_text(paths[0])
+        assert cache.stats()["hits"] == 2
+
+
+class TestReferenceResolver:
+    """测试单次扫描的引用解析器。"""
+
+    def test_matches_discovered_files_and_builds_graph(self, tmp_path):
+        """测试引用解析只认已发现文件，并构建传递引用图。"""
+        skill_dir = _write_skill(
+            tmp_path,
+            "alpha",
+            body="Read NOTES.md first. See references/guide.md, missing.md and /etc/passwd.md.\n",
+        )
+        (skill_dir / "references" / "guide.md").write_text(
+            "# Guide\nsee references/deep.md\n", encoding="utf-8"
+        )
+        (skill_dir / "references" / "deep.md").write_text("# Deep\n", encoding="utf-8")
+        registry = SkillsRegistry(workspace_dir=str(tmp_path))
+        registry.scan_workspace()
+
+        refs = registry.list_skill_references("alpha")
+        assert [ref["path"] for ref in refs] == ["NOTES.md", "references/guide.md"]
+
+        registry.load_skill_fulltext("alpha")
+        assert registry.reference_graphs["alpha"] == {
+            "SKILL.md": ["NOTES.md", "references/guide.md"],
+            "NOTES.md": [],
+            "references/guide.md": ["references/deep.md"],
+            "references/deep.md": [],
+        }
+
+
+class TestSkillArchive:
+    """测试 .skill 技能包的原地挂载。"""
+
+    def test_registry_mounts_archive_and_python_run_extracts_scripts(self, tmp_path):
+        """测试技能包无需解压即可注册、读取引用，脚本按需提取到缓存。"""
+        import asyncio
+        import zipfile
+
+        from tools.python_run import PythonRunTool
+
+        source = tmp_path / "src"
+        source.mkdir()
+        _write_skill(source, "packed", body="see references/guide.md\n")
+        workspace = tmp_path / "skills_workspace"
+        workspace.mkdir()
+        with zipfile.ZipFile(workspace / "packed.skill", "w", zipfile.ZIP_DEFLATED) as archive:
+            for path in sorted((source / "packed").rglob("*")):
+                if path.is_file():
+                    archive.write(path, path.relative_to(source))
+
+        registry = SkillsRegistry(
+            workspace_dir=str(workspace), manifest_path=str(tmp_path / "manifest.json")
+        )
+        registry.scan_workspace()
+        skill = registry.get("packed")
+        assert skill is not None and skill.description == "packed skill"
+        assert len(skill.metadata["discovered_files"]["scripts"]) == 2
+        assert "# Guide" in registry.load_skill_fulltext("packed", include_references=True)
+        assert registry.reference_graphs["packed"]["SKILL.md"] == ["references/guide.md"]
+
+        cached = SkillsRegistry(
+            workspace_dir=str(workspace), manifest_path=str(tmp_path / "manifest.json")
+        )
+        cached.scan_workspace()
+        assert cached.last_scan_timings["cache_hits"] == 1
+
+        tool = PythonRunTool(project_root=str(tmp_path), sandbox_root=str(tmp_path / "sandbox"))
+        result = asyncio.run(
+            tool.execute({"script_path": "skills_workspace/packed.skill/scripts/run.py"})
+        )
+        assert result["ok"] and result["stdout_excerpt"].strip() == "ok"
+        assert result["meta"]["script_path"].startswith("memory/cache/skill_scripts/")
+
+
+class TestScriptBytecodeCache:
+    """测试技能脚本的字节码预编译与引导执行。"""
+
+    def test_scan_precompiles_and_python_run_uses_bootstrap(self, tmp_path, monkeypatch):
+        """测试扫描时预编译、执行语义不变、源码修改后重新编译。"""
+        import asyncio
+
+        from skills.bytecode import bytecode_path, is_fresh
+        from tools.python_run import PythonRunTool
+
+        monkeypatch.delenv("JARVIS_SKILL_PYCACHE", raising=False)
+        workspace = tmp_path / "skills_workspace"
+        workspace.mkdir()
+        skill_dir = _write_skill(workspace, "runner")
+        script = skill_dir / "scripts" / "main.py"
+        script.write_text(
+            "import sys\nprint(__name__, sys.argv[1:], sys.path[0].endswith('scripts'))\n",
+            encoding="utf-8",
+        )
+
+        registry = SkillsRegistry(workspace_dir=str(workspace))
+        registry.scan_workspace()
+        assert registry.last_scan_timings["precompile"]["compiled"] == 3
+        pyc = bytecode_path(str(script), registry.pycache_root)
+        assert is_fresh(pyc, str(script))
+
+        registry.scan_workspace()
+        assert registry.last_scan_timings["precompile"]["fresh"] == 3
+
+        tool = PythonRunTool(project_root=str(tmp_path), sandbox_root=str(tmp_path / "sandbox"))
+        assert Path(tool.pycache_root) == Path(registry.pycache_root)
+        run = {"script_path": "skills_workspace/runner/scripts/main.py", "args": ["a"]}
+        result = asyncio.run(tool.execute(run))
+        assert result["stdout_excerpt"].strip() == "__main__ ['a'] True"
+
+        script.write_text("print('changed')\n", encoding="utf-8")
+        result = asyncio.run(tool.execute(run))
+        assert result["stdout_excerpt"].strip() == "changed"
+        assert is_fresh(pyc, str(script))
+
+
+class TestSkillSearchIndex:
+    """测试技能倒排索引。"""
+
+    def test_ranked_prefix_cjk_and_incremental_updates(self, tmp_path):
+        """测试多词排序、前缀、中文 n-gram 与增删同步。"""
+        from core.contracts.skill import JarvisSkill
+
+        registry = SkillsRegistry(workspace_dir=str(tmp_path))
+        registry.register(JarvisSkill("reviewer", "code-reviewer", "审查代码质量", tags=["code"]))
+        registry.register(JarvisSkill("wechat", "公众号写作", "生成微信公众号文章", tags=["writing"]))
+        registry.register(JarvisSkill("docs", "docs", "write code documentation", tags=["writing"]))
+
+        assert [s.skill_id for s in registry.search_by_keyword("code review")] == ["reviewer", "docs"]
+        assert [s.skill_id for s in registry.search_by_keyword("公众号")] == ["wechat"]
+        assert [s.skill_id for s in registry.search_by_keyword("docu")] == ["docs"]
+        assert [s.skill_id for s in registry.search_by_tags(["writing"])] == ["wechat", "docs"]
+
+        registry.register(JarvisSkill("wechat", "wechat", "newsletter", tags=[]))
+        assert registry.search_by_keyword("公众号") == []
+        assert [s.skill_id for s in registry.search_by_tags(["writing"])] == ["docs"]
+
+
+class TestSkillDocument:
+    """测试共享的 SKILL.md 解析阶段。"""
+
+    def test_adapters_share_one_read(self, tmp_path):
+        """测试被第一个适配器拒绝的文件不会被重新读取。"""
+        from skills.adapters.agentskills_adapter import AgentSkillsAdapter
+        from skills.adapters.claude_code_adapter import ClaudeCodeAdapter
+
+        skill_dir = tmp_path / "plain"
+        skill_dir.mkdir()
+        # 缺少 description：Agent Skills 适配器拒绝，Claude Code 适配器接受
+        (skill_dir / "SKILL.md").write_text("---\nname: plain\n---\n\nBody\n", encoding="utf-8")
+        registry = SkillsRegistry(workspace_dir=str(tmp_path))
+        registry.adapters = [AgentSkillsAdapter(), ClaudeCodeAdapter()]
+        registry.scan_workspace(load_fulltext=True)
+
+        skill = registry.get("plain")
+        assert skill is not None and skill.instructions_md == "Body"
+        assert registry.text_cache.stats()["misses"] == 1
+        assert registry.load_skill_fulltext("plain").endswith("Body\n")
+        assert registry.text_cache.stats()["hits"] >= 1
+
+
+class TestSectionDisclosure:
+    """测试章节索引与渐进式披露。"""
+
+    def test_select_within_budget_and_expand(self, tmp_path):
+        """测试按相关度选章节、预算约束与展开请求。"""
+        filler = "filler text " * 200
+        body = (
+            "Intro line\n\n"
+            f"## Setup\n{filler}\n"
+            "## Deploy\nRun the deploy script to publish the release.\n"
+            "```\n# not a heading\n```\n"
+            f"## Appendix\n{filler}\n"
+        )
+        _write_skill(tmp_path, "long", body=body)
+        registry = SkillsRegistry(workspace_dir=str(tmp_path))
+        registry.scan_workspace()
+        registry.load_skill_fulltext("long", include_references=False)
+
+        index = registry.section_index("long")
+        assert [s.heading for s in index.sections] == ["(前言)", "Setup", "Deploy", "Appendix"]
+
+        from skills.sections import disclose
+
+        result = disclose(index, "deploy the release", budget_tokens=200)
+        assert result["included"] == [0, 2]
+        assert "# not a heading" in result["excerpt"]
+        assert "已省略章节 §1" in result["excerpt"]
+        assert "✓ §2" in result["toc"] and "  §3" in result["toc"]
+
+        expanded = disclose(index, "deploy the release", budget_tokens=200, expand=[3])
+        assert expanded["included"] == [0, 2, 3]
+
+    def test_planner_expands_requested_sections_once(self, tmp_path, monkeypatch):
+        """测试 Planner 在 LLM 请求展开章节后重新规划一次。"""
+        import asyncio
+
+        from core.contracts.task import Task
+        from core.orchestrator.planner import Planner
+
+        monkeypatch.setenv("LLM_ENABLE_PLANNER", "1")
+        monkeypatch.setenv("JARVIS_SKILL_SECTION_BUDGET", "100")
+        fulltext = "## Usage\nUse the tool.\n## Details\n" + "detail " * 400
+
+        class FakeLLM:
+            def __init__(self):
+                self.prompts = []
+
+            def complete_json(self, purpose, system, user, schema_hint, chat_history_messages=None):
+                self.prompts.append(user)
+                if len(self.prompts) == 1:
+                    return {"steps": [], "expand_sections": [1, 99]}
+                return {"steps": [{"tool_id": "file", "params": {"operation": "list", "path": "."}}]}
+
+        llm = FakeLLM()
+        plan = asyncio.run(Planner().create_plan(
+            Task(task_id="t1", description="use the tool"),
+            available_tools={"file": object()},
+            skill_fulltext=fulltext,
+            llm_client=llm,
+        ))
+        assert len(llm.prompts) == 2
+        assert "detail detail" not in llm.prompts[0]
+        assert "detail detail" in llm.prompts[1]
+        assert '"expand_sections": [章节编号]' in llm.prompts[0]
+        assert '"expand_sections": [章节编号]' not in llm.prompts[1]
+        assert plan.steps and plan.steps[0].tool_id == "file"
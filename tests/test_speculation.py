@@ -0,0 +1,88 @@
+"""Tests for speculative skill prefetch and stage timing."""
+import asyncio
+import threading
+import time
+
+from core.orchestrator.speculation import SkillPrefetch, StageTimer
+
+
+class _FakeRegistry:
+    """只实现 load_skill_fulltext 的技能注册表。"""
+
+    def __init__(self, fail_first: bool = False, block: threading.Event = None):
+        self.calls = []
+        self.fail_first = fail_first
+        self.block = block
+
+    def load_skill_fulltext(self, skill_id: str, include_references: bool = False) -> str:
+        self.calls.append(skill_id)
+        if self.block is not None:
+            self.block.wait(5)
+        if self.fail_first and len(self.calls) == 1:
+            raise OSError("disk error")
+        return f"# {skill_id}"
+
+
+class TestStageTimer:
+    def test_overlapping_stages_report_saving(self):
+        async def run():
+            timer = StageTimer()
+            await asyncio.gather(
+                timer.run("a", asyncio.sleep(0.1)),
+                timer.run("b", asyncio.sleep(0.1)),
+            )
+            timer.call("c", time.sleep, 0.01)
+            timer.finish()
+            return timer.summary()
+
+        summary = asyncio.run(run())
+        assert set(summary["stages_ms"]) == {"a", "b", "c"}
+        assert summary["sequential_ms"] >= 200
+        assert summary["wall_ms"] < summary["sequential_ms"]
+        assert summary["saved_ms"] == summary["sequential_ms"] - summary["wall_ms"]
+
+
+class TestSkillPrefetch:
+    def test_hit_reuses_prefetched_text(self):
+        registry = _FakeRegistry()
+
+        async def run():
+            timer = StageTimer()
+            prefetch = SkillPrefetch(registry, "demo", timer=timer)
+            loaded = await prefetch.load("demo")
+            return loaded, timer
+
+        (fulltext, prefetched), timer = asyncio.run(run())
+        assert (fulltext, prefetched) == ("# demo", True)
+        assert registry.calls == ["demo"]
+        assert "skill_prefetch" in timer.stages
+
+    def test_miss_discards_and_loads_final_skill(self):
+        release = threading.Event()
+        registry = _FakeRegistry(block=release)
+
+        async def run():
+            prefetch = SkillPrefetch(registry, "demo", timer=StageTimer())
+            assert not prefetch.matches("other")
+            assert not prefetch.matches(None)
+            prefetch.discard()
+            release.set()
+            loaded = await prefetch.load("other")
+            return prefetch, loaded
+
+        prefetch, (fulltext, prefetched) = asyncio.run(run())
+        assert (fulltext, prefetched) == ("# other", False)
+        assert prefetch._job.cancelled()
+        assert registry.calls[-1] == "other"
+
+    def test_failed_prefetch_falls_back_to_fulltext_load(self):
+        registry = _FakeRegistry(fail_first=True)
+
+        async def run():
+            prefetch = SkillPrefetch(registry, "demo")
+            assert await prefetch.result() is None
+            return await prefetch.load("demo")
+
+        fulltext, prefetched = asyncio.run(run())
+        assert (fulltext, prefetched) == ("# demo", False)
+        assert registry.calls == ["demo", "demo"]
@@ -0,0 +1,893 @@
+"""Tests for the plan step scheduler in ToolRunner."""
+import asyncio
+import os
+
+import pytest
+
+from core.contracts.skill import PlanStep
+from core.contracts.tool import Tool
+from tools.runner import ToolRunner, step_resources
+
+
+class _SleepTool(Tool):
+    """记录执行区间的假工具。"""
+
+    def __init__(self, tool_id: str, log: list):
+        super().__init__(tool_id=tool_id, name=tool_id, description=tool_id, parameters={})
+        self.log = log
+
+    async def execute(self, params):
+        self.log.append(("start", params["path"]))
+        await asyncio.sleep(params.get("sleep", 0.05))
+        self.log.append(("end", params["path"]))
+        if params.get("fail"):
+            raise RuntimeError("boom")
+        return {"path": params["path"]}
+
+
+def _step(step_id, path, tool_id="file", **extra):
+    depends_on = extra.pop("depends_on", None)
+    return PlanStep(step_id, tool_id, step_id, params={"path": path, **extra}, depends_on=depends_on)
+
+
+class TestRunPlan:
+    """测试依赖感知的并行调度。"""
+
+    def test_parallel_with_conflicts_dependencies_and_ordered_callbacks(self):
+        """测试独立步骤并行、同路径串行、依赖失败跳过、回调保持计划顺序。"""
+        log = []
+        tools = {"file": _SleepTool("file", log)}
+        steps = [
+            _step("a", "outputs/a.txt", fail=True),
+            _step("b", "outputs/b.txt"),
+            _step("c", "./outputs/a.txt"),
+            _step("d", "outputs/d.txt", depends_on=["a"]),
+        ]
+        emitted = []
+        report = asyncio.run(ToolRunner().run_plan(
+            steps, tools.get, max_parallel=4,
+            on_result=lambda step, result: emitted.append((step.step_id, result.success)),
+        ))
+
+        assert emitted == [("a", False), ("b", True), ("c", True), ("d", False)]
+        assert "依赖步骤未成功" in report["results"][3].error
+        # a 与 b 并行；c 与 a 写同一路径，等 a 结束后才开始
+        assert log[:2] == [("start", "outputs/a.txt"), ("start", "outputs/b.txt")]
+        assert log.index(("start", "./outputs/a.txt")) > log.index(("end", "outputs/a.txt"))
+        assert report["peak_concurrency"] == 2
+        assert report["makespan_ms"] < report["serial_ms"]
+
+    def test_exclusive_and_sequential_limit(self):
+        """测试 python_run 独占与 max_parallel=1 时的串行执行。"""
+        assert step_resources(PlanStep("s", "python_run", "", params={"script_path": "x.py"})) == ["*"]
+        assert step_resources(PlanStep("s", "file", "", params={"path": "/./out/x"})) == ["out/x"]
+
+        log = []
+        tools = {"file": _SleepTool("file", log)}
+        steps = [_step("a", "a.txt", sleep=0.01), _step("b", "b.txt", sleep=0.01)]
+        report = asyncio.run(ToolRunner().run_plan(steps, tools.get, max_parallel=1))
+        assert [entry[0] for entry in log] == ["start", "end", "start", "end"]
+        assert report["peak_concurrency"] == 1
+
+
+class TestTimeoutsAndCancellation:
+    """测试超时与取消。"""
+
+    def test_runner_timeout_status(self, monkeypatch):
+        """测试步骤超时返回 status=timeout。"""
+        import tools.runner as runner_module
+
+        monkeypatch.setattr(runner_module, "TIMEOUT_GRACE_SECONDS", 0)
+        tool = _SleepTool("file", [])
+        result = asyncio.run(ToolRunner().run(tool, "s1", {"path": "x", "sleep": 5, "timeout_seconds": 0.05}))
+        assert not result.success and result.status == "timeout"
+        assert result.to_dict()["status"] == "timeout"
+
+    def test_cancel_kills_script_process_group(self, tmp_path):
+        """测试取消计划时终止 python_run 脚本及其派生的子进程。"""
+        import os
+        import time
+
+        from tools.python_run import PythonRunTool
+
+        scripts = tmp_path / "skills_workspace" / "hang" / "scripts"
+        scripts.mkdir(parents=True)
+        (scripts / "hang.py").write_text(
+            "import subprocess, sys, time\n"
+            "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+            "open('child.pid', 'w').write(str(child.pid))\n"
+            "time.sleep(60)\n",
+            encoding="utf-8",
+        )
+        sandbox = tmp_path / "sandbox"
+        tool = PythonRunTool(project_root=str(tmp_path), sandbox_root=str(sandbox))
+        step = PlanStep("s1", "python_run", "hang", params={"script_path": "skills_workspace/hang/scripts/hang.py"})
+        emitted = []
+
+        async def scenario():
+            task = asyncio.ensure_future(ToolRunner().run_plan(
+                [step], {"python_run": tool}.get,
+                on_result=lambda s, r: emitted.append(r.status),
+            ))
+            for _ in range(100):
+                await asyncio.sleep(0.05)
+                if (sandbox / "child.pid").exists() and (sandbox / "child.pid").read_text():
+                    break
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                return True
+            return False
+
+        assert asyncio.run(scenario())
+        assert emitted == ["cancelled"]
+        child_pid = int((sandbox / "child.pid").read_text())
+        for _ in range(50):
+            try:
+                os.kill(child_pid, 0)
+            except ProcessLookupError:
+                break
+            time.sleep(0.05)
+        else:
+            raise AssertionError("子进程未被终止")
+
+
+    @pytest.mark.parametrize("pidfd", [True, False])
+    def test_reaping_does_not_hold_executor_threads(self, monkeypatch, pidfd):
+        """测试等待脚本退出不占用线程池线程（pidfd 与轮询两种方式）。"""
+        import sys
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+
+        from core.utils.process import kill_process_group, spawn_reaped
+
+        if not pidfd:
+            monkeypatch.delattr(os, "pidfd_open", raising=False)
+        command = [sys.executable, "-c", "import time; time.sleep(0.5)"]
+
+        async def scenario():
+            asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=1))
+            processes = [await spawn_reaped(command, ".", dict(os.environ)) for _ in range(3)]
+            started = time.perf_counter()
+            # 等待期间线程池仍可用
+            await asyncio.wait_for(asyncio.to_thread(lambda: None), 0.3)
+            kill_process_group(processes[0].pid)
+            codes = await asyncio.gather(*(process.wait() for process in processes))
+            for process in processes:
+                process.close_pipes()
+            return codes, time.perf_counter() - started, processes
+
+        codes, elapsed, processes = asyncio.run(scenario())
+        assert codes[0] < 0 and codes[1:] == [0, 0]
+        assert elapsed < 1.2
+        assert all(process.rusage is not None for process in processes)
+
+class TestPythonRunAsync:
+    """测试 python_run 不阻塞事件循环。"""
+
+    def test_scripts_run_concurrently_while_loop_stays_responsive(self, tmp_path):
+        """测试多个脚本并发执行，期间事件循环仍可调度其他协程。"""
+        import time
+
+        from tools.python_run import PythonRunTool
+
+        scripts = tmp_path / "skills_workspace" / "slow" / "scripts"
+        scripts.mkdir(parents=True)
+        (scripts / "slow.py").write_text("import time\ntime.sleep(0.5)\nprint('done')\n", encoding="utf-8")
+        tool = PythonRunTool(project_root=str(tmp_path), sandbox_root=str(tmp_path / "sandbox"))
+        params = {"script_path": "skills_workspace/slow/scripts/slow.py"}
+
+        async def scenario():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.02)
+                    ticks += 1
+
+            ticking = asyncio.ensure_future(ticker())
+            started = time.perf_counter()
+            results = await asyncio.gather(*(tool.execute(dict(params)) for _ in range(3)))
+            elapsed = time.perf_counter() - started
+            ticking.cancel()
+            return results, elapsed, ticks
+
+        results, elapsed, ticks = asyncio.run(scenario())
+        assert [r["stdout_excerpt"].strip() for r in results] == ["done"] * 3
+        assert elapsed < 1.4
+        assert ticks >= 10
+
+
+class TestSandboxTracker:
+    """测试沙箱增量变化追踪。"""
+
+    def _exercise(self, root, use_inotify):
+        from tools.sandbox_tracker import SandboxTracker
+
+        (root / "keep.txt").write_text("a")
+        (root / "old.txt").write_text("a")
+        (root / "memory").mkdir()
+        tracker = SandboxTracker(str(root), use_inotify=use_inotify)
+        try:
+            outer = tracker.begin()
+            (root / "old.txt").write_text("changed")
+            inner = tracker.begin()
+            (root / "nested" / "deep").mkdir(parents=True)
+            (root / "nested" / "deep" / "new.txt").write_text("x")
+            (root / "memory" / "ignored.txt").write_text("x")
+            inner_changes = tracker.changes_since(inner)
+            outer_changes = tracker.changes_since(outer)
+            # 已排空的变化记录不会再次出现
+            assert tracker.changes_since(tracker.begin()) == []
+        finally:
+            tracker.close()
+        new_path = os.path.join("nested", "deep", "new.txt")
+        assert inner_changes == [{"path": new_path, "size": 1, "kind": "added"}]
+        assert outer_changes == [
+            {"path": new_path, "size": 1, "kind": "added"},
+            {"path": "old.txt", "size": 7, "kind": "modified"},
+        ]
+
+    def test_scan_mode(self, tmp_path):
+        """测试全量扫描模式下的新增/修改/排除与并发基线。"""
+        self._exercise(tmp_path, use_inotify=False)
+
+    def test_inotify_mode(self, tmp_path):
+        """测试 inotify 模式（不可用时跳过）。"""
+        from core.utils.inotify import inotify_available
+
+        if not inotify_available():
+            pytest.skip("inotify 不可用")
+        self._exercise(tmp_path, use_inotify=True)
+
+
+class TestWarmWorkerPool:
+    """测试预热进程池与冷启动语义一致。"""
+
+    def test_warm_run_matches_cold_semantics(self, tmp_path):
+        """测试 argv/cwd/env/退出码/异常输出一致，超时时终止子进程。"""
+        from tools.python_run import PythonRunTool
+        from tools.warm_pool import WarmWorkerPool, warm_pool_available
+
+        if not warm_pool_available():
+            pytest.skip("当前平台不支持 fork 服务端")
+        scripts = tmp_path / "skills_workspace" / "demo" / "scripts"
+        scripts.mkdir(parents=True)
+        (scripts / "probe.py").write_text(
+            "import os, sys, time\n"
+            "print(sys.argv[1:], os.path.basename(os.getcwd()), os.environ.get('JARVIS_PROBE'), __name__)\n"
+            "if sys.argv[1] == 'fail':\n"
+            "    raise ValueError('boom')\n"
+            "if sys.argv[1] == 'hang':\n"
+            "    time.sleep(30)\n"
+            "sys.exit(3)\n",
+            encoding="utf-8",
+        )
+        tool = PythonRunTool(project_root=str(tmp_path), sandbox_root=str(tmp_path / "sandbox"))
+        tool.warm_pool = WarmWorkerPool(modules=["json"])
+        script = "skills_workspace/demo/scripts/probe.py"
+
+        async def scenario():
+            ok = await tool.execute({"script_path": script, "args": ["a b"], "env": {"JARVIS_PROBE": "1"}})
+            failed = await tool.execute({"script_path": script, "args": ["fail"]})
+            try:
+                await tool.execute({"script_path": script, "args": ["hang"], "timeout_seconds": 1})
+            except TimeoutError:
+                return ok, failed, True
+            return ok, failed, False
+
+        try:
+            ok, failed, timed_out = asyncio.run(scenario())
+        finally:
+            tool.warm_pool.close()
+        assert ok["exit_code"] == 3
+        assert ok["stdout_excerpt"].strip() == "['a b'] sandbox 1 __main__"
+        assert failed["exit_code"] == 1 and "ValueError: boom" in failed["stderr_excerpt"]
+        assert timed_out
+
+
+class TestBoundedCapture:
+    """测试固定内存的输出捕获。"""
+
+    def test_head_tail_and_spill(self, tmp_path):
+        """测试保留开头与末尾、统计总字节数、完整输出写入 spill 文件。"""
+        from core.utils.output_capture import BoundedCapture
+
+        spill = tmp_path / "out.log"
+        capture = BoundedCapture(4, 4, str(spill))
+        for chunk in (b"ab", "中文".encode("utf-8"), b"x" * 100, "尾".encode("utf-8")):
+            capture.feed(chunk)
+        capture.close()
+        assert capture.truncated and capture.total_bytes == 111
+        text = capture.text()
+        # 被截断处切开的多字节字符丢弃，不显示为替换字符
+        assert text.startswith("ab\n... (截断，共 111 字节") and text.endswith("\nx尾")
+        assert "�" not in text
+        assert spill.read_bytes() == b"ab" + "中文".encode("utf-8") + b"x" * 100 + "尾".encode("utf-8")
+
+        small = BoundedCapture(4, 4)
+        small.feed(b"12345678")
+        assert not small.truncated and small.text() == "12345678"
+
+    def test_python_run_large_output(self, tmp_path):
+        """测试大量输出时摘录有界，完整输出写入日志且不计入产物。"""
+        from tools.python_run import PythonRunTool
+
+        scripts = tmp_path / "skills_workspace" / "loud" / "scripts"
+        scripts.mkdir(parents=True)
+        (scripts / "loud.py").write_text(
+            "import sys\nfor i in range(200000):\n    sys.stdout.write(f'{i}\\n')\n", encoding="utf-8"
+        )
+        tool = PythonRunTool(project_root=str(tmp_path), sandbox_root=str(tmp_path / "sandbox"))
+        result = asyncio.run(tool.execute({
+            "script_path": "skills_workspace/loud/scripts/loud.py", "log_output": True,
+        }))
+        meta = result["meta"]
+        assert len(result["stdout_excerpt"]) < 3000 and result["stdout_excerpt"].endswith("199999\n")
+        assert meta["output_truncated"] and meta["stdout_bytes"] == sum(len(f"{i}\n") for i in range(200000))
+        log = tmp_path / "sandbox" / meta["output_logs"]["stdout"]
+        assert log.stat().st_size == meta["stdout_bytes"]
+        assert result["artifacts_changed"] == []
+
+
+class TestArtifactStore:
+    """测试内容寻址产物存储。"""
+
+    def test_ingest_dedupe_unchanged_and_mutation(self, tmp_path):
+        """测试入库去重、stat 未变时直接复用摘要、默认副本不受沙箱文件就地改写影响。"""
+        from core.platform.artifact_store import ArtifactStore, hash_file
+
+        sandbox = tmp_path / "sandbox"
+        sandbox.mkdir()
+        (sandbox / "a.txt").write_text("same")
+        (sandbox / "b.txt").write_text("same")
+        (sandbox / "c.txt").write_text("other")
+        store = ArtifactStore(root=str(tmp_path / "store"), max_workers=4)
+        assert store.dedupe == "copy"
+        paths = [str(sandbox / name) for name in ("a.txt", "b.txt", "c.txt")]
+
+        first = store.ingest(paths)
+        digest = first[paths[0]]["digest"]
+        assert digest == hash_file(paths[0]) and len(digest) == 64
+        assert [first[p]["status"] for p in paths] == ["stored", "deduped", "stored"]
+        # 对象是独立的 inode
+        object_ino = os.stat(store.object_path(digest)).st_ino
+        assert object_ino not in (os.stat(paths[0]).st_ino, os.stat(paths[1]).st_ino)
+
+        assert store.refcount(digest) == 2
+        # 重新打开（索引持久化）：stat 未变，直接复用摘要
+        reopened = ArtifactStore(root=str(tmp_path / "store"))
+        second = reopened.ingest(paths)
+        assert {info["status"] for info in second.values()} == {"unchanged"}
+        # 每个路径只计一次引用
+        assert reopened.refcount(digest) == 2
+
+        # 就地改写沙箱文件：对象与另一个路径都不受影响
+        with open(paths[0], "w") as handle:
+            handle.write("CORRUPT")
+        assert reopened.verify(digest)
+        assert (sandbox / "b.txt").read_text() == "same"
+        third = reopened.ingest([paths[0]])
+        assert third[paths[0]]["status"] == "stored"
+        assert reopened.verify(third[paths[0]]["digest"])
+        assert reopened.refcount(digest) == 1 and reopened.verify(digest)
+
+    def test_sandbox_dedupe_links_identical_files(self, tmp_path):
+        """测试显式开启 sandbox 去重时相同内容的沙箱文件合并为指向对象的硬链接。"""
+        from core.platform.artifact_store import ArtifactStore
+
+        sandbox = tmp_path / "sandbox"
+        sandbox.mkdir()
+        (sandbox / "a.txt").write_text("same")
+        (sandbox / "b.txt").write_text("same")
+        store = ArtifactStore(root=str(tmp_path / "store"), dedupe="sandbox")
+        a, b = str(sandbox / "a.txt"), str(sandbox / "b.txt")
+        result = store.ingest([a, b])
+        digest = result[a]["digest"]
+        assert os.stat(b).st_ino == os.stat(store.object_path(digest)).st_ino
+        assert result[b]["bytes_saved"] == 4 and store.refcount(digest) == 2
+
+    def test_refcounts_follow_paths(self, tmp_path):
+        """测试对象被就地改写时从其他路径恢复、内容变化释放旧引用、prune 回收已删除的产物。"""
+        from core.platform.artifact_store import ArtifactStore
+
+        sandbox = tmp_path / "sandbox"
+        sandbox.mkdir()
+        (sandbox / "a.txt").write_text("same")
+        (sandbox / "b.txt").write_text("same")
+        store = ArtifactStore(root=str(tmp_path / "store"), dedupe="link")
+        a, b = str(sandbox / "a.txt"), str(sandbox / "b.txt")
+        digest = store.ingest([a, b])[a]["digest"]
+        assert store.refcount(digest) == 2
+
+        # link 模式下对象与 a.txt 共享 inode；就地改写后从内容未变的 b.txt 恢复
+        with open(a, "w") as handle:
+            handle.write("mutated")
+        new_digest = store.ingest([a])[a]["digest"]
+        assert store.verify(digest) and store.refcount(digest) == 1
+        assert os.stat(store.object_path(digest)).st_ino == os.stat(b).st_ino
+
+        # 以替换方式改写 b.txt：释放旧对象
+        (sandbox / "b.tmp").write_text("changed")
+        os.replace(sandbox / "b.tmp", b)
+        store.ingest([b])
+        assert store.refcount(digest) == 0
+
+        # 变更记在日志中，重新打开后一致；prune 释放已删除的产物并回收对象
+        assert store.journal_path.exists()
+        os.unlink(a)
+        reopened = ArtifactStore(root=str(tmp_path / "store"), dedupe="link")
+        assert reopened.refcount(new_digest) == 1
+        assert reopened.prune() == {"released": 1, "removed": 2}
+        assert not reopened.object_path(digest).exists() and not reopened.object_path(new_digest).exists()
+        assert not reopened.journal_path.exists()
+
+    def test_runner_records_digests(self, tmp_path):
+        """测试 ToolRunner 为写入的文件记录摘要。"""
+        from core.platform.artifact_store import ArtifactStore
+        from tools.local.file_tool import FileTool
+
+        tool = FileTool(sandbox_root=str(tmp_path / "sandbox"))
+        runner = ToolRunner(artifact_store=ArtifactStore(root=str(tmp_path / "store")))
+        result = asyncio.run(runner.run(tool, "s1", {"operation": "write", "path": "out/x.txt", "content": "hi"}))
+        path = str(tmp_path / "sandbox" / "out" / "x.txt")
+        assert list(result.artifact_digests) == [path]
+        # 默认 copy 模式：对象是独立副本，改写产物不会改动已入库的对象
+        digest = result.artifact_digests[path]
+        asyncio.run(runner.run(tool, "s2", {"operation": "write", "path": "out/x.txt", "content": "changed"}))
+        assert runner.artifact_store.verify(digest)
+        assert result.to_dict()["artifact_digests"][path] == result.artifact_digests[path]
+
+
+class TestRunCache:
+    """测试 python_run 结果缓存。"""
+
+    def test_hit_restores_outputs_and_inputs_invalidate(self, tmp_path):
+        """测试命中时恢复输出与产物，输入文件或参数变化时重新执行。"""
+        from tools.python_run import PythonRunTool
+
+        scripts = tmp_path / "skills_workspace" / "upper" / "scripts"
+        scripts.mkdir(parents=True)
+        (scripts / "upper.py").write_text(
+            "import pathlib, sys\n"
+            "text = pathlib.Path('in.txt').read_text().upper() + sys.argv[1]\n"
+            "pathlib.Path('out').mkdir(exist_ok=True)\n"
+            "pathlib.Path('out/result.txt').write_text(text)\n"
+            "print(text)\n",
+            encoding="utf-8",
+        )
+        sandbox = tmp_path / "sandbox"
+        tool = PythonRunTool(project_root=str(tmp_path), sandbox_root=str(sandbox))
+        (sandbox / "in.txt").write_text("abc")
+        params = {
+            "script_path": "skills_workspace/upper/scripts/upper.py",
+            "args": ["!"], "cache": True, "inputs": ["in.txt"],
+        }
+
+        first = asyncio.run(tool.execute(params))
+        assert not first["meta"]["cached"] and first["stdout_excerpt"] == "ABC!\n"
+        (sandbox / "out" / "result.txt").unlink()
+
+        second = asyncio.run(tool.execute(params))
+        assert second["meta"]["cached"] and second["stdout_excerpt"] == "ABC!\n"
+        assert (sandbox / "out" / "result.txt").read_text() == "ABC!"
+        assert second["artifacts_changed"] == [{"path": "out/result.txt", "size": 4, "kind": "added"}]
+
+        (sandbox / "in.txt").write_text("xyz")
+        assert not asyncio.run(tool.execute(params))["meta"]["cached"]
+        assert not asyncio.run(tool.execute(dict(params, args=["?"])))["meta"]["cached"]
+        assert (sandbox / "out" / "result.txt").read_text() == "XYZ?"
+
+        with pytest.raises(ValueError):
+            asyncio.run(tool.execute(dict(params, inputs=["../outside.txt"])))
+
+
+class TestResourceGovernor:
+    """测试 python_run 资源治理。"""
+
+    def test_rlimits_usage_and_per_skill_slots(self, tmp_path):
+        """测试子进程内的 rlimit、用量统计与同一技能的并发上限。"""
+        import time
+
+        from tools.python_run import PythonRunTool
+        from tools.resource_governor import ResourceGovernor
+
+        scripts = tmp_path / "skills_workspace" / "heavy" / "scripts"
+        scripts.mkdir(parents=True)
+        (scripts / "limits.py").write_text(
+            "import os, resource, time\n"
+            "time.sleep(0.3)\n"
+            "blob = bytearray(32 * 1024 * 1024)\n"
+            "print(resource.getrlimit(resource.RLIMIT_NOFILE)[0], 'JARVIS_RLIMITS' in os.environ)\n",
+            encoding="utf-8",
+        )
+        tool = PythonRunTool(project_root=str(tmp_path), sandbox_root=str(tmp_path / "sandbox"))
+        tool.governor = ResourceGovernor(max_concurrent=4, max_per_skill=1, rlimits={"NOFILE": 256})
+        params = {"script_path": "skills_workspace/heavy/scripts/limits.py"}
+
+        async def scenario():
+            return await asyncio.gather(*(tool.execute(dict(params)) for _ in range(2)))
+
+        started = time.perf_counter()
+        results = asyncio.run(scenario())
+        assert time.perf_counter() - started >= 0.6
+        for result in results:
+            assert result["stdout_excerpt"].split() == ["256", "False"]
+            usage = result["meta"]["resource_usage"]
+            assert usage["accounting"] in ("rusage", "cgroup")
+            assert usage["max_rss_kb"] >= 32 * 1024 and usage["cpu_user_ms"] is not None
+        assert max(result["meta"]["queued_ms"] for result in results) >= 200
+
+    def test_limits_are_opt_in(self, monkeypatch):
+        """测试默认不设 rlimit；没有要设置的限制时不生成前导代码，脚本直接启动。"""
+        from skills.bytecode import launch_command
+        from tools.resource_governor import GOVERNOR_PREAMBLE, ResourceGovernor
+
+        for name in ("CPU", "AS_MB", "NOFILE"):
+            monkeypatch.delenv(f"JARVIS_PYTHON_RLIMIT_{name}", raising=False)
+        monkeypatch.delenv("JARVIS_CGROUP_ROOT", raising=False)
+        governed = ResourceGovernor().prepare()
+        assert governed.env == {} and governed.preamble == ""
+        assert ResourceGovernor(rlimits={"NOFILE": 256}).prepare().preamble == GOVERNOR_PREAMBLE
+
+        monkeypatch.setattr("skills.bytecode.precompile_script", lambda *args: None)
+        command = launch_command("/tmp/script.py", ["x"], "/tmp/cache", governed.preamble)
+        assert "-c" not in command and command[1:] == ["/tmp/script.py", "x"]
+
+    def test_usage_from_parent_and_queue_outside_timeout(self, tmp_path, monkeypatch):
+        """测试用量由父进程回收时取得（os._exit 也有记录），排队等待不计入步骤超时。"""
+        import tools.runner as runner_module
+        from tools.python_run import PythonRunTool
+        from tools.resource_governor import ResourceGovernor
+        from tools.warm_pool import WarmWorkerPool, warm_pool_available
+
+        scripts = tmp_path / "skills_workspace" / "exit" / "scripts"
+        scripts.mkdir(parents=True)
+        (scripts / "hard_exit.py").write_text(
+            "import os, time\n"
+            "blob = bytearray(32 * 1024 * 1024)\n"
+            "time.sleep(0.6)\n"
+            "os._exit(3)\n",
+            encoding="utf-8",
+        )
+        monkeypatch.setattr(runner_module, "TIMEOUT_GRACE_SECONDS", 0)
+        tool = PythonRunTool(project_root=str(tmp_path), sandbox_root=str(tmp_path / "sandbox"))
+        tool.governor = ResourceGovernor(max_concurrent=1, max_per_skill=1, rlimits={})
+        params = {"script_path": "skills_workspace/exit/scripts/hard_exit.py", "timeout_seconds": 1}
+
+        async def scenario():
+            runner = ToolRunner()
+            return await asyncio.gather(*(runner.run(tool, f"s{index}", dict(params)) for index in range(2)))
+
+        pools = [None] + ([WarmWorkerPool(modules=["json"])] if warm_pool_available() else [])
+        try:
+            for pool in pools:
+                tool.warm_pool = pool
+                results = asyncio.run(scenario())
+                # 第二个执行排队约 0.6 秒，加上执行时间超过 1 秒的步骤超时，仍正常完成
+                assert [result.status for result in results] == ["ok", "ok"]
+                for result in results:
+                    assert result.result["exit_code"] == 3
+                    usage = result.result["meta"]["resource_usage"]
+                    assert usage["accounting"] in ("rusage", "cgroup")
+                    assert usage["max_rss_kb"] >= 32 * 1024
+                assert max(result.result["meta"]["queued_ms"] for result in results) >= 400
+        finally:
+            for pool in pools[1:]:
+                pool.close()
+
+
+class TestFileToolRead:
+    """测试 FileTool 分段、预览与流式读取。"""
+
+    def test_ranges_preview_and_stream(self, tmp_path, monkeypatch):
+        """测试大文件默认预览、按字节/按行读取（mmap）与 iter_chunks。"""
+        from tools.local.file_tool import FileTool
+
+        tool = FileTool(sandbox_root=str(tmp_path))
+        monkeypatch.setattr(FileTool, "LARGE_FILE_THRESHOLD", 1024)
+        monkeypatch.setattr(FileTool, "MMAP_THRESHOLD", 512)
+        text = "".join(f"第{i}行\n" for i in range(1, 501))
+        (tmp_path / "log.txt").write_text(text, encoding="utf-8")
+        data = text.encode("utf-8")
+
+        def read(**params):
+            return asyncio.run(tool.execute({"operation": "read", "path": "log.txt", **params}))
+
+        preview = read()
+        assert "content" not in preview and preview["truncated"] and preview["size"] == len(data)
+        assert read(full=True)["content"] == text
+
+        lines = read(start_line=3, end_line=4)
+        assert lines["content"] == "第3行\n第4行\n" and lines["next_line"] == 5 and not lines["truncated"]
+        capped = read(start_line=499, max_bytes=12)
+        assert capped["content"] == "第499行\n" and capped["next_line"] == 500 and capped["truncated"]
+
+        # 起点落在多字节字符中间：跳到下一个完整字符
+        chunk = read(offset=1, length=20)
+        assert data[chunk["offset"]:chunk["next_offset"]].decode("utf-8") == chunk["content"]
+        assert chunk["content"].startswith("1行")
+
+        async def stream():
+            return b"".join([c async for c in tool.iter_chunks("log.txt", chunk_size=100, offset=5)])
+
+        assert asyncio.run(stream()) == data[5:]
+
+    def test_rejects_negative_ranges(self, tmp_path):
+        """测试负数的 offset/length/行号与非正的 max_bytes 报错，而不是返回错误的范围。"""
+        from tools.local.file_tool import FileTool
+
+        tool = FileTool(sandbox_root=str(tmp_path))
+        (tmp_path / "a.txt").write_text("line1\nline2\n", encoding="utf-8")
+        invalid = [
+            {"offset": -3},
+            {"offset": -3, "length": 2},
+            {"length": -4},
+            {"start_line": -2},
+            {"start_line": 0},
+            {"end_line": 0},
+            {"max_bytes": 0},
+            {"max_bytes": -1},
+            {"offset": "abc"},
+        ]
+        for params in invalid:
+            with pytest.raises(ValueError):
+                asyncio.run(tool.execute({"operation": "read", "path": "a.txt", **params}))
+        assert asyncio.run(tool.execute({"operation": "read", "path": "a.txt", "offset": 0, "length": 0}))["content"] == ""
+
+        async def stream():
+            return [chunk async for chunk in tool.iter_chunks("a.txt", offset=-1)]
+
+        with pytest.raises(ValueError):
+            asyncio.run(stream())
+
+
+class TestFileToolBatch:
+    """测试 FileTool batch 操作与计划合并。"""
+
+    def test_batch_validates_up_front_and_runs_items(self, tmp_path):
+        """测试先校验全部路径、同路径按序执行、strict 与部分结果。"""
+        from tools.local.file_tool import FileTool
+
+        tool = FileTool(sandbox_root=str(tmp_path))
+
+        def batch(operations, **extra):
+            return asyncio.run(tool.execute({"operation": "batch", "operations": operations, **extra}))
+
+        # 任一路径越界：整个 batch 不执行
+        with pytest.raises(ValueError):
+            batch([{"operation": "write", "path": "ok.txt", "content": "x"},
+                   {"operation": "write", "path": "out/../../escape.txt", "content": "x"}])
+        assert not (tmp_path / "ok.txt").exists()
+
+        result = batch([
+            {"operation": "mkdir", "path": "out"},
+            {"operation": "write", "path": "out/a.txt", "content": "1"},
+            {"operation": "write", "path": "b.txt", "content": "2"},
+            {"operation": "write", "path": "out/a.txt", "content": "3"},
+            {"operation": "read", "path": "out/a.txt"},
+            {"operation": "list", "path": "out"},
+        ])
+        assert result["succeeded"] == 6 and result["failed"] == 0
+        assert result["results"][4]["result"]["content"] == "3"
+        assert result["results"][5]["result"]["files"] == [str(tmp_path / "out" / "a.txt")]
+        assert sorted(result["evidence_refs"]) == sorted([str(tmp_path / "out" / "a.txt")] * 2 + [str(tmp_path / "b.txt")])
+
+        with pytest.raises(RuntimeError):
+            batch([{"operation": "read", "path": "missing.txt"}])
+        partial = batch([{"operation": "read", "path": "missing.txt"}, {"operation": "read", "path": "b.txt"}],
+                        strict=False)
+        assert [entry["ok"] for entry in partial["results"]] == [False, True]
+
+    def test_skill_plan_coalesces_writes(self):
+        """测试 skill_to_plan 把连续写入合并为一个 batch 步骤，调度器识别其全部路径。"""
+        from core.contracts.skill import JarvisSkill
+        from skills.runtime.to_plan import skill_to_plan
+
+        skill = JarvisSkill(
+            skill_id="writer", name="Writer", description="d",
+            instructions_md="## 执行步骤\n1. 分析需求\n2. 保存 markdown 文件\n3. 保存元数据 json\n",
+        )
+        plan = skill_to_plan(skill, "t1", "./sandbox")
+        assert len(plan.steps) == 1
+        step = plan.steps[0]
+        assert step.params["operation"] == "batch" and len(step.params["operations"]) == 3
+        assert step_resources(step) == [
+            "sandbox/t1_skill_writer_step1.md", "sandbox/t1_article.md", "sandbox/t1_article_meta.json",
+        ]
+
+    def test_batch_file_writes_keeps_unmergeable_steps(self):
+        """测试缺少 path 或带有额外参数（如 durability）的写入不合并，不报错也不丢参数。"""
+        from skills.runtime.to_plan import batch_file_writes
+
+        def write(step_id, **params):
+            return PlanStep(step_id, "file", step_id, params={"operation": "write", **params})
+
+        steps = [
+            write("a", path="a.txt", content="1"),
+            write("b", path="b.txt", content="2"),
+            write("nopath", content="3"),
+            write("empty", path="", content="4"),
+            write("durable", path="c.txt", content="5", durability="fsync"),
+            write("d", path="d.txt"),
+        ]
+        merged = batch_file_writes(steps)
+        assert [step.step_id for step in merged[1:]] == ["nopath", "empty", "durable", "d"]
+        assert merged[0].params["operations"] == [
+            {"operation": "write", "path": "a.txt", "content": "1"},
+            {"operation": "write", "path": "b.txt", "content": "2"},
+        ]
+        assert merged[3].params["durability"] == "fsync"
+
+
+class TestFileIOExecutor:
+    """测试文件 I/O 线程池与小文件写入合并。"""
+
+    def test_coalescer_merges_concurrent_writes(self):
+        """测试同一轮事件循环中的写入合并为一次任务，单个失败只影响自己。"""
+        import threading
+
+        from core.utils.file_io import WriteCoalescer
+
+        calls = []
+
+        def write(name):
+            calls.append((name, threading.current_thread().name))
+            if name == "bad":
+                raise OSError("disk full")
+            return name.upper()
+
+        coalescer = WriteCoalescer(write)
+
+        async def main():
+            return await asyncio.gather(
+                *(coalescer.write(name) for name in ("a", "bad", "c")), return_exceptions=True,
+            )
+
+        results = asyncio.run(main())
+        assert results[0] == "A" and results[2] == "C"
+        assert isinstance(results[1], OSError)
+        assert [name for name, _ in calls] == ["a", "bad", "c"]
+        # 三个写入在同一个文件 I/O 线程中执行
+        assert len({thread for _, thread in calls}) == 1
+        assert calls[0][1].startswith("file-io")
+
+    def test_file_tool_io_runs_off_loop(self, tmp_path):
+        """测试 FileTool 的读写在文件 I/O 线程中执行，结果与改动前一致。"""
+        import threading
+
+        from tools.local.file_tool import FileTool
+
+        tool = FileTool(sandbox_root=str(tmp_path))
+        threads = []
+        original = tool._execute_one
+
+        def recording(*args):
+            threads.append(threading.current_thread().name)
+            return original(*args)
+
+        tool._execute_one = recording
+        large = "y" * (tool.COALESCE_MAX_BYTES + 1) + "中文"
+
+        async def main():
+            await asyncio.gather(
+                tool.execute({"operation": "write", "path": "a.txt", "content": "1"}),
+                tool.execute({"operation": "write", "path": "big.txt", "content": large}),
+            )
+            return await tool.execute({"operation": "read", "path": "big.txt"})
+
+        assert asyncio.run(main())["content"] == large
+        assert (tmp_path / "a.txt").read_text() == "1"
+        assert len(threads) == 3 and all(name.startswith("file-io") for name in threads)
+
+    def test_coalescing_limit_counts_utf8_bytes(self, tmp_path):
+        """测试合并上限按 UTF-8 字节计：字符数未超限但字节数超限的写入不参与合并。"""
+        from tools.local.file_tool import FileTool
+
+        tool = FileTool(sandbox_root=str(tmp_path))
+        coalesced = []
+        original = tool.write_coalescer.write
+
+        def recording(operation, params, durability):
+            coalesced.append(params["path"])
+            return original(operation, params, durability)
+
+        tool.write_coalescer.write = recording
+        wide = "中" * (tool.COALESCE_MAX_BYTES // 3 + 1)
+        narrow = "中" * (tool.COALESCE_MAX_BYTES // 3)
+
+        async def main():
+            await tool.execute({"operation": "write", "path": "wide.txt", "content": wide})
+            await tool.execute({"operation": "write", "path": "narrow.txt", "content": narrow})
+
+        asyncio.run(main())
+        assert coalesced == ["narrow.txt"]
+        assert (tmp_path / "wide.txt").read_text(encoding="utf-8") == wide
+
+    def test_write_durability_modes(self, tmp_path, monkeypatch):
+        """测试 fsync 逐个落盘，group 一起 fsync 后替换且每个目录只 fsync 一次。"""
+        from tools.local.file_tool import FileTool
+
+        synced = []
+        real_fsync = os.fsync
+
+        def fsync(fd):
+            synced.append(fd)
+            real_fsync(fd)
+
+        monkeypatch.setattr(os, "fsync", fsync)
+        tool = FileTool(sandbox_root=str(tmp_path))
+        writes = [{"operation": "write", "path": f"out/{name}.txt", "content": name} for name in "abc"]
+
+        asyncio.run(tool.execute({"operation": "batch", "operations": writes, "durability": "fsync"}))
+        # 3 个文件 + 每次写入 fsync 所在目录及新建目录的上级
+        assert len(synced) == 3 + 3 + 1
+
+        synced.clear()
+        result = asyncio.run(tool.execute({
+            "operation": "batch", "durability": "group",
+            "operations": [{**write, "content": write["content"] * 2} for write in writes]
+            + [{"operation": "read", "path": "out/a.txt"}],
+        }))
+        assert result["results"][3]["result"]["content"] == "aa"
+        assert (tmp_path / "out" / "c.txt").read_text() == "cc"
+        # 3 个文件 + 目录一次；读取 a.txt 前先提交了它所在执行线，目录多 fsync 一次
+        assert len(synced) == 3 + 1 + 1
+        assert sorted(p.name for p in (tmp_path / "out").iterdir()) == ["a.txt", "b.txt", "c.txt"]
+
+        # 合并的小文件写入同样一起提交
+        synced.clear()
+
+        async def concurrent():
+            await asyncio.gather(*(
+                tool.execute({**write, "content": "z", "durability": "group"}) for write in writes
+            ))
+
+        asyncio.run(concurrent())
+        assert len(synced) == 3 + 1 and (tmp_path / "out" / "b.txt").read_text() == "z"
+
+        with pytest.raises(ValueError):
+            asyncio.run(tool.execute({**writes[0], "durability": "sometimes"}))
+
+    def test_write_keeps_mode_links_and_store_objects(self, tmp_path):
+        """测试覆盖写保留权限位、写穿符号链接、保持硬链接，但不就地改写存储对象。"""
+        from core.platform.artifact_store import ArtifactStore
+        from tools.local.file_tool import FileTool
+
+        sandbox = tmp_path / "sandbox"
+        store = ArtifactStore(root=str(tmp_path / "store"), dedupe="link")
+        tool = FileTool(sandbox_root=str(sandbox), artifact_store=store)
+        script = sandbox / "run.sh"
+        script.write_text("old")
+        script.chmod(0o750)
+        (sandbox / "link.sh").symlink_to("run.sh")
+        os.link(sandbox / "run.sh", sandbox / "alias.sh")
+
+        for durability in ("none", "fsync", "group"):
+            asyncio.run(tool.execute({
+                "operation": "batch", "durability": durability,
+                "operations": [{"operation": "write", "path": "link.sh", "content": durability}],
+            }))
+            assert (sandbox / "link.sh").is_symlink()
+            assert (sandbox / "alias.sh").read_text() == durability
+            assert script.stat().st_mode & 0o777 == 0o750
+            assert script.stat().st_nlink == 2
+
+        # 指向沙箱外的符号链接仍被拒绝
+        (tmp_path / "outside.txt").write_text("keep")
+        (sandbox / "escape.txt").symlink_to(tmp_path / "outside.txt")
+        with pytest.raises(ValueError):
+            asyncio.run(tool.execute({"operation": "write", "path": "escape.txt", "content": "x"}))
+        assert (tmp_path / "outside.txt").read_text() == "keep"
+
+        # 与存储对象共享 inode 的产物：替换文件，对象内容不变
+        artifact = sandbox / "report.txt"
+        artifact.write_text("v1")
+        artifact.chmod(0o640)
+        digest = store.ingest([str(artifact)])[str(artifact)]["digest"]
+        assert artifact.stat().st_nlink == 2
+        asyncio.run(tool.execute({"operation": "write", "path": "report.txt", "content": "v2"}))
+        assert artifact.read_text() == "v2" and artifact.stat().st_mode & 0o777 == 0o640
+        assert store.verify(digest)
@@ -0,0 +1,211 @@
+"""Fork server for warm python_run script execution.
+
+由 tools/warm_pool.py 以独立进程启动：预先导入常用模块，然后在 Unix socket 上
+等待执行请求，每个请求 fork 一个全新的子进程执行脚本。
+
+只依赖标准库、不导入项目代码，避免项目模块出现在脚本的 sys.modules 中。
+
+协议（每个连接一次执行）：
+    客户端 -> 服务端：一行 JSON {"script", "pyc", "args", "cwd", "env", "bootstrap"}，
+                     附带 stdout/stderr 管道写端（SCM_RIGHTS）
+    服务端 -> 客户端：{"pid": N}\\n，子进程退出后 {"exit_code": N, "rusage": {...}}\\n
+                     （被信号终止时退出码为负数；rusage 为 os.wait4 的资源用量）
+
+用法：
+    python tools/forkserver.py <socket_path> <module,module,...>
+"""
+import gc
+import json
+import os
+import selectors
+import signal
+import socket
+import sys
+
+
+def _preload(modules):
+    """导入预加载模块（导入失败的跳过）。"""
+    for name in modules:
+        try:
+            __import__(name)
+        except Exception:
+            continue
+
+
+def _reap(children):
+    """回收已退出的子进程，并把退出码与资源用量发给对应的客户端。"""
+    while children:
+        try:
+            pid, status, rusage = os.wait4(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+        conn = children.pop(pid, None)
+        if conn is None:
+            continue
+        message = {
+            "exit_code": os.waitstatus_to_exitcode(status),
+            "rusage": {
+                "utime": rusage.ru_utime,
+                "stime": rusage.ru_stime,
+                "maxrss": rusage.ru_maxrss,
+                "inblock": rusage.ru_inblock,
+                "oublock": rusage.ru_oublock,
+            },
+        }
+        try:
+            conn.sendall(json.dumps(message).encode() + b"\n")
+        except OSError:
+            pass
+        conn.close()
+
+
+def _receive(conn):
+    """读取一个请求（JSON 行 + 两个管道 fd）。"""
+    data, fds, _flags, _addr = socket.recv_fds(conn, 1 << 20, 2)
+    while not data.endswith(b"\n"):
+        chunk = conn.recv(1 << 20)
+        if not chunk:
+            break
+        data += chunk
+    if len(fds) != 2:
+        for fd in fds:
+            os.close(fd)
+        raise ValueError("expected stdout/stderr pipe fds")
+    return json.loads(data), fds
+
+
+def serve(socket_path, modules):
+    """运行服务端主循环。
+
+    只在 fork 出的子进程中返回（返回待执行的请求），服务端本身直到
+    stdin 关闭（父进程退出或关闭进程池）才结束。
+    """
+    _preload(modules)
+    # 预导入的对象移出 GC 跟踪，子进程的垃圾回收不会触碰（复制）这些内存页
+    gc.freeze()
+
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(socket_path)
+    listener.listen(64)
+
+    wakeup_r, wakeup_w = os.pipe()
+    os.set_blocking(wakeup_r, False)
+    os.set_blocking(wakeup_w, False)
+    signal.set_wakeup_fd(wakeup_w)
+    signal.signal(signal.SIGCHLD, lambda *_: None)
+
+    selector = selectors.DefaultSelector()
+    selector.register(listener, selectors.EVENT_READ, "accept")
+    selector.register(wakeup_r, selectors.EVENT_READ, "reap")
+    selector.register(sys.stdin.fileno(), selectors.EVENT_READ, "stdin")
+    children = {}
+
+    sys.stdout.write("ready\n")
+    sys.stdout.flush()
+
+    while True:
+        for key, _events in selector.select():
+            if key.data == "stdin":
+                if not os.read(sys.stdin.fileno(), 4096):
+                    os.unlink(socket_path)
+                    sys.exit(0)
+            elif key.data == "reap":
+                try:
+                    while os.read(wakeup_r, 4096):
+                        pass
+                except BlockingIOError:
+                    pass
+                _reap(children)
+            else:
+                conn, _ = listener.accept()
+                try:
+                    request, (out_fd, err_fd) = _receive(conn)
+                except (OSError, ValueError):
+                    conn.close()
+                    continue
+                pid = os.fork()
+                if pid == 0:
+                    # 子进程：丢弃服务端状态，接上客户端的管道
+                    signal.set_wakeup_fd(-1)
+                    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                    selector.close()
+                    listener.close()
+                    os.close(wakeup_r)
+                    os.close(wakeup_w)
+                    for other in children.values():
+                        other.close()
+                    conn.close()
+                    os.setsid()
+                    null_fd = os.open(os.devnull, os.O_RDONLY)
+                    os.dup2(null_fd, 0)
+                    os.dup2(out_fd, 1)
+                    os.dup2(err_fd, 2)
+                    for fd in (null_fd, out_fd, err_fd):
+                        os.close(fd)
+                    return request
+                os.close(out_fd)
+                os.close(err_fd)
+                try:
+                    conn.sendall(json.dumps({"pid": pid}).encode() + b"\n")
+                except OSError:
+                    pass
+                children[pid] = conn
+                # 子进程可能在登记前就已退出
+                _reap(children)
+
+
+def _exit_code(exc):
+    """SystemExit 的退出码（与解释器的处理一致）。"""
+    code = exc.code
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+def run_request(request):
+    """在 fork 出的子进程中执行脚本（语义同 `python script.py`），返回退出码。
+
+    结束时只做脚本可见的收尾（等待非守护线程、atexit、刷新输出），
+    不做完整的解释器析构：析构会遍历所有预导入模块，触发大量写时复制，
+    耗时远超脚本本身。
+    """
+    import atexit
+    import threading
+
+    code = 0
+    try:
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["env"])
+        sys.argv = ["-c", request.get("pyc") or "", request["script"]] + list(request.get("args", []))
+        exec(request["bootstrap"], {"__name__": "__bootstrap__", "__builtins__": __builtins__})
+    except SystemExit as exc:
+        code = _exit_code(exc)
+    except BaseException:
+        sys.excepthook(*sys.exc_info())
+        code = 1
+    try:
+        for thread in threading.enumerate():
+            if thread is not threading.main_thread() and not thread.daemon:
+                thread.join()
+        atexit._run_exitfuncs()
+    except SystemExit as exc:
+        code = _exit_code(exc)
+    except BaseException:
+        sys.excepthook(*sys.exc_info())
+    for stream in (sys.stdout, sys.stderr):
+        try:
+            stream.flush()
+        except Exception:
+            code = code or 120
+    return code
+
+
+if __name__ == "__main__":
+    _request = serve(sys.argv[1], sys.argv[2].split(",") if len(sys.argv) > 2 else [])
+    os._exit(run_request(_request))
@@ -1,21 +1,93 @@
 """File tool implementation."""
+import asyncio
+import codecs
+import mmap
 import os
+import shutil
+import stat
+import uuid
 from pathlib import Path
-from typing import Dict, Any
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 from core.contracts.tool import Tool
 from core.contracts.risk import RISK_LEVEL_R1
+from core.platform.artifact_store import ArtifactStore
 from core.platform.config import Config
+from core.utils.file_io import (
+    DURABILITY_FSYNC,
+    DURABILITY_GROUP,
+    DURABILITY_MODES,
+    WriteCoalescer,
+    file_durability,
+    fsync_directories,
+    fsync_file,
+    run_file_io,
+)
 
 
 class FileTool(Tool):
-    """文件操作工具。"""
+    """文件操作工具。
     
-    def __init__(self, sandbox_root: str = None):
+    read 支持按字节（offset/length）或按行（start_line/end_line）分段读取，
+    max_bytes 限制单次返回的字节数；大文件经 mmap 读取，只触及请求的页。
+    不带范围参数读取超过阈值的文件时只返回元数据与开头预览（full=true 时仍读取全文）。
+    流式消费者可使用 iter_chunks() 分块读取。
+    
+    batch 在一次调用中执行多个 read/write/list/mkdir 子操作：先校验全部路径，
+    再在线程池中执行；同一路径或存在父子关系的路径按给定顺序执行，其余并行。
+    
+    所有阻塞的文件系统调用（包括路径解析）都在专用的文件 I/O 线程池中执行，
+    不阻塞事件循环；同一轮事件循环中的多个小文件写入合并为一次线程池任务。
+    
+    write 先写临时文件再原子替换，崩溃不会留下写了一半的文件；目标已存在时沿用其权限位，
+    符号链接写入其指向的文件（须在沙箱内）。配置了产物存储时，有其他硬链接的文件就地写入以保持
+    链接（与存储对象共享 inode 的文件除外，仍替换以免改动对象）；未配置时无法区分两者，一律替换。
+    
+    durability 控制持久化：none（默认，JARVIS_FILE_DURABILITY 可修改）不 fsync；
+    fsync 每个文件写完即 fsync 文件与所在目录；group 把同一次调用（batch 或合并的小文件写入）
+    中的写入暂存为临时文件，结束时一起 fsync、替换，再每个目录 fsync 一次。
+    """
+    
+    # 超过该大小的文件默认只返回元数据与预览（字节）
+    LARGE_FILE_THRESHOLD = 1024 * 1024
+    
+    # 预览长度（字节）
+    PREVIEW_BYTES = 4096
+    
+    # 分段读取时单次返回的默认上限（字节）
+    DEFAULT_MAX_BYTES = 1024 * 1024
+    
+    # 不小于该大小的文件分段读取时使用 mmap（字节）
+    MMAP_THRESHOLD = 64 * 1024
+    
+    # read 范围参数的最小值（offset/length 可为 0，行号从 1 开始，max_bytes 至少 1）
+    READ_PARAM_MINIMUMS = {"offset": 0, "length": 0, "start_line": 1, "end_line": 1, "max_bytes": 1}
+    
+    # iter_chunks 的默认块大小（字节）
+    STREAM_CHUNK_SIZE = 64 * 1024
+    
+    # batch 支持的子操作
+    BATCH_OPERATIONS = ("read", "write", "list", "mkdir")
+    
+    # batch 单次最多的子操作数
+    BATCH_MAX_ITEMS = 256
+    
+    # batch 最多同时占用的文件 I/O 线程数（其余子操作排在这些线程中依次执行）
+    BATCH_MAX_WORKERS = 8
+    
+    # 不超过该大小的写入参与合并（字节）
+    COALESCE_MAX_BYTES = 64 * 1024
+    
+    # 写入时每次编码的字符数
+    WRITE_CHUNK_CHARS = 1024 * 1024
+    
+    def __init__(self, sandbox_root: str = None, artifact_store: Optional[ArtifactStore] = None):
         """初始化文件工具。
         
         Args:
             sandbox_root: 沙箱根目录（如果为None则从配置读取）
+            artifact_store: 产物存储（用于识别与存储对象共享 inode 的文件；None 时覆盖写一律替换，
+                不保持硬链接）
         """
         if sandbox_root is None:
             config = Config()
@@ -28,6 +100,14 @@ class FileTool(Tool):
         # 确保沙箱目录存在
         self.sandbox_root.mkdir(parents=True, exist_ok=True)
         
+        self.artifact_store = artifact_store
+        
+        # 默认写入持久化模式
+        self.durability = file_durability()
+        
+        # 小文件写入合并器（group 模式的写入在合并任务结束时一起提交）
+        self.write_coalescer = WriteCoalescer(self._stage_single, commit=self._commit_coalesced)
+        
         super().__init__(
             tool_id="file",
             name="File Operations",
@@ -35,11 +115,31 @@ class FileTool(Tool):
             parameters={
                 "type": "object",
                 "properties": {
-                    "operation": {"type": "string", "enum": ["read", "write", "list"]},
+                    "operation": {"type": "string", "enum": ["read", "write", "list", "mkdir", "batch"]},
                     "path": {"type": "string", "description": "文件路径（相对于sandbox_root）"},
                     "content": {"type": "string", "description": "写入内容（write操作需要）"},
+                    "offset": {"type": "integer", "minimum": 0, "description": "read：起始字节偏移"},
+                    "length": {"type": "integer", "minimum": 0, "description": "read：读取的字节数"},
+                    "start_line": {"type": "integer", "minimum": 1, "description": "read：起始行（从 1 开始）"},
+                    "end_line": {"type": "integer", "minimum": 1, "description": "read：结束行（包含）"},
+                    "max_bytes": {"type": "integer", "minimum": 1, "description": "read：单次返回的字节上限"},
+                    "full": {"type": "boolean", "description": "read：大文件也读取全文（默认只返回预览）"},
+                    "durability": {
+                        "type": "string",
+                        "enum": list(DURABILITY_MODES),
+                        "description": "write/batch：none 不 fsync，fsync 逐个 fsync，group 结束时一起 fsync",
+                    },
+                    "operations": {
+                        "type": "array",
+                        "description": "batch：子操作列表，每项含 operation（read/write/list/mkdir）、path 及对应参数",
+                        "items": {"type": "object"},
+                    },
+                    "strict": {
+                        "type": "boolean",
+                        "description": "batch：有子操作失败时整体报错（默认 true；false 时返回部分结果）",
+                    },
                 },
-                "required": ["operation", "path"],
+                "required": ["operation"],
             },
             risk_level=RISK_LEVEL_R1,
             requires_approval=False,
@@ -70,23 +170,98 @@ class FileTool(Tool):
     async def execute(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """执行文件操作（强制在 sandbox_root 内）。"""
         operation = params.get("operation")
-        path_str = params.get("path")
+        if operation == "batch":
+            return await self._batch(params)
         
+        path_str = params.get("path")
         if not operation or not path_str:
             raise ValueError("operation and path are required")
         
-        path = self._resolve_path(path_str)
+        durability = self._durability(params)
+        content = params.get("content") or ""
+        # 按 UTF-8 字节数判断；字符数已超限的长文本不必编码（每个字符至少 1 字节）
+        if operation == "write" and len(content) <= self.COALESCE_MAX_BYTES and (
+            len(content.encode("utf-8")) <= self.COALESCE_MAX_BYTES
+        ):
+            result, _ = await self.write_coalescer.write(operation, params, durability)
+            return result
+        return await run_file_io(self._run_single, operation, params, durability)
+    
+    def _durability(self, params: Dict[str, Any]) -> str:
+        """本次调用的写入持久化模式（未指定时使用默认值）。"""
+        durability = params.get("durability") or self.durability
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"durability 必须是 {'/'.join(DURABILITY_MODES)} 之一: {durability}")
+        return durability
+    
+    def _run_single(self, operation: str, params: Dict[str, Any], durability: str) -> Dict[str, Any]:
+        """解析路径并执行单个操作，group 模式下随即提交（在文件 I/O 线程池中调用）。"""
+        result, staged = self._stage_single(operation, params, durability)
+        self._commit_staged(staged)
+        return result
+    
+    def _stage_single(self, operation: str, params: Dict[str, Any], durability: str) -> tuple:
+        """解析路径并执行单个操作，group 模式的写入只暂存不替换。
         
+        Returns:
+            (操作结果, 暂存的写入列表)
+        """
+        staged = [] if durability == DURABILITY_GROUP else None
+        result = self._execute_one(operation, self._resolve_path(params["path"]), params, durability, staged)
+        return result, staged or []
+    
+    def _commit_coalesced(self, values: List[tuple]) -> None:
+        """提交一次合并任务中全部 group 模式的写入。"""
+        self._commit_staged([entry for _, staged in values for entry in staged])
+    
+    def _execute_one(
+        self,
+        operation: str,
+        path: Path,
+        params: Dict[str, Any],
+        durability: str = None,
+        staged: Optional[List[tuple]] = None,
+    ) -> Dict[str, Any]:
+        """执行单个文件操作（路径已解析）。
+        
+        Args:
+            operation: 操作类型
+            path: 已解析的路径
+            params: 操作参数
+            durability: 写入持久化模式（None 表示默认值）
+            staged: group 模式下收集暂存写入 (临时文件, 目标路径, 需 fsync 的目录) 的列表；
+                写入只生成已写满的临时文件，由调用方调用 _commit_staged 提交
+        """
+        path_str = params.get("path")
+        durability = durability or self.durability
         if operation == "read":
             if not path.exists():
                 raise FileNotFoundError(f"File not found: {path_str}")
-            content = path.read_text(encoding="utf-8")
-            return {"content": content, "path": str(path)}
+            return self._read(path, params)
         
         elif operation == "write":
             content = params.get("content", "")
-            path.parent.mkdir(parents=True, exist_ok=True)
-            path.write_text(content, encoding="utf-8")
+            path = self._write_target(path)
+            directories = self._make_parents(path)
+            # 先写临时文件再替换：崩溃不会留下写了一半的文件，也不会就地改写与产物存储共享 inode 的旧文件
+            tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+            try:
+                with open(tmp_path, "wb") as handle:
+                    # 分片编码写入：每次只持有 GIL 编码一小段，事件循环线程不会被长时间挡住
+                    for start in range(0, len(content), self.WRITE_CHUNK_CHARS):
+                        handle.write(content[start:start + self.WRITE_CHUNK_CHARS].encode("utf-8"))
+                    if durability == DURABILITY_FSYNC:
+                        handle.flush()
+                        os.fsync(handle.fileno())
+                if staged is not None:
+                    staged.append((tmp_path, path, directories))
+                else:
+                    self._publish(tmp_path, path, durability == DURABILITY_FSYNC)
+            except BaseException:
+                tmp_path.unlink(missing_ok=True)
+                raise
+            if durability == DURABILITY_FSYNC:
+                fsync_directories(directories)
             return {
                 "success": True,
                 "path": str(path),
@@ -101,5 +276,434 @@ class FileTool(Tool):
             files = [str(p) for p in path.iterdir()]
             return {"type": "directory", "files": files, "path": str(path)}
         
+        elif operation == "mkdir":
+            path.mkdir(parents=True, exist_ok=True)
+            return {"success": True, "path": str(path)}
+        
         else:
             raise ValueError(f"Unknown operation: {operation}")
+    
+    def _write_target(self, path: Path) -> Path:
+        """写入的实际目标：解析路径之后才出现的符号链接同样写入其指向的文件（须在沙箱内）。"""
+        target = Path(os.path.realpath(path))
+        if target != path:
+            try:
+                target.relative_to(self.sandbox_root)
+            except ValueError:
+                raise ValueError(f"路径 {path} 指向沙箱之外: {target}")
+        return target
+    
+    def _publish(self, tmp_path: Path, path: Path, durable: bool = False) -> None:
+        """把写好的临时文件发布到目标路径。
+        
+        目标已存在时临时文件先沿用目标的权限位再替换；目标有其他硬链接、且产物存储确认
+        不与其对象共享 inode 时，把内容写回原 inode 以保持链接（这种情况下不是原子的）。
+        
+        Args:
+            tmp_path: 已写满的临时文件
+            path: 目标路径
+            durable: 就地写入后是否 fsync 目标文件
+        """
+        try:
+            existing = os.stat(path)
+        except FileNotFoundError:
+            existing = None
+        if existing is not None:
+            if (
+                existing.st_nlink > 1
+                and self.artifact_store is not None
+                and not self.artifact_store.shares_inode(str(path), existing)
+            ):
+                shutil.copyfile(tmp_path, path)
+                if durable:
+                    fsync_file(path)
+                tmp_path.unlink()
+                return
+            os.chmod(tmp_path, stat.S_IMODE(existing.st_mode))
+        os.replace(tmp_path, path)
+    
+    @staticmethod
+    def _make_parents(path: Path) -> List[Path]:
+        """创建 path 的上级目录。
+        
+        Returns:
+            目录项发生变化、持久化时需要 fsync 的目录（path 所在目录与新建目录的上级）
+        """
+        directories = [path.parent]
+        parent = path.parent
+        while not parent.exists():
+            parent = parent.parent
+            directories.append(parent)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return directories
+    
+    def _commit_staged(self, staged: List[tuple]) -> None:
+        """提交暂存的写入：fsync 全部临时文件，依次替换，再每个目录 fsync 一次。"""
+        if not staged:
+            return
+        try:
+            self._fsync_staged(staged)
+        except BaseException:
+            self._discard_staged(staged)
+            raise
+        self._publish_staged(staged)
+    
+    @staticmethod
+    def _fsync_staged(staged: List[tuple]) -> None:
+        """fsync 暂存的临时文件。"""
+        for tmp_path, _, _ in staged:
+            fsync_file(tmp_path)
+    
+    def _publish_staged(self, staged: List[tuple]) -> None:
+        """把已 fsync 的临时文件替换到目标路径，再 fsync 涉及的目录。"""
+        try:
+            for tmp_path, path, _ in staged:
+                self._publish(tmp_path, path, durable=True)
+        except BaseException:
+            self._discard_staged(staged)
+            raise
+        fsync_directories(directory for _, _, directories in staged for directory in directories)
+    
+    @staticmethod
+    def _discard_staged(staged: List[tuple]) -> None:
+        """删除未替换的临时文件。"""
+        for tmp_path, _, _ in staged:
+            tmp_path.unlink(missing_ok=True)
+    
+    async def _batch(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """执行批量子操作。
+        
+        Args:
+            params: {'operations': [{'operation', 'path', ...}], 'strict': bool, 'durability': str}
+            
+        Returns:
+            {'results': [{'index', 'operation', 'path', 'ok', 'result' | 'error'}],
+             'count', 'succeeded', 'failed', 'evidence_refs'}
+            
+        Raises:
+            ValueError: 子操作或路径不合法（此时不执行任何子操作）
+            RuntimeError: strict 模式下有子操作失败
+        """
+        items = params.get("operations")
+        if not isinstance(items, list) or not items:
+            raise ValueError("batch 需要非空的 operations 列表")
+        if len(items) > self.BATCH_MAX_ITEMS:
+            raise ValueError(f"batch 最多 {self.BATCH_MAX_ITEMS} 个子操作，实际 {len(items)} 个")
+        
+        # 先校验全部子操作与路径，任何一项不合法都不执行
+        resolved = await run_file_io(self._validate_batch, items)
+        
+        durability = self._durability(params)
+        group_commit = durability == DURABILITY_GROUP
+        results: List[Optional[Dict[str, Any]]] = [None] * len(resolved)
+        
+        def fail(owners: List[int], error: BaseException) -> None:
+            for index in owners:
+                results[index].pop("result", None)
+                results[index].update(ok=False, error=f"提交失败: {error}")
+        
+        def run_group(indices: List[int]) -> tuple:
+            # group 模式：本执行线暂存的写入与对应的子操作序号
+            staged: List[tuple] = []
+            owners: List[int] = []
+            for index in indices:
+                operation, path, item = resolved[index]
+                if staged and operation in ("read", "list") and any(
+                    target == path or path in target.parents for _, target, _ in staged
+                ):
+                    # 读取本执行线刚暂存的写入之前先提交，读到的是新内容
+                    try:
+                        self._commit_staged(staged)
+                    except Exception as e:
+                        fail(owners, e)
+                    staged, owners = [], []
+                entry = {"index": index, "operation": operation, "path": str(path)}
+                count = len(staged)
+                try:
+                    entry.update(ok=True, result=self._execute_one(
+                        operation, path, item, durability, staged if group_commit else None,
+                    ))
+                except Exception as e:
+                    entry.update(ok=False, error=str(e))
+                if len(staged) > count:
+                    owners.append(index)
+                results[index] = entry
+            return staged, owners
+        
+        # 各组轮流分配到至多 BATCH_MAX_WORKERS 条执行线，避免一个大 batch 占满共享线程池
+        groups = self._batch_groups([path for _, path, _ in resolved])
+        lanes = [[] for _ in range(min(self.BATCH_MAX_WORKERS, len(groups)))]
+        for number, group in enumerate(groups):
+            lanes[number % len(lanes)].extend(group)
+        pending = [
+            lane for lane in await asyncio.gather(*(run_file_io(run_group, lane) for lane in lanes)) if lane[0]
+        ]
+        
+        if pending:
+            # 组提交：各执行线并行 fsync 临时文件（文件系统可把并发的 fsync 合并到同一次日志提交），
+            # 全部落盘后统一替换，再每个目录 fsync 一次
+            staged = [entry for lane_staged, _ in pending for entry in lane_staged]
+            try:
+                errors = await asyncio.gather(
+                    *(run_file_io(self._fsync_staged, lane_staged) for lane_staged, _ in pending),
+                    return_exceptions=True,
+                )
+                for error in errors:
+                    if isinstance(error, BaseException):
+                        raise error
+                await run_file_io(self._publish_staged, staged)
+            except Exception as e:
+                await run_file_io(self._discard_staged, staged)
+                fail([index for _, owners in pending for index in owners], e)
+        
+        failed = [entry for entry in results if not entry["ok"]]
+        if failed and params.get("strict", True):
+            details = "; ".join(
+                f"[{entry['index']}] {entry['operation']} {items[entry['index']]['path']}: {entry['error']}"
+                for entry in failed
+            )
+            raise RuntimeError(f"批量操作 {len(failed)}/{len(results)} 项失败: {details}")
+        return {
+            "results": results,
+            "count": len(results),
+            "succeeded": len(results) - len(failed),
+            "failed": len(failed),
+            "evidence_refs": [
+                entry["path"] for entry in results if entry["ok"] and entry["operation"] == "write"
+            ],
+        }
+    
+    def _validate_batch(self, items: List[Any]) -> List[tuple]:
+        """校验 batch 子操作并解析路径。
+        
+        Returns:
+            [(operation, 解析后的路径, 子操作参数)]
+        """
+        resolved = []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                raise ValueError(f"operations[{index}] 必须是对象")
+            operation = item.get("operation")
+            if operation not in self.BATCH_OPERATIONS:
+                raise ValueError(f"operations[{index}]: 不支持的操作 {operation}")
+            if not item.get("path"):
+                raise ValueError(f"operations[{index}]: 缺少 path")
+            resolved.append((operation, self._resolve_path(item["path"]), item))
+        return resolved
+    
+    @staticmethod
+    def _batch_groups(paths: List[Path]) -> List[List[int]]:
+        """把子操作按路径分组：同一路径或父子路径的子操作归入同一组（组内保持原顺序）。"""
+        # 并查集：每个路径只与自身及各级上级目录比对，避免逐组两两比较
+        roots = list(range(len(paths)))
+        
+        def find(index: int) -> int:
+            while roots[index] != index:
+                roots[index] = roots[roots[index]]
+                index = roots[index]
+            return index
+        
+        def union(first: int, second: int) -> None:
+            roots[find(first)] = find(second)
+        
+        # 路径 -> 以该路径为目标的子操作；目录 -> 目标位于其下的子操作
+        exact: Dict[Path, int] = {}
+        below: Dict[Path, List[int]] = {}
+        for index, path in enumerate(paths):
+            if path in exact:
+                union(index, exact[path])
+            exact.setdefault(path, index)
+            for other in below.pop(path, []):
+                union(index, other)
+            for ancestor in path.parents:
+                if ancestor in exact:
+                    union(index, exact[ancestor])
+                below.setdefault(ancestor, []).append(index)
+        
+        groups: Dict[int, List[int]] = {}
+        for index in range(len(paths)):
+            groups.setdefault(find(index), []).append(index)
+        return list(groups.values())
+    
+    def _read(self, path: Path, params: Dict[str, Any]) -> Dict[str, Any]:
+        """读取文件（全文、预览或指定范围）。
+        
+        Args:
+            path: 已解析的文件路径
+            params: read 参数（offset/length/start_line/end_line/max_bytes/full）
+            
+        Returns:
+            {'content' 或 'preview', 'path', 'size', ...范围信息}
+            
+        Raises:
+            ValueError: 范围参数不是整数或小于最小值
+        """
+        for name, minimum in self.READ_PARAM_MINIMUMS.items():
+            self._check_int(name, params.get(name), minimum)
+        size = path.stat().st_size
+        max_bytes = int(params.get("max_bytes") or self.DEFAULT_MAX_BYTES)
+        ranged = any(params.get(key) is not None for key in ("offset", "length", "start_line", "end_line"))
+        
+        if not ranged:
+            if size <= self.LARGE_FILE_THRESHOLD or params.get("full"):
+                return {"content": path.read_text(encoding="utf-8"), "path": str(path), "size": size}
+            with open(path, "rb") as handle:
+                head = handle.read(self.PREVIEW_BYTES)
+            preview, _ = self._decode(head, complete=False)
+            return {
+                "preview": preview,
+                "path": str(path),
+                "size": size,
+                "truncated": True,
+                "hint": "文件较大，只返回开头预览；使用 offset/length 或 start_line/end_line 分段读取",
+            }
+        
+        with open(path, "rb") as handle:
+            if size == 0:
+                data = b""
+                view = None
+            elif size >= self.MMAP_THRESHOLD:
+                view = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+                data = view
+            else:
+                view = None
+                data = handle.read()
+            try:
+                if params.get("start_line") is not None or params.get("end_line") is not None:
+                    return self._read_lines(path, data, size, params, max_bytes)
+                return self._read_bytes(path, data, size, params, max_bytes)
+            finally:
+                if view is not None:
+                    view.close()
+    
+    def _read_bytes(self, path: Path, data, size: int, params: Dict[str, Any], max_bytes: int) -> Dict[str, Any]:
+        """按字节范围读取。
+        
+        起止处被切开的 UTF-8 字符不计入，next_offset 指向下一个未返回的完整字符。
+        """
+        offset = min(int(params.get("offset") or 0), size)
+        length = params.get("length")
+        limit = size if length is None else min(size, offset + int(length))
+        end = min(limit, offset + max_bytes)
+        # 跳过起点处残缺字符的后续字节（0b10xxxxxx）
+        skipped = 0
+        while offset < end and skipped < 3 and data[offset] & 0xC0 == 0x80:
+            offset += 1
+            skipped += 1
+        content, consumed = self._decode(data[offset:end], complete=end >= size)
+        next_offset = offset + consumed
+        return {
+            "content": content,
+            "path": str(path),
+            "size": size,
+            "offset": offset,
+            "length": consumed,
+            "next_offset": next_offset if next_offset < size else None,
+            "truncated": next_offset < limit,
+        }
+    
+    def _read_lines(self, path: Path, data, size: int, params: Dict[str, Any], max_bytes: int) -> Dict[str, Any]:
+        """按行范围读取（行号从 1 开始，包含 end_line；超过 max_bytes 时在整行处截止）。"""
+        start_line = int(params.get("start_line") or 1)
+        end_line = params.get("end_line")
+        end_line = int(end_line) if end_line is not None else None
+        
+        # 定位起始行（在 mmap 上逐行 find，只访问经过的页）
+        start = 0
+        line = 1
+        while line < start_line and start < size:
+            newline = data.find(b"\n", start)
+            start = size if newline < 0 else newline + 1
+            line += 1
+        
+        # 读取整行，直到 end_line 或 max_bytes
+        position = start
+        last_line = start_line - 1
+        while position < size and (end_line is None or last_line < end_line):
+            newline = data.find(b"\n", position)
+            line_end = size if newline < 0 else newline + 1
+            if line_end - start > max_bytes:
+                if last_line < start_line:
+                    # 首行就超过 max_bytes：按字节截断该行
+                    position = start + max_bytes
+                break
+            position = line_end
+            last_line += 1
+        
+        content, consumed = self._decode(data[start:position], complete=position >= size)
+        position = start + consumed
+        partial_line = position < size and position > start and data[position - 1] != 0x0A
+        return {
+            "content": content,
+            "path": str(path),
+            "size": size,
+            "start_line": start_line,
+            "end_line": last_line if last_line >= start_line else None,
+            "next_line": last_line + 1 if position < size and not partial_line else None,
+            "next_offset": position if partial_line else None,
+            "truncated": position < size and (partial_line or end_line is None or last_line < end_line),
+        }
+    
+    @staticmethod
+    def _check_int(name: str, value: Any, minimum: int) -> None:
+        """校验可选的整数参数（None 表示未指定）。"""
+        if value is None:
+            return
+        try:
+            number = int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{name} 必须是整数: {value!r}")
+        if number < minimum:
+            raise ValueError(f"{name} 不能小于 {minimum}: {value}")
+    
+    @staticmethod
+    def _decode(data: bytes, complete: bool):
+        """解码 UTF-8 字节；complete=False 时末尾残缺的字符不计入。
+        
+        Returns:
+            (文本, 实际解码的字节数)
+        """
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        text = decoder.decode(data, final=complete)
+        return text, len(data) - len(decoder.getstate()[0])
+    
+    async def iter_chunks(
+        self,
+        path_str: str,
+        chunk_size: Optional[int] = None,
+        offset: int = 0,
+        length: Optional[int] = None,
+    ) -> AsyncIterator[bytes]:
+        """分块异步读取文件（每块在文件 I/O 线程池中读取，不阻塞事件循环）。
+        
+        Args:
+            path_str: 文件路径（相对于 sandbox_root）
+            chunk_size: 块大小（默认 STREAM_CHUNK_SIZE）
+            offset: 起始字节偏移
+            length: 最多读取的字节数（None 表示读到末尾）
+            
+        Yields:
+            文件内容块（bytes）
+            
+        Raises:
+            ValueError: offset/length 为负数
+        """
+        self._check_int("offset", offset, 0)
+        self._check_int("length", length, 0)
+        path = await run_file_io(self._resolve_path, path_str)
+        chunk_size = chunk_size or self.STREAM_CHUNK_SIZE
+        handle = await run_file_io(open, path, "rb")
+        try:
+            if offset:
+                await run_file_io(handle.seek, offset)
+            remaining = length
+            while remaining is None or remaining > 0:
+                size = chunk_size if remaining is None else min(chunk_size, remaining)
+                chunk = await run_file_io(handle.read, size)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+        finally:
+            handle.close()
@@ -4,6 +4,8 @@ from typing import Dict, Any
 
 from core.contracts.tool import Tool
 from core.contracts.risk import RISK_LEVEL_R2
+from core.utils.output_capture import BoundedCapture, drain_stream
+from core.utils.process import kill_process_group
 
 
 class ShellTool(Tool):
@@ -12,6 +14,13 @@ class ShellTool(Tool):
     # v0.1 允许的命令白名单
     ALLOWED_COMMANDS = ["echo"]
     
+    # 默认超时（秒，由 ToolRunner 强制执行）
+    DEFAULT_TIMEOUT = 30
+    
+    # 输出捕获：各保留开头与末尾的字节数（流式读取，内存占用与输出量无关）
+    OUTPUT_HEAD_BYTES = 8 * 1024
+    OUTPUT_TAIL_BYTES = 8 * 1024
+    
     def __init__(self):
         """初始化 Shell 工具。"""
         super().__init__(
@@ -27,6 +36,7 @@ class ShellTool(Tool):
             },
             risk_level=RISK_LEVEL_R2,  # R2 风险等级，需要审批
             requires_approval=True,
+            default_timeout=self.DEFAULT_TIMEOUT,
         )
     
     def _is_allowed(self, command: str) -> bool:
@@ -58,17 +68,31 @@ class ShellTool(Tool):
                 f"仅允许的命令: {', '.join(self.ALLOWED_COMMANDS)}"
             )
         
-        # 执行命令
+        # 执行命令（独立进程组：超时或取消时整组终止）
         process = await asyncio.create_subprocess_shell(
             command,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE,
+            start_new_session=True,
         )
-        stdout, stderr = await process.communicate()
+        stdout = BoundedCapture(self.OUTPUT_HEAD_BYTES, self.OUTPUT_TAIL_BYTES)
+        stderr = BoundedCapture(self.OUTPUT_HEAD_BYTES, self.OUTPUT_TAIL_BYTES)
+        try:
+            await asyncio.gather(
+                drain_stream(process.stdout, stdout),
+                drain_stream(process.stderr, stderr),
+                process.wait(),
+            )
+        except asyncio.CancelledError:
+            kill_process_group(process.pid)
+            await process.wait()
+            raise
         
         return {
             "exit_code": process.returncode,
-            "stdout": stdout.decode("utf-8"),
-            "stderr": stderr.decode("utf-8"),
+            "stdout": stdout.text(),
+            "stderr": stderr.text(),
+            "stdout_bytes": stdout.total_bytes,
+            "stderr_bytes": stderr.total_bytes,
             "command": command,
         }
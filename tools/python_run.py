@@ -1,14 +1,25 @@
 """Python script execution tool (sandboxed, allowlisted, audited)."""
+import asyncio
+import contextlib
 import os
-import sys
-import subprocess
 import time
+import uuid
 from pathlib import Path
 from typing import Dict, Any, Optional
 
 from core.contracts.tool import Tool
 from core.contracts.risk import RISK_LEVEL_R2
+from core.platform.artifact_store import hash_file
 from core.platform.config import Config
+from core.utils.output_capture import BoundedCapture, drain_stream
+from core.utils.process import kill_process_group, spawn_reaped
+from skills.archive import extract_scripts, split_archive_path
+from skills.bytecode import default_cache_root, launch_command, precompile_script
+from tools.resource_governor import ResourceGovernor
+from tools.run_cache import RunCache
+from tools.runner import step_deadline_paused
+from tools.sandbox_tracker import SandboxTracker
+from tools.warm_pool import WarmWorkerPool, warm_pool_available
 
 
 class PythonRunTool(Tool):
@@ -17,19 +28,32 @@ class PythonRunTool(Tool):
     只允许执行以下路径的脚本：
     1. skills_workspace/**/scripts/*.py
     2. sandbox/scripts/*.py
+    3. skills_workspace/*.skill/scripts/*.py（技能包内脚本，执行前提取到内容寻址缓存）
     
     安全措施：
     - realpath 校验，防止路径逃逸
     - 禁止 symlink 逃逸
-    - 不经 shell，直接使用 subprocess.run
+    - 不经 shell，使用 asyncio 子进程（不阻塞事件循环，可并发执行多个脚本）
+    - 子进程在独立进程组中运行，超时或任务取消时终止整个进程组
+    - 脚本预编译到私有字节码缓存，经引导代码执行缓存的 code object（省去每次重新编译）
+    - 可选预热进程池：从预先导入常用模块的 fork 服务端派生子进程（语义同上）
     - cwd 强制为 sandbox 根目录
+    - 产物差分基于常驻沙箱索引（inotify 增量更新），耗时与变化量成正比
     - 超时控制（默认 60 秒，上限 120 秒）
-    - stdout/stderr 截断（各最多 2048 字符）
+    - 资源治理：全局与同一技能的并发上限、子进程内的 CPU/内存/文件数 rlimit、
+      可选 cgroup v2；每次执行记录 CPU 时间、峰值 RSS 与读写字节
+    - stdout/stderr 流式捕获，各保留开头与末尾共 2048 字节（可选把完整输出写入沙箱日志）
     - env 白名单（允许 JARVIS_ 开头）
+    - 可选结果缓存（cache=true）：脚本、参数、环境变量与声明的输入文件都未变时，
+      直接恢复上次的输出摘录与产物，不启动子进程
     """
     
-    # 输出截断长度
-    MAX_OUTPUT_LENGTH = 2048
+    # 输出捕获：各保留开头与末尾的字节数（流式读取，内存占用与输出量无关）
+    OUTPUT_HEAD_BYTES = 1024
+    OUTPUT_TAIL_BYTES = 1024
+    
+    # 完整输出日志目录（相对 sandbox，log_output=true 时写入）
+    OUTPUT_LOG_DIR = ".jarvis_logs/python_run"
     
     # 超时上限（秒）
     MAX_TIMEOUT = 120
@@ -73,10 +97,43 @@ class PythonRunTool(Tool):
         # 确保沙箱目录存在
         self.sandbox_root.mkdir(parents=True, exist_ok=True)
         
+        # .skill 技能包中的脚本按需提取到内容寻址缓存
+        self.script_cache_root = Path(
+            os.getenv(
+                "JARVIS_SKILL_SCRIPT_CACHE",
+                str(self.project_root / "memory" / "cache" / "skill_scripts"),
+            )
+        ).resolve()
+        
+        # 脚本字节码缓存（技能扫描时预编译，执行时按需补齐）
+        self.pycache_root = Path(default_cache_root(str(self.project_root))).resolve()
+        
+        # 沙箱文件索引：常驻 inotify 监听（不可用时全量扫描），产物差分只处理变化的路径
+        use_inotify = False if os.getenv("JARVIS_SANDBOX_INOTIFY", "1") == "0" else None
+        self.sandbox_tracker = SandboxTracker(str(self.sandbox_root), use_inotify=use_inotify)
+        
+        # 可选的预热进程池（JARVIS_PYTHON_WARM_POOL=1 开启）：从预先导入常用模块的
+        # fork 服务端派生子进程，省去解释器启动与模块导入
+        self.warm_pool = None
+        if os.getenv("JARVIS_PYTHON_WARM_POOL", "0") == "1" and warm_pool_available():
+            self.warm_pool = WarmWorkerPool()
+        
+        # 资源治理（并发槽位、rlimit、可选 cgroup 与用量统计）
+        self.governor = ResourceGovernor()
+        
+        # 结果缓存（按次开启：params.cache=true）
+        self.run_cache = RunCache(
+            os.getenv(
+                "JARVIS_PYTHON_RUN_CACHE_DIR",
+                str(self.project_root / "memory" / "cache" / "python_run"),
+            )
+        )
+        
         # 允许的脚本根目录
         self.allowed_roots = [
             self.project_root / "skills_workspace",
             self.project_root / "sandbox",
+            self.script_cache_root,
         ]
         
         super().__init__(
@@ -113,11 +170,31 @@ class PythonRunTool(Tool):
                         "description": "环境变量（仅允许 JARVIS_ 开头的 key）",
                         "default": None,
                     },
+                    "log_output": {
+                        "type": "boolean",
+                        "description": "是否把完整 stdout/stderr 写入沙箱 .jarvis_logs/ 日志",
+                        "default": False,
+                    },
+                    "cache": {
+                        "type": "boolean",
+                        "description": (
+                            "是否使用结果缓存：脚本内容、参数、环境变量与 inputs 的内容都未变时"
+                            "直接恢复上次成功执行的输出与产物"
+                        ),
+                        "default": False,
+                    },
+                    "inputs": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "脚本读取的输入文件（相对 sandbox），其内容参与计算缓存键",
+                        "default": [],
+                    },
                 },
                 "required": ["script_path"],
             },
             risk_level=RISK_LEVEL_R2,
             requires_approval=True,
+            default_timeout=self.DEFAULT_TIMEOUT,
         )
     
     def _validate_script_path(self, script_path: str) -> Path:
@@ -139,6 +216,11 @@ class PythonRunTool(Tool):
             # 相对路径，相对于项目根目录
             script_abs = (self.project_root / script_path).resolve()
         
+        # .skill 技能包内的脚本：提取到缓存后执行
+        archive_script = self._materialize_archive_script(script_abs)
+        if archive_script is not None:
+            script_abs = archive_script
+        
         # 使用 realpath 解析，防止 symlink 逃逸
         script_real = script_abs.resolve()
         
@@ -169,6 +251,11 @@ class PythonRunTool(Tool):
                     if len(parts) >= 1 and parts[0] == "scripts":
                         is_allowed = True
                         break
+                # 对于技能包脚本缓存，必须在 <digest>/scripts/ 下
+                elif allowed_root == self.script_cache_root:
+                    if len(parts) >= 2 and parts[1] == "scripts":
+                        is_allowed = True
+                        break
             except ValueError:
                 # 不在这个根目录下，继续检查下一个
                 continue
@@ -183,6 +270,32 @@ class PythonRunTool(Tool):
         
         return script_real
     
+    def _materialize_archive_script(self, script_abs: Path) -> Optional[Path]:
+        """若路径指向 skills_workspace 中 .skill 技能包内的脚本，则提取并返回缓存路径。
+        
+        只提取 scripts/ 子树；内容相同的技能包共享同一缓存目录。
+        
+        Args:
+            script_abs: 脚本绝对路径（可能是技能包内的虚拟路径）
+            
+        Returns:
+            提取后的脚本路径；不是技能包内脚本时返回 None
+        """
+        located = split_archive_path(str(script_abs))
+        if located is None:
+            return None
+        archive_path, member = located
+        try:
+            Path(archive_path).resolve().relative_to(
+                (self.project_root / "skills_workspace").resolve()
+            )
+        except ValueError:
+            return None
+        if not member.startswith("scripts/"):
+            return None
+        extracted_root = extract_scripts(archive_path, str(self.script_cache_root))
+        return Path(extracted_root, *member.split("/"))
+    
     def _validate_env(self, env: Optional[Dict[str, str]]) -> Optional[Dict[str, str]]:
         """验证环境变量白名单。
         
@@ -211,99 +324,121 @@ class PythonRunTool(Tool):
         
         return allowed_env if allowed_env else None
     
-    def _truncate_output(self, text: str, max_length: int = None) -> str:
-        """截断输出文本。
+    def _validate_inputs(self, inputs: list) -> list:
+        """验证声明的输入文件路径（必须位于 sandbox 内）。
         
         Args:
-            text: 原始文本
-            max_length: 最大长度（默认使用 MAX_OUTPUT_LENGTH）
+            inputs: 相对 sandbox 的路径列表
             
         Returns:
-            截断后的文本
+            规范化后的相对路径列表（去重、排序）
+            
+        Raises:
+            ValueError: 如果路径不在 sandbox 内
         """
-        if max_length is None:
-            max_length = self.MAX_OUTPUT_LENGTH
-        
-        if len(text) <= max_length:
-            return text
-        
-        return text[:max_length] + f"\n... (截断，原始长度: {len(text)} 字符)"
+        normalized = set()
+        for item in inputs or []:
+            resolved = (self.sandbox_root / str(item)).resolve()
+            try:
+                relative = resolved.relative_to(self.sandbox_root)
+            except ValueError:
+                raise ValueError(f"输入文件必须位于 sandbox 内: {item}")
+            normalized.add(relative.as_posix())
+        return sorted(normalized)
+    
+    def _cache_key(self, script_real: Path, args: list, allowed_env: Optional[Dict[str, str]],
+                   inputs: list) -> str:
+        """计算结果缓存键（读取脚本与输入文件内容）。"""
+        input_digests = {}
+        for relative in inputs:
+            path = self.sandbox_root / relative
+            input_digests[relative] = hash_file(str(path)) if path.is_file() else None
+        return self.run_cache.make_key(str(script_real), args, allowed_env, input_digests)
     
-    def _snapshot_sandbox(self) -> Dict[str, tuple]:
-        """扫描 sandbox 目录，生成文件快照。
+    def _restore_cached(self, cache_key: str, script_real: Path, args: list,
+                        timeout_seconds: int) -> Optional[Dict[str, Any]]:
+        """缓存命中时恢复产物并构造结果；未命中返回 None。"""
+        start_time = time.time()
+        entry = self.run_cache.lookup(cache_key)
+        if entry is None:
+            return None
+        try:
+            restored = self.run_cache.restore(entry, str(self.sandbox_root))
+        except OSError as e:
+            print(f"恢复缓存产物失败，重新执行: {e}")
+            return None
+        diff_result = self._summarize_artifacts(restored)
+        try:
+            script_relative = script_real.relative_to(self.project_root)
+        except ValueError:
+            script_relative = script_real
+        return {
+            "ok": entry["exit_code"] == 0,
+            "exit_code": entry["exit_code"],
+            "stdout_excerpt": entry["stdout_excerpt"],
+            "stderr_excerpt": entry["stderr_excerpt"],
+            "artifacts_changed": diff_result["artifacts_changed"],
+            "meta": {
+                "duration_ms": int((time.time() - start_time) * 1000),
+                "script_path": str(script_relative),
+                "args": args,
+                "cwd": str(self.sandbox_root),
+                "timeout_seconds": timeout_seconds,
+                "artifacts_count": diff_result["artifacts_count"],
+                "artifacts_truncated": diff_result["truncated"],
+                "stdout_bytes": entry["stdout_bytes"],
+                "stderr_bytes": entry["stderr_bytes"],
+                "output_truncated": entry["output_truncated"],
+                "output_logs": {},
+                "cached": True,
+                "cache_key": cache_key,
+            },
+        }
+    
+    def _output_captures(self, script_real: Path, log_output: bool):
+        """创建 stdout/stderr 的输出捕获。
         
+        Args:
+            script_real: 脚本路径（用于日志文件命名）
+            log_output: 是否把完整输出写入沙箱日志
+            
         Returns:
-            字典 {rel_path: (mtime_ns, size)}
+            (stdout_capture, stderr_capture)
         """
-        snapshot = {}
-        
-        if not self.sandbox_root.exists():
-            return snapshot
-        
-        # 排除的目录和文件
-        excluded_names = {"memory", ".gitkeep", ".git"}
-        
-        try:
-            # 递归扫描 sandbox 目录
-            for file_path in self.sandbox_root.rglob("*"):
-                # 跳过排除的目录
-                if any(excluded in file_path.parts for excluded in excluded_names):
-                    continue
-                
-                # 只处理文件，跳过目录
-                if not file_path.is_file():
-                    continue
-                
-                try:
-                    # 计算相对路径
-                    rel_path = file_path.relative_to(self.sandbox_root)
-                    rel_path_str = str(rel_path)
-                    
-                    # 获取文件统计信息
-                    stat = file_path.stat()
-                    snapshot[rel_path_str] = (stat.st_mtime_ns, stat.st_size)
-                except (OSError, ValueError):
-                    # 忽略无法访问的文件
-                    continue
-        except Exception:
-            # 扫描失败时返回空快照
-            pass
-        
-        return snapshot
+        spill_paths = [None, None]
+        if log_output:
+            log_dir = self.sandbox_root / self.OUTPUT_LOG_DIR
+            log_dir.mkdir(parents=True, exist_ok=True)
+            stem = f"{time.strftime('%Y%m%d-%H%M%S')}-{script_real.stem}-{uuid.uuid4().hex[:8]}"
+            spill_paths = [str(log_dir / f"{stem}.{name}.log") for name in ("stdout", "stderr")]
+        return tuple(
+            BoundedCapture(self.OUTPUT_HEAD_BYTES, self.OUTPUT_TAIL_BYTES, spill_path)
+            for spill_path in spill_paths
+        )
+    
+    def _skill_key(self, script_real: Path) -> str:
+        """脚本所属技能的标识（同一技能共享并发上限）。"""
+        for root in (self.project_root / "skills_workspace", self.script_cache_root):
+            try:
+                return f"{root.name}/{script_real.relative_to(root.resolve()).parts[0]}"
+            except (ValueError, IndexError):
+                continue
+        return "sandbox"
     
-    def _diff_snapshots(
-        self, before: Dict[str, tuple], after: Dict[str, tuple]
-    ) -> Dict[str, Any]:
-        """计算两个快照之间的差分。
+    def _kill(self, process) -> None:
+        """终止脚本进程组并关闭输出管道（孙进程可能仍持有管道写端）。"""
+        kill_process_group(process.pid)
+        process.close_pipes()
+    
+    def _summarize_artifacts(self, artifacts_changed: list) -> Dict[str, Any]:
+        """截断产物列表。
         
         Args:
-            before: 执行前的快照 {rel_path: (mtime_ns, size)}
-            after: 执行后的快照 {rel_path: (mtime_ns, size)}
+            artifacts_changed: 新增/变更的文件列表（已按路径排序）
             
         Returns:
             差分结果字典
         """
-        artifacts_changed = []
-        
-        # 找出新增和变更的文件
-        for rel_path, (mtime_ns, size) in after.items():
-            if rel_path not in before:
-                # 新增文件
-                artifacts_changed.append({
-                    "path": rel_path,
-                    "size": size,
-                    "kind": "added",
-                })
-            else:
-                # 检查是否变更
-                before_mtime, before_size = before[rel_path]
-                if mtime_ns != before_mtime or size != before_size:
-                    artifacts_changed.append({
-                        "path": rel_path,
-                        "size": size,
-                        "kind": "modified",
-                    })
-        
         # 截断到最大数量
         truncated = len(artifacts_changed) > self.MAX_ARTIFACTS
         if truncated:
@@ -315,6 +450,107 @@ class PythonRunTool(Tool):
             "truncated": truncated,
         }
     
+    async def _spawn_warm(self, script_real: Path, args: list, exec_env: Dict[str, str],
+                          preamble: str = ""):
+        """经预热进程池启动脚本。
+        
+        Returns:
+            WarmProcess；未开启进程池或服务端不可用时返回 None（回退为冷启动）
+        """
+        if self.warm_pool is None:
+            return None
+        pyc_path = await asyncio.to_thread(
+            precompile_script, str(script_real), str(self.pycache_root)
+        )
+        try:
+            return await self.warm_pool.spawn(
+                str(script_real), args, str(self.sandbox_root), exec_env, pyc_path, preamble
+            )
+        except OSError as e:
+            print(f"预热进程池不可用，回退为冷启动: {e}")
+            return None
+    
+    async def _run_script(self, script_path: str, script_real: Path, args: list,
+                          exec_env: Dict[str, str], timeout_seconds: int, log_output: bool):
+        """启动脚本并等待结束（调用方已占用执行槽位）。
+        
+        Returns:
+            (process, stdout_capture, stderr_capture, duration_ms, 产物变化列表, 资源用量)
+            
+        Raises:
+            RuntimeError: 无法启动脚本
+            TimeoutError: 执行超时（进程组已终止）
+        """
+        # 执行前刷新沙箱索引，记下基线（阻塞 I/O，放到线程池中，不阻塞事件循环）
+        baseline = await asyncio.to_thread(self.sandbox_tracker.begin)
+        
+        # 流式读取输出：只保留开头与末尾，超大输出也不会占满内存
+        stdout_capture, stderr_capture = await asyncio.to_thread(
+            self._output_captures, script_real, log_output
+        )
+        
+        # 资源限制与用量统计参数经环境变量交给子进程内的前导代码
+        governed = await asyncio.to_thread(self.governor.prepare)
+        exec_env = dict(exec_env, **governed.env)
+        
+        # 记录开始时间
+        start_time = time.time()
+        
+        # 执行脚本（不经 shell；有缓存字节码时经引导代码执行）。
+        # 子进程在独立进程组中运行，超时或任务取消时终止整个进程组
+        try:
+            process = await self._spawn_warm(script_real, args, exec_env, governed.preamble)
+            if process is None:
+                command = await asyncio.to_thread(
+                    launch_command, str(script_real), args, str(self.pycache_root), governed.preamble
+                )
+                # 由本进程以 wait4 回收，同时拿到内核记录的资源用量
+                process = await spawn_reaped(
+                    command, str(self.sandbox_root), exec_env  # cwd 强制为 sandbox 根目录
+                )
+        except OSError as e:
+            stdout_capture.close()
+            stderr_capture.close()
+            self.sandbox_tracker.release(baseline)
+            await asyncio.to_thread(self.governor.finish, governed)
+            raise RuntimeError(f"脚本执行失败: {str(e)}")
+        try:
+            waiting = asyncio.gather(
+                drain_stream(process.stdout, stdout_capture),
+                drain_stream(process.stderr, stderr_capture),
+                process.wait(),
+            )
+            # 超时或取消时 gather 以 CancelledError 结束，取走结果避免“未读取的异常”告警
+            waiting.add_done_callback(lambda future: future.cancelled() or future.exception())
+            await asyncio.wait_for(waiting, timeout_seconds)
+        except asyncio.TimeoutError:
+            self._kill(process)
+            await process.wait()
+            self.sandbox_tracker.release(baseline)
+            await asyncio.to_thread(self.governor.finish, governed, process.rusage)
+            raise TimeoutError(
+                f"脚本执行超时（{timeout_seconds} 秒）: {script_path}"
+            )
+        except asyncio.CancelledError:
+            self._kill(process)
+            # 回收子进程并关闭管道（取消请求已送达，这里的等待不会再被同一次取消打断）
+            await process.wait()
+            self.sandbox_tracker.release(baseline)
+            # 清理 cgroup 可能需要重试等待；交给后台线程，再次取消也不会中断清理
+            asyncio.get_running_loop().run_in_executor(None, self.governor.finish, governed)
+            raise
+        finally:
+            stdout_capture.close()
+            stderr_capture.close()
+        
+        # 计算执行时间
+        duration_ms = int((time.time() - start_time) * 1000)
+        
+        # 执行后增量刷新索引，得到基线之后新增/变更的文件
+        changed = await asyncio.to_thread(self.sandbox_tracker.changes_since, baseline)
+        usage = await asyncio.to_thread(self.governor.finish, governed, process.rusage)
+        return process, stdout_capture, stderr_capture, duration_ms, changed, usage
+    
     async def execute(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """执行 Python 脚本。
         
@@ -324,6 +560,9 @@ class PythonRunTool(Tool):
                 - args: 脚本参数列表（可选，默认 []）
                 - timeout_seconds: 超时时间（可选，默认 60，上限 120）
                 - env: 环境变量（可选，仅允许 JARVIS_ 开头）
+                - log_output: 是否把完整 stdout/stderr 写入沙箱日志（可选，默认 False）
+                - cache: 是否使用结果缓存（可选，默认 False；与 log_output 同时开启时不使用缓存）
+                - inputs: 参与计算缓存键的输入文件（可选，相对 sandbox）
                 
         Returns:
             执行结果字典
@@ -338,82 +577,96 @@ class PythonRunTool(Tool):
             self.MAX_TIMEOUT
         )
         env = params.get("env")
+        log_output = bool(params.get("log_output", False))
         
-        # 验证脚本路径
-        script_real = self._validate_script_path(script_path)
+        # 验证脚本路径（技能包内脚本可能需要提取，放到线程中执行）
+        script_real = await asyncio.to_thread(self._validate_script_path, script_path)
         
         # 验证环境变量
         allowed_env = self._validate_env(env)
         
+        # 结果缓存：只缓存成功的执行；需要完整输出日志时总是实际执行
+        cache_key = None
+        if params.get("cache") and not log_output:
+            inputs = self._validate_inputs(params.get("inputs", []))
+            cache_key = await asyncio.to_thread(
+                self._cache_key, script_real, args, allowed_env, inputs
+            )
+            cached = await asyncio.to_thread(
+                self._restore_cached, cache_key, script_real, args, timeout_seconds
+            )
+            if cached is not None:
+                return cached
+        
         # 构建执行环境
         exec_env = os.environ.copy()
         if allowed_env:
             exec_env.update(allowed_env)
         
-        # 执行前快照
-        before_snapshot = self._snapshot_sandbox()
+        # 占用执行槽位（全局与同一技能的并发上限），超出时排队；排队时间不计入步骤超时
+        async with contextlib.AsyncExitStack() as stack:
+            with step_deadline_paused():
+                queued_ms = await stack.enter_async_context(self.governor.slot(self._skill_key(script_real)))
+            process, stdout_capture, stderr_capture, duration_ms, changed, usage = await self._run_script(
+                script_path, script_real, args, exec_env, timeout_seconds, log_output
+            )
+        diff_result = self._summarize_artifacts(changed)
         
-        # 记录开始时间
-        start_time = time.time()
+        # 输出摘录（开头 + 末尾）
+        stdout_excerpt = stdout_capture.text()
+        stderr_excerpt = stderr_capture.text()
         
+        # 计算相对路径（用于返回）
         try:
-            # 执行脚本（不经 shell，直接使用 subprocess.run）
-            result = subprocess.run(
-                [sys.executable, str(script_real)] + args,
-                cwd=str(self.sandbox_root),  # cwd 强制为 sandbox 根目录
-                env=exec_env,
-                timeout=timeout_seconds,
-                capture_output=True,
-                text=True,
-            )
-            
-            # 计算执行时间
-            duration_ms = int((time.time() - start_time) * 1000)
-            
-            # 执行后快照
-            after_snapshot = self._snapshot_sandbox()
-            
-            # 计算差分
-            diff_result = self._diff_snapshots(before_snapshot, after_snapshot)
-            
-            # 截断输出
-            stdout_excerpt = self._truncate_output(result.stdout)
-            stderr_excerpt = self._truncate_output(result.stderr)
-            
-            # 计算相对路径（用于返回）
-            try:
-                script_relative = script_real.relative_to(self.project_root)
-            except ValueError:
-                script_relative = script_real
-            
-            return {
-                "ok": result.returncode == 0,
-                "exit_code": result.returncode,
-                "stdout_excerpt": stdout_excerpt,
-                "stderr_excerpt": stderr_excerpt,
-                "artifacts_changed": diff_result["artifacts_changed"],
-                "meta": {
-                    "duration_ms": duration_ms,
-                    "script_path": str(script_relative),
-                    "args": args,
-                    "cwd": str(self.sandbox_root),
-                    "timeout_seconds": timeout_seconds,
-                    "artifacts_count": diff_result["artifacts_count"],
-                    "artifacts_truncated": diff_result["truncated"],
+            script_relative = script_real.relative_to(self.project_root)
+        except ValueError:
+            script_relative = script_real
+        
+        output_truncated = stdout_capture.truncated or stderr_capture.truncated
+        if cache_key is not None and process.returncode == 0 and not diff_result["truncated"]:
+            await asyncio.to_thread(
+                self.run_cache.store,
+                cache_key,
+                str(self.sandbox_root),
+                {
+                    "exit_code": process.returncode,
+                    "stdout_excerpt": stdout_excerpt,
+                    "stderr_excerpt": stderr_excerpt,
+                    "stdout_bytes": stdout_capture.total_bytes,
+                    "stderr_bytes": stderr_capture.total_bytes,
+                    "output_truncated": output_truncated,
                 },
-            }
-            
-        except subprocess.TimeoutExpired:
-            duration_ms = int((time.time() - start_time) * 1000)
-            # 即使超时，也计算差分（可能部分执行产生了文件）
-            after_snapshot = self._snapshot_sandbox()
-            diff_result = self._diff_snapshots(before_snapshot, after_snapshot)
-            raise TimeoutError(
-                f"脚本执行超时（{timeout_seconds} 秒）: {script_path}"
+                [item["path"] for item in diff_result["artifacts_changed"]],
             )
-        except Exception as e:
-            duration_ms = int((time.time() - start_time) * 1000)
-            # 即使失败，也计算差分（可能部分执行产生了文件）
-            after_snapshot = self._snapshot_sandbox()
-            diff_result = self._diff_snapshots(before_snapshot, after_snapshot)
-            raise RuntimeError(f"脚本执行失败: {str(e)}")
+        
+        return {
+            "ok": process.returncode == 0,
+            "exit_code": process.returncode,
+            "stdout_excerpt": stdout_excerpt,
+            "stderr_excerpt": stderr_excerpt,
+            "artifacts_changed": diff_result["artifacts_changed"],
+            "meta": {
+                "duration_ms": duration_ms,
+                "script_path": str(script_relative),
+                "args": args,
+                "cwd": str(self.sandbox_root),
+                "timeout_seconds": timeout_seconds,
+                "artifacts_count": diff_result["artifacts_count"],
+                "artifacts_truncated": diff_result["truncated"],
+                "stdout_bytes": stdout_capture.total_bytes,
+                "stderr_bytes": stderr_capture.total_bytes,
+                "output_truncated": output_truncated,
+                "output_logs": self._output_logs(stdout_capture, stderr_capture),
+                "cached": False,
+                "queued_ms": queued_ms,
+                "resource_usage": usage,
+            },
+        }
+    
+    def _output_logs(self, *captures: BoundedCapture) -> Dict[str, str]:
+        """完整输出日志的路径（相对 sandbox）。"""
+        logs = {}
+        for name, capture in zip(("stdout", "stderr"), captures):
+            if capture.spill_path:
+                logs[name] = os.path.relpath(capture.spill_path, self.sandbox_root)
+        return logs
@@ -0,0 +1,279 @@
+"""Resource governor for python_run: concurrency slots, rlimits and usage accounting."""
+import asyncio
+import contextlib
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional
+
+
+# 默认并发上限：全局 / 同一技能
+DEFAULT_MAX_CONCURRENT = 4
+DEFAULT_MAX_PER_SKILL = 3
+
+# 子进程前导代码：在脚本执行前（引导代码之前）加入 cgroup、设置 rlimit。
+# 参数经环境变量传入，读取后立即移除，脚本及其子进程看不到。
+# 只使用解释器启动时已加载或内置的模块（resource），不拖慢冷启动。
+# 用量不由子进程上报：父进程回收时经 os.wait4 取得（或读取 cgroup 统计）。
+GOVERNOR_PREAMBLE = """\
+def _jarvis_govern():
+    import os, resource
+    _procs = os.environ.pop("JARVIS_CGROUP_PROCS", None)
+    if _procs:
+        try:
+            with open(_procs, "w") as _f:
+                _f.write(str(os.getpid()))
+        except OSError:
+            pass
+    for _item in filter(None, os.environ.pop("JARVIS_RLIMITS", "").split(",")):
+        _name, _, _value = _item.partition("=")
+        _limit = getattr(resource, "RLIMIT_" + _name, None)
+        if _limit is None:
+            continue
+        _soft = int(_value)
+        _hard = _soft + 1 if _name == "CPU" else _soft
+        _old_hard = resource.getrlimit(_limit)[1]
+        if _old_hard != resource.RLIM_INFINITY:
+            _soft, _hard = min(_soft, _old_hard), min(_hard, _old_hard)
+        try:
+            resource.setrlimit(_limit, (_soft, _hard))
+        except (ValueError, OSError):
+            pass
+_jarvis_govern()
+del _jarvis_govern
+"""
+
+
+def _env_int(name: str, default: Optional[int]) -> Optional[int]:
+    """读取整数环境变量（未设置或无效时返回默认值，0 表示不限制）。"""
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        return default
+    return number if number > 0 else None
+
+
+def cgroup_v2_available(root: str) -> bool:
+    """目录是否为可写的 cgroup v2 节点（需要已委派给当前用户）。"""
+    return os.path.isfile(os.path.join(root, "cgroup.controllers")) and os.access(root, os.W_OK)
+
+
+class GovernedRun:
+    """一次受控执行的资源安排（由 ResourceGovernor.prepare 创建）。"""
+
+    def __init__(self, env: Dict[str, str], cgroup: Optional[str]):
+        self.env = env
+        self.cgroup = cgroup
+
+    @property
+    def preamble(self) -> str:
+        """子进程需要执行的前导代码（没有 rlimit 与 cgroup 要设置时为空，脚本照常直接启动）。"""
+        return GOVERNOR_PREAMBLE if self.env else ""
+
+
+class ResourceGovernor:
+    """python_run 的资源治理。
+
+    - 并发槽位：全局与同一技能各一个信号量，超出的执行排队等待
+    - rlimit（可选，默认不设置）：RLIMIT_CPU / RLIMIT_AS / RLIMIT_NOFILE 在子进程内设置
+      （冷启动与预热进程池一致）
+    - cgroup v2（可选）：JARVIS_CGROUP_ROOT 指向已委派的 cgroup 目录时，每次执行
+      建立子 cgroup（可设 memory.max），统计以 cgroup 为准，包含被终止的进程
+    - 用量统计：CPU 时间、峰值 RSS、块设备读写字节（父进程回收子进程时的 wait4 用量，
+      被终止的进程同样有记录；子进程无法篡改）
+
+    配置（环境变量，0 表示不限制）：
+        JARVIS_PYTHON_MAX_CONCURRENT（默认 4）、JARVIS_PYTHON_MAX_PER_SKILL（默认 3）、
+        JARVIS_PYTHON_RLIMIT_CPU（秒）、JARVIS_PYTHON_RLIMIT_AS_MB、
+        JARVIS_PYTHON_RLIMIT_NOFILE、JARVIS_CGROUP_ROOT、
+        JARVIS_PYTHON_MEMORY_MAX_MB（cgroup memory.max）
+    """
+
+    def __init__(
+        self,
+        max_concurrent: Optional[int] = None,
+        max_per_skill: Optional[int] = None,
+        rlimits: Optional[Dict[str, int]] = None,
+        cgroup_root: Optional[str] = None,
+        memory_max_mb: Optional[int] = None,
+    ):
+        """初始化（未指定的参数从环境变量读取）。
+
+        Args:
+            max_concurrent: 全局并发上限
+            max_per_skill: 同一技能的并发上限
+            rlimits: {'CPU': 秒, 'AS': 字节, 'NOFILE': 个数}
+            cgroup_root: 已委派的 cgroup v2 目录
+            memory_max_mb: 每次执行的 cgroup 内存上限（MB）
+        """
+        self.max_concurrent = max_concurrent or _env_int(
+            "JARVIS_PYTHON_MAX_CONCURRENT", DEFAULT_MAX_CONCURRENT
+        )
+        self.max_per_skill = max_per_skill or _env_int(
+            "JARVIS_PYTHON_MAX_PER_SKILL", DEFAULT_MAX_PER_SKILL
+        )
+        if rlimits is None:
+            rlimits = {}
+            cpu = _env_int("JARVIS_PYTHON_RLIMIT_CPU", None)
+            address_space = _env_int("JARVIS_PYTHON_RLIMIT_AS_MB", None)
+            nofile = _env_int("JARVIS_PYTHON_RLIMIT_NOFILE", None)
+            if cpu:
+                rlimits["CPU"] = cpu
+            if address_space:
+                rlimits["AS"] = address_space * 1024 * 1024
+            if nofile:
+                rlimits["NOFILE"] = nofile
+        self.rlimits = rlimits
+        cgroup_root = cgroup_root or os.getenv("JARVIS_CGROUP_ROOT")
+        self.cgroup_root = cgroup_root if cgroup_root and cgroup_v2_available(cgroup_root) else None
+        self.memory_max_mb = memory_max_mb or _env_int("JARVIS_PYTHON_MEMORY_MAX_MB", None)
+        # 信号量绑定事件循环：循环变化时重建
+        self._loop = None
+        self._global: Optional[asyncio.Semaphore] = None
+        self._per_skill: Dict[str, asyncio.Semaphore] = {}
+
+    # ------------------------------------------------------------------
+    # 并发槽位
+    # ------------------------------------------------------------------
+
+    def _semaphores(self, skill: str):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._global = asyncio.Semaphore(self.max_concurrent) if self.max_concurrent else None
+            self._per_skill = {}
+        per_skill = None
+        if self.max_per_skill:
+            per_skill = self._per_skill.get(skill)
+            if per_skill is None:
+                per_skill = self._per_skill[skill] = asyncio.Semaphore(self.max_per_skill)
+        return per_skill, self._global
+
+    @contextlib.asynccontextmanager
+    async def slot(self, skill: str) -> AsyncIterator[int]:
+        """占用一个执行槽位（先技能、后全局，避免排队的同技能执行占住全局槽位）。
+
+        Args:
+            skill: 技能标识（同一技能共享并发上限）
+
+        Yields:
+            排队等待的毫秒数
+        """
+        started = time.perf_counter()
+        async with contextlib.AsyncExitStack() as stack:
+            for semaphore in self._semaphores(skill):
+                if semaphore is not None:
+                    await stack.enter_async_context(semaphore)
+            yield int((time.perf_counter() - started) * 1000)
+
+    # ------------------------------------------------------------------
+    # 单次执行
+    # ------------------------------------------------------------------
+
+    def prepare(self) -> GovernedRun:
+        """为一次执行准备 rlimit 参数与 cgroup（阻塞 I/O）。"""
+        env = {}
+        if self.rlimits:
+            env["JARVIS_RLIMITS"] = ",".join(f"{name}={value}" for name, value in self.rlimits.items())
+        cgroup = self._create_cgroup()
+        if cgroup is not None:
+            env["JARVIS_CGROUP_PROCS"] = os.path.join(cgroup, "cgroup.procs")
+        return GovernedRun(env, cgroup)
+
+    def _create_cgroup(self) -> Optional[str]:
+        if self.cgroup_root is None:
+            return None
+        path = os.path.join(self.cgroup_root, f"jarvis-run-{uuid.uuid4().hex[:12]}")
+        try:
+            os.mkdir(path)
+        except OSError as e:
+            print(f"创建 cgroup 失败，本次执行不做 cgroup 统计: {e}")
+            return None
+        if self.memory_max_mb:
+            try:
+                Path(path, "memory.max").write_text(str(self.memory_max_mb * 1024 * 1024))
+            except OSError:
+                pass  # 父 cgroup 未开启 memory 控制器
+        return path
+
+    def finish(self, run: GovernedRun, rusage: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """汇总用量并清理（阻塞 I/O；进程已退出或已被终止并回收后调用）。
+
+        Args:
+            run: prepare 返回的执行安排
+            rusage: 回收进程时 os.wait4 得到的用量（utime/stime/maxrss/inblock/oublock；
+                没有时为 None）
+
+        Returns:
+            {'accounting': rusage|cgroup|none, 'cpu_user_ms', 'cpu_system_ms',
+             'max_rss_kb', 'io_read_bytes', 'io_write_bytes'}（拿不到的项为 None）
+        """
+        usage: Dict[str, Any] = {
+            "accounting": "none",
+            "cpu_user_ms": None,
+            "cpu_system_ms": None,
+            "max_rss_kb": None,
+            "io_read_bytes": None,
+            "io_write_bytes": None,
+        }
+        if rusage:
+            usage.update(
+                accounting="rusage",
+                cpu_user_ms=int(rusage["utime"] * 1000),
+                cpu_system_ms=int(rusage["stime"] * 1000),
+                max_rss_kb=int(rusage["maxrss"]),
+                io_read_bytes=int(rusage["inblock"]) * 512,
+                io_write_bytes=int(rusage["oublock"]) * 512,
+            )
+        if run.cgroup is not None:
+            usage.update(self._cgroup_usage(run.cgroup))
+            self._remove_cgroup(run.cgroup)
+        return usage
+
+    @staticmethod
+    def _cgroup_usage(path: str) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {}
+        try:
+            cpu = dict(line.split() for line in Path(path, "cpu.stat").read_text().splitlines())
+            stats["cpu_user_ms"] = int(cpu["user_usec"]) // 1000
+            stats["cpu_system_ms"] = int(cpu["system_usec"]) // 1000
+        except (OSError, ValueError, KeyError):
+            pass
+        try:
+            stats["max_rss_kb"] = int(Path(path, "memory.peak").read_text()) // 1024
+        except (OSError, ValueError):
+            pass
+        try:
+            read_bytes = write_bytes = 0
+            for line in Path(path, "io.stat").read_text().splitlines():
+                for field in line.split()[1:]:
+                    key, _, value = field.partition("=")
+                    if key == "rbytes":
+                        read_bytes += int(value)
+                    elif key == "wbytes":
+                        write_bytes += int(value)
+            stats["io_read_bytes"], stats["io_write_bytes"] = read_bytes, write_bytes
+        except (OSError, ValueError):
+            pass
+        if stats:
+            stats["accounting"] = "cgroup"
+        return stats
+
+    @staticmethod
+    def _remove_cgroup(path: str) -> None:
+        # 脱离进程组的残留进程由 cgroup.kill 一并终止（内核 5.14+）
+        with contextlib.suppress(OSError):
+            Path(path, "cgroup.kill").write_text("1")
+        for _ in range(50):
+            try:
+                os.rmdir(path)
+                return
+            except FileNotFoundError:
+                return
+            except OSError:
+                time.sleep(0.01)
+        print(f"cgroup 仍有进程，未能删除: {path}")
@@ -0,0 +1,174 @@
+"""Result cache for memoized python_run executions."""
+import hashlib
+import json
+import os
+import shutil
+import sys
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from core.platform.artifact_store import hash_file
+
+
+# 缓存格式版本（变化时旧条目全部失效）
+CACHE_VERSION = 1
+
+# 单次执行可缓存的产物总大小上限（字节），超过则不缓存
+MAX_CACHED_ARTIFACT_BYTES = 64 * 1024 * 1024
+
+
+class RunCache:
+    """python_run 的结果缓存（memory/cache/python_run）。
+
+    键由脚本内容摘要、参数、白名单环境变量、声明的输入文件摘要与解释器版本组成；
+    命中时恢复记录的输出摘录与产物文件，不再启动子进程。
+
+    - entries/<键>.json：退出码、输出摘录与统计、产物列表（相对 sandbox 的路径与摘要）
+    - blobs/<前两位>/<摘要>：产物内容（独立副本，不与沙箱文件共享 inode）
+
+    脚本导入的其他模块、读取的未声明文件不参与计算键，调用方需把影响结果的文件
+    列入 inputs。
+    """
+
+    def __init__(self, root: str):
+        """初始化。
+
+        Args:
+            root: 缓存目录
+        """
+        self.root = Path(root).resolve()
+        self.entries_dir = self.root / "entries"
+        self.blobs_dir = self.root / "blobs"
+
+    def make_key(
+        self,
+        script_path: str,
+        args: List[str],
+        env: Optional[Dict[str, str]],
+        inputs: Dict[str, Optional[str]],
+    ) -> str:
+        """计算缓存键。
+
+        Args:
+            script_path: 脚本绝对路径
+            args: 脚本参数
+            env: 白名单环境变量（JARVIS_ 开头）
+            inputs: {相对 sandbox 的输入路径: 内容摘要（文件不存在时为 None）}
+
+        Returns:
+            十六进制键
+        """
+        material = json.dumps(
+            {
+                "version": CACHE_VERSION,
+                "python": sys.version,
+                "script": hash_file(script_path),
+                "args": [str(arg) for arg in args],
+                "env": dict(sorted((env or {}).items())),
+                "inputs": dict(sorted(inputs.items())),
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.blake2b(material.encode("utf-8"), digest_size=32).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.entries_dir / f"{key}.json"
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.blobs_dir / digest[:2] / digest
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """读取缓存条目（不存在、损坏或产物内容缺失时返回 None）。"""
+        try:
+            with open(self._entry_path(key), "r", encoding="utf-8") as handle:
+                entry = json.load(handle)
+        except (OSError, ValueError):
+            return None
+        if entry.get("version") != CACHE_VERSION:
+            return None
+        for artifact in entry.get("artifacts", []):
+            if not self._blob_path(artifact["digest"]).is_file():
+                return None
+        return entry
+
+    def store(self, key: str, sandbox_root: str, result: Dict[str, Any], artifacts: List[str]) -> bool:
+        """记录一次执行结果。
+
+        Args:
+            key: 缓存键
+            sandbox_root: 沙箱根目录
+            result: 需要恢复的结果字段（exit_code、输出摘录与统计）
+            artifacts: 产物路径（相对 sandbox）
+
+        Returns:
+            是否已缓存（产物过大或读取失败时不缓存）
+        """
+        root = Path(sandbox_root)
+        try:
+            total = sum((root / path).stat().st_size for path in artifacts)
+        except OSError:
+            return False
+        if total > MAX_CACHED_ARTIFACT_BYTES:
+            return False
+
+        recorded = []
+        for path in artifacts:
+            source = root / path
+            try:
+                digest = hash_file(str(source))
+                blob = self._blob_path(digest)
+                if not blob.exists():
+                    blob.parent.mkdir(parents=True, exist_ok=True)
+                    tmp_path = blob.with_name(f"{digest}.{uuid.uuid4().hex}.tmp")
+                    shutil.copyfile(source, tmp_path)
+                    os.replace(tmp_path, blob)
+            except OSError:
+                return False
+            recorded.append({"path": path, "digest": digest, "size": source.stat().st_size})
+
+        entry = dict(result, version=CACHE_VERSION, artifacts=recorded)
+        self.entries_dir.mkdir(parents=True, exist_ok=True)
+        target = self._entry_path(key)
+        tmp_path = target.with_name(f"{target.name}.{uuid.uuid4().hex}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(entry, handle, ensure_ascii=False)
+        os.replace(tmp_path, target)
+        return True
+
+    def restore(self, entry: Dict[str, Any], sandbox_root: str) -> List[Dict[str, Any]]:
+        """把缓存的产物写回沙箱（内容已相同的文件跳过）。
+
+        Args:
+            entry: lookup() 返回的条目
+            sandbox_root: 沙箱根目录
+
+        Returns:
+            产物列表 [{'path', 'size', 'kind': added|modified|unchanged}]
+
+        Raises:
+            OSError: 写入失败
+        """
+        root = Path(sandbox_root)
+        restored = []
+        for artifact in entry.get("artifacts", []):
+            target = root / artifact["path"]
+            kind = "added"
+            if target.is_file():
+                try:
+                    same = hash_file(str(target)) == artifact["digest"]
+                except OSError:
+                    same = False
+                kind = "unchanged" if same else "modified"
+            if kind != "unchanged":
+                target.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+                try:
+                    shutil.copyfile(self._blob_path(artifact["digest"]), tmp_path)
+                    os.replace(tmp_path, target)
+                except BaseException:
+                    tmp_path.unlink(missing_ok=True)
+                    raise
+            restored.append({"path": artifact["path"], "size": artifact["size"], "kind": kind})
+        return restored
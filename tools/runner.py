@@ -1,16 +1,192 @@
 """Tool runner."""
-from typing import Dict, Any, List
+import asyncio
+import contextlib
+import contextvars
+import os
+import posixpath
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
 
+from core.contracts.skill import PlanStep
 from core.contracts.tool import Tool
-from core.contracts.tool_result import ToolResult
+from core.contracts.tool_result import (
+    TOOL_STATUS_CANCELLED,
+    TOOL_STATUS_TIMEOUT,
+    ToolResult,
+)
+from core.platform.artifact_store import ArtifactStore
+
+
+# 计划步骤默认最大并行数（环境变量 JARVIS_MAX_PARALLEL_STEPS 可覆盖，1 表示串行）
+DEFAULT_MAX_PARALLEL_STEPS = 4
+
+# 工具未声明 default_timeout 时的默认超时（秒，环境变量 JARVIS_TOOL_TIMEOUT 可覆盖，0 表示不限）
+DEFAULT_TOOL_TIMEOUT = 300
+
+# 在工具自身超时之外的宽限时间：自带超时控制的工具（如 python_run）先报告自己的超时
+TIMEOUT_GRACE_SECONDS = 5
+
+# 独占资源：与任何步骤冲突（python_run 会对整个沙箱做产物差分；未知工具的副作用无法推断）
+EXCLUSIVE_RESOURCE = "*"
+
+
+def _normalize_resource(resource: str) -> str:
+    """资源键规范化（路径与 FileTool 的解析规则一致：去掉前导 / 与 .）。"""
+    resource = str(resource).strip()
+    if resource == EXCLUSIVE_RESOURCE:
+        return resource
+    normalized = posixpath.normpath(resource.replace("\\", "/").lstrip("/."))
+    return "" if normalized == "." else normalized
+
+
+def step_resources(step: PlanStep) -> List[str]:
+    """推断步骤访问的资源键。
+    
+    - file：操作的沙箱路径（batch 为全部子操作的路径；加上显式声明的 resources）
+    - python_run：独占（执行前后扫描整个沙箱计算产物差分）
+    - 其他工具：使用显式声明的 resources，未声明时独占
+    
+    Args:
+        step: 计划步骤
+        
+    Returns:
+        资源键列表（"" 表示沙箱根目录，"*" 表示独占）
+    """
+    declared = [_normalize_resource(item) for item in (step.resources or []) if str(item).strip()]
+    if step.tool_id == "python_run":
+        return [EXCLUSIVE_RESOURCE]
+    if step.tool_id == "file":
+        params = step.params or {}
+        if params.get("operation") == "batch":
+            paths = [item.get("path") for item in params.get("operations") or [] if isinstance(item, dict)]
+            if not paths or any(path is None for path in paths):
+                return [EXCLUSIVE_RESOURCE]
+            return [_normalize_resource(path) for path in paths] + declared
+        path = params.get("path")
+        if path is None:
+            return [EXCLUSIVE_RESOURCE]
+        return [_normalize_resource(path)] + declared
+    return declared or [EXCLUSIVE_RESOURCE]
+
+
+def _resources_conflict(left: Sequence[str], right: Sequence[str]) -> bool:
+    """两组资源是否冲突（相同路径、父子路径或任一方独占）。"""
+    for a in left:
+        for b in right:
+            if a == EXCLUSIVE_RESOURCE or b == EXCLUSIVE_RESOURCE:
+                return True
+            if a == b or a == "" or b == "" or b.startswith(a + "/") or a.startswith(b + "/"):
+                return True
+    return False
+
+
+def max_parallel_steps() -> int:
+    """读取计划步骤最大并行数配置。"""
+    try:
+        return max(1, int(os.getenv("JARVIS_MAX_PARALLEL_STEPS", DEFAULT_MAX_PARALLEL_STEPS)))
+    except ValueError:
+        return DEFAULT_MAX_PARALLEL_STEPS
+
+
+def step_timeout(tool: Tool, params: Optional[Dict[str, Any]]) -> Optional[float]:
+    """计算步骤的超时时间。
+    
+    优先使用步骤参数中的 timeout_seconds，其次是工具的 default_timeout，
+    最后是全局默认值；前两者额外加上宽限时间。
+    
+    Args:
+        tool: 工具对象
+        params: 步骤参数
+        
+    Returns:
+        超时秒数；None 表示不限
+    """
+    requested = (params or {}).get("timeout_seconds")
+    if isinstance(requested, (int, float)) and not isinstance(requested, bool) and requested > 0:
+        return float(requested) + TIMEOUT_GRACE_SECONDS
+    if tool.default_timeout:
+        return float(tool.default_timeout) + TIMEOUT_GRACE_SECONDS
+    try:
+        fallback = float(os.getenv("JARVIS_TOOL_TIMEOUT", DEFAULT_TOOL_TIMEOUT))
+    except ValueError:
+        fallback = float(DEFAULT_TOOL_TIMEOUT)
+    return fallback if fallback > 0 else None
+
+
+# 当前步骤的超时（ToolRunner.run 设置，工具可暂停计时）
+_STEP_DEADLINE: contextvars.ContextVar[Optional[asyncio.Timeout]] = contextvars.ContextVar(
+    "jarvis_step_deadline", default=None
+)
+
+
+@contextlib.contextmanager
+def step_deadline_paused() -> Iterator[None]:
+    """在此期间暂停当前步骤的超时计时（如排队等待执行槽位），退出时按剩余时间恢复。
+
+    不在 ToolRunner.run 中或步骤不限时时不做任何事。
+    """
+    deadline = _STEP_DEADLINE.get()
+    if deadline is None or deadline.when() is None or deadline.expired():
+        yield
+        return
+    loop = asyncio.get_running_loop()
+    remaining = deadline.when() - loop.time()
+    deadline.reschedule(None)
+    try:
+        yield
+    finally:
+        deadline.reschedule(loop.time() + remaining)
+
+
+def artifact_paths(result: Dict[str, Any]) -> List[str]:
+    """工具结果中的产物文件路径（写入的 evidence_refs 与 python_run 的产物差分）。
+    
+    Args:
+        result: 工具返回的结果字典
+        
+    Returns:
+        绝对路径列表
+    """
+    paths = [str(ref) for ref in result.get("evidence_refs", [])]
+    changed = result.get("artifacts_changed") or []
+    cwd = (result.get("meta") or {}).get("cwd")
+    if changed and cwd:
+        paths.extend(os.path.join(cwd, item["path"]) for item in changed if item.get("path"))
+    return paths
 
 
 class ToolRunner:
     """工具执行器。"""
     
+    def __init__(self, artifact_store: Optional[ArtifactStore] = None):
+        """初始化。
+        
+        Args:
+            artifact_store: 内容寻址产物存储（None 表示不记录产物摘要）
+        """
+        self.artifact_store = artifact_store
+    
+    async def _store_artifacts(self, result: Any) -> Dict[str, str]:
+        """把产物加入内容寻址存储，返回 {路径: 摘要}（入库失败不影响步骤结果）。"""
+        if self.artifact_store is None or not isinstance(result, dict):
+            return {}
+        paths = artifact_paths(result)
+        if not paths:
+            return {}
+        try:
+            stored = await asyncio.to_thread(self.artifact_store.ingest, paths)
+        except Exception:
+            return {}
+        return {path: info["digest"] for path, info in stored.items()}
+    
     async def run(self, tool: Tool, step_id: str, params: Dict[str, Any] = None) -> ToolResult:
         """运行工具并统一记录结果。
         
+        超时由 asyncio.timeout 强制执行：超时后取消工具协程，基于子进程的工具
+        在取消时终止其进程组。工具可用 step_deadline_paused() 把排队等待等时间
+        排除在超时之外。超时返回 status=timeout 的结果；任务被取消时
+        CancelledError 继续向上传播（由调用方记录 cancelled）。
+        
         Args:
             tool: 工具对象
             step_id: 步骤ID
@@ -19,8 +195,14 @@ class ToolRunner:
         Returns:
             工具执行结果
         """
+        timeout = step_timeout(tool, params)
         try:
-            result = await tool.execute(params or {})
+            async with asyncio.timeout(timeout) as deadline:
+                token = _STEP_DEADLINE.set(deadline)
+                try:
+                    result = await tool.execute(params or {})
+                finally:
+                    _STEP_DEADLINE.reset(token)
             
             # 提取 evidence_refs（如生成的文件路径）
             evidence_refs: List[str] = []
@@ -37,6 +219,18 @@ class ToolRunner:
                 success=True,
                 result=result,
                 evidence_refs=evidence_refs,
+                artifact_digests=await self._store_artifacts(result),
+            )
+        except asyncio.CancelledError:
+            raise
+        except (asyncio.TimeoutError, TimeoutError) as e:
+            return ToolResult(
+                tool_id=tool.tool_id,
+                step_id=step_id,
+                success=False,
+                error=str(e) or f"工具执行超时（{timeout:.0f} 秒）",
+                evidence_refs=[],
+                status=TOOL_STATUS_TIMEOUT,
             )
         except Exception as e:
             return ToolResult(
@@ -56,3 +250,156 @@ class ToolRunner:
             error="未接入 MCP client",
             evidence_refs=[],
         )
+
+    async def _run_step(self, step: PlanStep, get_tool: Callable[[str], Optional[Tool]]) -> ToolResult:
+        tool = get_tool(step.tool_id)
+        if tool is not None:
+            return await self.run(tool, step.step_id, step.params)
+        if step.tool_id.startswith("mcp."):
+            return self.run_missing_mcp(step.tool_id, step.step_id)
+        return ToolResult(
+            tool_id=step.tool_id,
+            step_id=step.step_id,
+            success=False,
+            error=f"工具 {step.tool_id} 未找到",
+            evidence_refs=[],
+        )
+
+    async def run_plan(
+        self,
+        steps: List[PlanStep],
+        get_tool: Callable[[str], Optional[Tool]],
+        max_parallel: Optional[int] = None,
+        on_result: Optional[Callable[[PlanStep, ToolResult], None]] = None,
+    ) -> Dict[str, Any]:
+        """按依赖关系并行执行计划步骤（DAG 调度）。
+        
+        调度规则：
+        - depends_on 中的步骤（仅限位于之前的步骤）完成后才开始；依赖失败时跳过该步骤
+        - 资源冲突的步骤（同一沙箱路径、父子路径、独占步骤）按计划顺序串行
+        - 同时运行的步骤数不超过 max_parallel
+        
+        on_result 按计划顺序回调（某步骤及其之前的所有步骤都完成后才回调），
+        因此审计日志与输出顺序与串行执行一致。
+        
+        Args:
+            steps: 计划步骤
+            get_tool: 按 tool_id 获取工具（不存在返回 None）
+            max_parallel: 最大并行数（默认读取 JARVIS_MAX_PARALLEL_STEPS）
+            on_result: 按计划顺序调用的结果回调
+            
+        Returns:
+            {'results': [ToolResult...], 'makespan_ms', 'serial_ms',
+             'max_parallel', 'peak_concurrency', 'durations_ms': {step_id: ms}}
+        """
+        limit = max(1, max_parallel or max_parallel_steps())
+        count = len(steps)
+        index_of = {step.step_id: index for index, step in enumerate(steps)}
+        resources = [step_resources(step) for step in steps]
+        
+        # 显式依赖（失败时传播）与资源冲突产生的顺序约束（只保证先后）
+        hard_deps: List[set] = []
+        all_deps: List[set] = []
+        for index, step in enumerate(steps):
+            hard = {
+                index_of[dep] for dep in (step.depends_on or [])
+                if dep in index_of and index_of[dep] < index
+            }
+            ordering = {
+                earlier for earlier in range(index)
+                if _resources_conflict(resources[index], resources[earlier])
+            }
+            hard_deps.append(hard)
+            all_deps.append(hard | ordering)
+        
+        results: List[Optional[ToolResult]] = [None] * count
+        durations: Dict[str, float] = {}
+        pending = list(range(count))
+        running: Dict[asyncio.Future, int] = {}
+        started_at: Dict[int, float] = {}
+        done: set = set()
+        next_emit = 0
+        peak = 0
+        plan_started = time.perf_counter()
+        
+        def emit_ready() -> None:
+            nonlocal next_emit
+            while next_emit < count and results[next_emit] is not None:
+                if on_result is not None:
+                    on_result(steps[next_emit], results[next_emit])
+                next_emit += 1
+        
+        try:
+            while pending or running:
+                progressed = True
+                while progressed and len(running) < limit:
+                    progressed = False
+                    for index in pending:
+                        if not all_deps[index] <= done:
+                            continue
+                        pending.remove(index)
+                        progressed = True
+                        failed = [
+                            steps[dep].step_id for dep in sorted(hard_deps[index])
+                            if not results[dep].success
+                        ]
+                        if failed:
+                            step = steps[index]
+                            results[index] = ToolResult(
+                                tool_id=step.tool_id,
+                                step_id=step.step_id,
+                                success=False,
+                                error=f"依赖步骤未成功，已跳过: {', '.join(failed)}",
+                                evidence_refs=[],
+                            )
+                            durations[step.step_id] = 0.0
+                            done.add(index)
+                        else:
+                            started_at[index] = time.perf_counter()
+                            future = asyncio.ensure_future(self._run_step(steps[index], get_tool))
+                            running[future] = index
+                        break
+                peak = max(peak, len(running))
+                emit_ready()
+                if not running:
+                    continue
+                finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for future in finished:
+                    index = running.pop(future)
+                    results[index] = future.result()
+                    durations[steps[index].step_id] = round(
+                        (time.perf_counter() - started_at[index]) * 1000, 2
+                    )
+                    done.add(index)
+                emit_ready()
+        except asyncio.CancelledError:
+            # 任务被取消（Ctrl-C、客户端断开）：取消运行中的步骤并等待其清理（终止子进程组），
+            # 未完成的步骤记为 cancelled 并按顺序回调，然后继续传播取消
+            for future in running:
+                future.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+            running = {}
+            for index, step in enumerate(steps):
+                if results[index] is None:
+                    results[index] = ToolResult(
+                        tool_id=step.tool_id,
+                        step_id=step.step_id,
+                        success=False,
+                        error="任务已取消",
+                        evidence_refs=[],
+                        status=TOOL_STATUS_CANCELLED,
+                    )
+            emit_ready()
+            raise
+        finally:
+            for future in running:
+                future.cancel()
+        
+        return {
+            "results": results,
+            "makespan_ms": round((time.perf_counter() - plan_started) * 1000, 2),
+            "serial_ms": round(sum(durations.values()), 2),
+            "max_parallel": limit,
+            "peak_concurrency": peak,
+            "durations_ms": durations,
+        }
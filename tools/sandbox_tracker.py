@@ -0,0 +1,294 @@
+"""Incremental sandbox change tracking for python_run artifact diffs."""
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from core.utils.inotify import (
+    IN_CHANGES,
+    IN_CREATE,
+    IN_DELETE,
+    IN_DELETE_SELF,
+    IN_IGNORED,
+    IN_ISDIR,
+    IN_MOVE_SELF,
+    IN_MOVED_FROM,
+    IN_MOVED_TO,
+    IN_Q_OVERFLOW,
+    Inotify,
+    inotify_available,
+)
+
+
+# 排除规则：路径中任一部分命中即排除（.jarvis_logs 为 python_run 的完整输出日志）
+DEFAULT_EXCLUDED_NAMES = frozenset({"memory", ".gitkeep", ".git", ".jarvis_logs"})
+
+FileState = Tuple[int, int]  # (mtime_ns, size)
+
+
+class SandboxTracker:
+    """沙箱文件树的持久索引。
+
+    维护 相对路径 -> (mtime_ns, size) 的索引，并为每次变化记录序号，
+    脚本执行前后各调用一次 refresh 即可得到期间新增/修改的文件：
+
+    - inotify 模式：常驻监听所有沙箱目录，refresh 只重新 stat 事件涉及的路径，
+      耗时与变化量成正比（O(changed)）
+    - 扫描模式（inotify 不可用、监听数超限或事件队列溢出时）：os.scandir 全量扫描，
+      与索引比较得到变化
+
+    注意：目录 mtime 只在增删改名时变化，原地改写文件不会更新目录 mtime，
+    因此扫描模式不能按目录 mtime 跳过子树，否则会漏掉 "modified"。
+
+    多个脚本并发执行时，各自以 begin() 返回的序号为基线，互不影响。
+    """
+
+    def __init__(
+        self,
+        root: str,
+        excluded_names: Iterable[str] = DEFAULT_EXCLUDED_NAMES,
+        use_inotify: Optional[bool] = None,
+    ):
+        """初始化（首次 refresh 时才建立索引）。
+
+        Args:
+            root: 沙箱根目录
+            excluded_names: 排除的文件/目录名
+            use_inotify: 是否使用 inotify（None 表示自动检测）
+        """
+        self.root = os.path.abspath(str(root))
+        self.excluded_names = frozenset(excluded_names)
+        self.mode = "inotify" if (inotify_available() if use_inotify is None else use_inotify) else "scan"
+        self._files: Dict[str, Tuple[int, int, int]] = {}  # rel -> (mtime_ns, size, 加入索引时的序号)
+        self._inotify: Optional[Inotify] = None
+        self._wd_to_dir: Dict[int, str] = {}
+        self._dir_to_wd: Dict[str, int] = {}
+        self._primed = False
+        self._seq = 0
+        self._log: List[Tuple[int, str]] = []  # (序号, 变化的相对路径)
+        self._active: Dict[int, int] = {}  # 基线序号 -> 使用中的次数
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------
+    # 扫描与监听
+    # ------------------------------------------------------------------
+
+    def _rel(self, abs_path: str) -> str:
+        return os.path.relpath(abs_path, self.root).replace(os.sep, "/")
+
+    def _watch(self, abs_dir: str) -> None:
+        if self._inotify is None:
+            return
+        try:
+            wd = self._inotify.add_watch(abs_dir, IN_CHANGES)
+        except OSError:
+            # 监听数超过 max_user_watches 或目录已消失：退回扫描模式
+            self._fallback_to_scan()
+            return
+        rel = self._rel(abs_dir)
+        self._wd_to_dir[wd] = rel
+        self._dir_to_wd[rel] = wd
+
+    def _scan_tree(self, abs_dir: str, out: Dict[str, FileState]) -> None:
+        """递归扫描目录（先添加监听再列目录，避免漏掉期间创建的文件）。"""
+        stack = [abs_dir]
+        while stack:
+            current = stack.pop()
+            self._watch(current)
+            try:
+                entries = list(os.scandir(current))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.name in self.excluded_names:
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file():
+                        stat = entry.stat()
+                        out[self._rel(entry.path)] = (stat.st_mtime_ns, stat.st_size)
+                except OSError:
+                    continue
+
+    def _fallback_to_scan(self) -> None:
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+        self._wd_to_dir.clear()
+        self._dir_to_wd.clear()
+        self.mode = "scan"
+
+    def _reset_watches(self) -> None:
+        """丢弃所有监听并重建 inotify 实例（事件队列溢出或根目录被移动后调用）。"""
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+        self._wd_to_dir.clear()
+        self._dir_to_wd.clear()
+        if self.mode == "inotify":
+            try:
+                self._inotify = Inotify()
+            except OSError:
+                self.mode = "scan"
+
+    # ------------------------------------------------------------------
+    # 索引更新
+    # ------------------------------------------------------------------
+
+    def _record(self, rel: str, state: Optional[FileState]) -> None:
+        """更新单个文件的索引并记录变化。"""
+        old = self._files.get(rel)
+        if state is None:
+            if old is not None:
+                del self._files[rel]
+            return
+        if old is not None and old[:2] == state:
+            return
+        created = old[2] if old is not None else self._seq
+        self._files[rel] = (state[0], state[1], created)
+        self._log.append((self._seq, rel))
+
+    def _stat(self, rel: str) -> Optional[FileState]:
+        path = os.path.join(self.root, *rel.split("/"))
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if not os.path.isfile(path):
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _full_rescan(self) -> None:
+        """全量扫描并与索引比较（inotify 模式下同时重建监听）。"""
+        if self.mode == "inotify":
+            self._reset_watches()
+        current: Dict[str, FileState] = {}
+        if os.path.isdir(self.root):
+            self._scan_tree(self.root, current)
+        for rel in [rel for rel in self._files if rel not in current]:
+            self._record(rel, None)
+        for rel, state in current.items():
+            self._record(rel, state)
+
+    def _drop_subtree(self, rel_dir: str) -> None:
+        prefix = rel_dir + "/"
+        for rel in [rel for rel in self._files if rel.startswith(prefix)]:
+            self._record(rel, None)
+        for rel in [rel for rel in self._dir_to_wd if rel == rel_dir or rel.startswith(prefix)]:
+            wd = self._dir_to_wd.pop(rel)
+            self._wd_to_dir.pop(wd, None)
+            if self._inotify is not None:
+                self._inotify.rm_watch(wd)
+
+    def _apply_events(self) -> None:
+        """处理 inotify 事件：只重新 stat 涉及的路径。"""
+        dirty: Dict[str, None] = {}
+        for event in self._inotify.read_events():
+            if event.mask & IN_Q_OVERFLOW:
+                self._full_rescan()
+                return
+            rel_dir = self._wd_to_dir.get(event.wd)
+            if event.mask & IN_IGNORED:
+                if rel_dir is not None:
+                    self._wd_to_dir.pop(event.wd, None)
+                    self._dir_to_wd.pop(rel_dir, None)
+                continue
+            if rel_dir is None:
+                continue
+            if not event.name:
+                if event.mask & (IN_DELETE_SELF | IN_MOVE_SELF) and rel_dir == ".":
+                    self._full_rescan()
+                    return
+                continue
+            if event.name in self.excluded_names:
+                continue
+            rel = event.name if rel_dir == "." else f"{rel_dir}/{event.name}"
+            if event.mask & IN_ISDIR:
+                if event.mask & (IN_DELETE | IN_MOVED_FROM):
+                    self._drop_subtree(rel)
+                elif event.mask & (IN_CREATE | IN_MOVED_TO):
+                    found: Dict[str, FileState] = {}
+                    self._scan_tree(os.path.join(self.root, *rel.split("/")), found)
+                    for path, state in found.items():
+                        self._record(path, state)
+                continue
+            dirty[rel] = None
+        for rel in dirty:
+            self._record(rel, self._stat(rel))
+
+    def refresh(self) -> int:
+        """使索引与磁盘一致。
+
+        Returns:
+            本次刷新的序号
+        """
+        with self._lock:
+            self._seq += 1
+            if not self._primed:
+                self._full_rescan()
+                self._primed = True
+                # 建立索引时的文件不算变化
+                self._log.clear()
+            elif self._inotify is not None:
+                self._apply_events()
+            else:
+                self._full_rescan()
+            return self._seq
+
+    # ------------------------------------------------------------------
+    # 对外接口
+    # ------------------------------------------------------------------
+
+    def begin(self) -> int:
+        """刷新索引并返回基线序号（脚本执行前调用）。"""
+        with self._lock:
+            token = self.refresh()
+            self._active[token] = self._active.get(token, 0) + 1
+            return token
+
+    def changes_since(self, token: int) -> List[Dict[str, object]]:
+        """刷新索引并返回基线之后新增/修改的文件（脚本执行后调用）。
+
+        Args:
+            token: begin() 返回的基线序号
+
+        Returns:
+            [{'path', 'size', 'kind': 'added'|'modified'}]，按路径排序；已删除的文件不包含
+        """
+        with self._lock:
+            self.refresh()
+            changed = {rel for seq, rel in self._log if seq > token}
+            artifacts = []
+            for rel in sorted(changed):
+                entry = self._files.get(rel)
+                if entry is None:
+                    continue
+                artifacts.append({
+                    "path": rel.replace("/", os.sep),
+                    "size": entry[1],
+                    "kind": "added" if entry[2] > token else "modified",
+                })
+            self._release(token)
+            return artifacts
+
+    def release(self, token: int) -> None:
+        """释放基线（脚本未正常结束、不再需要差分时调用）。"""
+        with self._lock:
+            self._release(token)
+
+    def _release(self, token: int) -> None:
+        count = self._active.get(token, 0) - 1
+        if count > 0:
+            self._active[token] = count
+        else:
+            self._active.pop(token, None)
+        # 丢弃所有活跃基线都不再需要的变化记录
+        oldest = min(self._active) if self._active else self._seq
+        self._log = [(seq, rel) for seq, rel in self._log if seq > oldest]
+
+    def close(self) -> None:
+        """关闭 inotify 监听。"""
+        with self._lock:
+            if self._inotify is not None:
+                self._inotify.close()
+                self._inotify = None
@@ -0,0 +1,247 @@
+"""Warm worker pool for python_run: forks scripts from a pre-imported server."""
+import asyncio
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from core.utils.process import pipe_reader
+from skills.bytecode import BOOTSTRAP
+
+
+# fork 服务端预先导入的模块（不存在的模块会被跳过）；
+# 环境变量 JARVIS_PYTHON_PRELOAD（逗号分隔）可覆盖
+DEFAULT_PRELOAD = (
+    "argparse", "collections", "csv", "dataclasses", "datetime", "decimal", "functools",
+    "glob", "hashlib", "io", "itertools", "json", "logging", "math", "pathlib", "random",
+    "re", "shutil", "string", "subprocess", "tempfile", "textwrap", "typing",
+    "urllib.parse", "urllib.request", "uuid", "xml.etree.ElementTree", "zipfile", "yaml",
+)
+
+# 等待服务端就绪的超时（秒）
+STARTUP_TIMEOUT = 10
+
+SERVER_SCRIPT = Path(__file__).resolve().parent / "forkserver.py"
+
+
+def warm_pool_available() -> bool:
+    """当前平台是否支持 fork 服务端（需要 fork 与 Unix socket 传递 fd）。"""
+    return hasattr(os, "fork") and hasattr(socket, "send_fds")
+
+
+def preload_modules() -> List[str]:
+    """预导入模块列表（环境变量 JARVIS_PYTHON_PRELOAD 可覆盖）。"""
+    configured = os.getenv("JARVIS_PYTHON_PRELOAD")
+    if configured is None:
+        return list(DEFAULT_PRELOAD)
+    return [name.strip() for name in configured.split(",") if name.strip()]
+
+
+class WarmProcess:
+    """fork 服务端派生的脚本进程（接口与 asyncio.subprocess.Process 的常用部分一致）。
+
+    stdout/stderr 为 asyncio.StreamReader，由调用方读取直到 EOF。
+    rusage 为服务端回收子进程时 os.wait4 得到的资源用量（退出前为 None）。
+    """
+
+    def __init__(self, pid: int, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                 stdout: asyncio.StreamReader, stderr: asyncio.StreamReader, transports: list):
+        self.pid = pid
+        self.returncode: Optional[int] = None
+        self.rusage: Optional[Dict[str, float]] = None
+        self.stdout = stdout
+        self.stderr = stderr
+        self._reader = reader
+        self._writer = writer
+        self._transports = transports
+        self._exit_task: Optional[asyncio.Task] = None
+
+    async def _read_exit(self) -> int:
+        line = await self._reader.readline()
+        self._writer.close()
+        try:
+            message = json.loads(line)
+            self.returncode = int(message["exit_code"])
+            self.rusage = message.get("rusage")
+        except (ValueError, KeyError, TypeError):
+            # 服务端中途退出，拿不到退出码
+            self.returncode = -1
+        return self.returncode
+
+    async def wait(self) -> int:
+        """等待脚本进程退出，返回退出码。"""
+        if self._exit_task is None:
+            self._exit_task = asyncio.ensure_future(self._read_exit())
+        return await asyncio.shield(self._exit_task)
+
+    def close_pipes(self) -> None:
+        """关闭输出管道（进程被终止、不再读取输出时调用）。"""
+        for transport in self._transports:
+            transport.close()
+
+
+async def _pipe_reader(fd: int):
+    """把管道读端接入事件循环，返回 (StreamReader, transport)。"""
+    return await pipe_reader(os.fdopen(fd, "rb", 0))
+
+
+class WarmWorkerPool:
+    """常驻 fork 服务端：预先导入常用模块，每次执行 fork 出一个全新的子进程。
+
+    子进程与冷启动的 `python script.py` 保持一致的部分：cwd、环境变量、
+    argv、sys.path[0]、__main__、stdout/stderr 管道、独立进程组（超时/取消时整组终止）。
+
+    差异：解释器启动参数（PYTHONPATH、PYTHONHASHSEED 等只在启动时生效的变量）
+    沿用服务端的设置；同一服务端派生的脚本共享哈希种子；stdin 为 /dev/null；
+    已预导入的模块优先于脚本目录中的同名文件。
+    """
+
+    def __init__(self, modules: Optional[Sequence[str]] = None):
+        """初始化（首次执行时才启动服务端）。
+
+        Args:
+            modules: 预导入的模块（默认 preload_modules()）
+        """
+        self.modules = list(modules) if modules is not None else preload_modules()
+        self._server: Optional[subprocess.Popen] = None
+        self._socket_dir: Optional[str] = None
+        self._socket_path: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def _ensure_server(self) -> str:
+        """启动服务端（已在运行时直接返回 socket 路径）。"""
+        with self._lock:
+            if self._server is not None and self._server.poll() is None:
+                return self._socket_path
+            self._stop_server()
+            # mkdtemp 创建 0700 目录，其他用户无法连接 socket
+            self._socket_dir = tempfile.mkdtemp(prefix="jarvis-forkserver-")
+            self._socket_path = os.path.join(self._socket_dir, "server.sock")
+            self._server = subprocess.Popen(
+                [sys.executable, str(SERVER_SCRIPT), self._socket_path, ",".join(self.modules)],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True,
+            )
+            ready = threading.Timer(STARTUP_TIMEOUT, self._server.kill)
+            ready.start()
+            try:
+                line = self._server.stdout.readline()
+            finally:
+                ready.cancel()
+            if line.strip() != b"ready":
+                self._stop_server()
+                raise OSError("fork 服务端启动失败")
+            return self._socket_path
+
+    def _stop_server(self) -> None:
+        if self._server is not None:
+            if self._server.poll() is None:
+                # 关闭 stdin 即通知服务端退出
+                self._server.stdin.close()
+                try:
+                    self._server.wait(timeout=STARTUP_TIMEOUT)
+                except subprocess.TimeoutExpired:
+                    self._server.kill()
+                    self._server.wait()
+            for stream in (self._server.stdin, self._server.stdout):
+                if stream is not None and not stream.closed:
+                    stream.close()
+            self._server = None
+        if self._socket_dir is not None:
+            shutil.rmtree(self._socket_dir, ignore_errors=True)
+            self._socket_dir = None
+
+    def start(self) -> None:
+        """预先启动服务端（可选，否则首次执行时启动）。"""
+        self._ensure_server()
+
+    def close(self) -> None:
+        """停止服务端。"""
+        with self._lock:
+            self._stop_server()
+
+    async def spawn(
+        self,
+        script_path: str,
+        args: List[str],
+        cwd: str,
+        env: Dict[str, str],
+        pyc_path: Optional[str] = None,
+        preamble: str = "",
+    ) -> WarmProcess:
+        """fork 一个子进程执行脚本。
+
+        Args:
+            script_path: 脚本绝对路径
+            args: 脚本参数
+            cwd: 工作目录
+            env: 完整的环境变量
+            pyc_path: 预编译字节码路径（None 表示编译源码）
+            preamble: 在引导代码之前执行的代码（如设置资源限制）
+
+        Returns:
+            WarmProcess
+
+        Raises:
+            OSError: 服务端无法启动或连接失败
+        """
+        socket_path = await asyncio.to_thread(self._ensure_server)
+        loop = asyncio.get_running_loop()
+        request = json.dumps({
+            "script": str(script_path),
+            "pyc": pyc_path,
+            "args": [str(arg) for arg in args],
+            "cwd": str(cwd),
+            "env": dict(env),
+            "bootstrap": preamble + BOOTSTRAP,
+        }).encode("utf-8") + b"\n"
+
+        stdout_r, stdout_w = os.pipe()
+        stderr_r, stderr_w = os.pipe()
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.setblocking(False)
+            await loop.sock_connect(sock, socket_path)
+            socket.send_fds(sock, [request[:1]], [stdout_w, stderr_w])
+            await loop.sock_sendall(sock, request[1:])
+        except BaseException:
+            sock.close()
+            for fd in (stdout_r, stderr_r):
+                os.close(fd)
+            raise
+        finally:
+            # 写端已交给子进程，本进程必须关闭，否则读不到 EOF
+            os.close(stdout_w)
+            os.close(stderr_w)
+
+        transports = []
+        try:
+            stdout, stdout_transport = await _pipe_reader(stdout_r)
+            transports.append(stdout_transport)
+            stderr, stderr_transport = await _pipe_reader(stderr_r)
+            transports.append(stderr_transport)
+            reader, writer = await asyncio.open_unix_connection(sock=sock)
+        except BaseException:
+            for transport in transports:
+                transport.close()
+            for fd in (stdout_r, stderr_r)[len(transports):]:
+                os.close(fd)
+            sock.close()
+            raise
+        line = await reader.readline()
+        try:
+            pid = int(json.loads(line)["pid"])
+        except (ValueError, KeyError, TypeError):
+            writer.close()
+            for transport in transports:
+                transport.close()
+            raise OSError("fork 服务端未返回子进程 PID")
+        return WarmProcess(pid, reader, writer, stdout, stderr, transports)